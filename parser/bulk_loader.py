@@ -0,0 +1,102 @@
+import logging
+import re
+import time
+from collections import defaultdict
+from itertools import chain, islice
+from parser.constants import BULK_CHUNK_SIZE
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+VALUES_PATTERN = re.compile(r'VALUES\s*(\([^)]*\))', re.IGNORECASE)
+"""Шаблон группы плейсхолдеров одной строки в запросе INSERT."""
+
+TABLE_PATTERN = re.compile(r'INSERT\s+(?:IGNORE\s+)?INTO\s+(\S+)', re.I)
+"""Шаблон названия таблицы в запросе INSERT."""
+
+
+class BulkLoader:
+    """
+    Пакетная загрузка строк многострочными запросами INSERT.
+
+    Запрос вида INSERT ... VALUES (%s, ...) ON DUPLICATE KEY UPDATE ...
+    разворачивается в INSERT ... VALUES (...), (...), ... на chunk_size
+    строк, поэтому на каждую порцию приходится один запрос к серверу,
+    а размер запроса не зависит от общего количества строк. Порции
+    выполняются в транзакции вызывающего кода. Для каждой таблицы
+    ведется статистика: количество строк, время загрузки и скорость.
+    """
+
+    def __init__(self, chunk_size: int = BULK_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError('Размер порции должен быть положительным')
+        self.chunk_size = chunk_size
+        self.stats = defaultdict(lambda: {'rows': 0, 'seconds': 0.0})
+
+    @staticmethod
+    def multirow_query(query: str, rows: int) -> str:
+        """Разворачивает однострочный INSERT в запрос на rows строк."""
+        match = VALUES_PATTERN.search(query)
+        if match is None:
+            raise ValueError('Запрос не содержит VALUES (...)')
+        values = ', '.join([match.group(1)] * rows)
+        return f'{query[:match.start(1)]}{values}{query[match.end(1):]}'
+
+    @staticmethod
+    def table_name(query: str) -> str:
+        """Возвращает название таблицы запроса INSERT."""
+        match = TABLE_PATTERN.search(query)
+        return match.group(1) if match else 'unknown'
+
+    def _chunks(self, params):
+        """Защищенный метод делит строки на порции по chunk_size."""
+        rows = iter(params)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield chunk
+
+    def load(self, cursor, query: str, params) -> int:
+        """
+        Загружает строки params порциями и возвращает количество
+        загруженных строк.
+        """
+        table = self.table_name(query)
+        start = time.perf_counter()
+        rows = 0
+        full_query = None
+        for chunk in self._chunks(params):
+            if len(chunk) == self.chunk_size:
+                if full_query is None:
+                    full_query = self.multirow_query(query, self.chunk_size)
+                chunk_query = full_query
+            else:
+                chunk_query = self.multirow_query(query, len(chunk))
+            cursor.execute(chunk_query, tuple(chain.from_iterable(chunk)))
+            rows += len(chunk)
+        stats = self.stats[table]
+        stats['rows'] += rows
+        stats['seconds'] += time.perf_counter() - start
+        return rows
+
+    def report(self) -> dict:
+        """
+        Возвращает и логирует статистику загрузки по таблицам:
+        строки, время и строки в секунду.
+        """
+        report = {}
+        for table, stats in self.stats.items():
+            seconds = stats['seconds']
+            report[table] = {
+                'rows': stats['rows'],
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(
+                    stats['rows'] / seconds if seconds else 0.0, 1
+                )
+            }
+            logging.info(
+                'Загрузка в %s: %s строк за %s сек. (%s строк/сек.)',
+                table,
+                report[table]['rows'],
+                report[table]['seconds'],
+                report[table]['rows_per_second']
+            )
+        return report
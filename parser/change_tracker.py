@@ -0,0 +1,177 @@
+import logging
+import zlib
+from collections import Counter, defaultdict
+from parser.bulk_loader import BulkLoader
+from parser.constants import (SELECT_PRODUCT_NAMES,
+                              SELECT_SHARED_PRODUCT_NAMES,
+                              SELECT_SHARED_STOCKS_FOR_DATE,
+                              SELECT_STOCKS_FOR_DATE)
+from parser.logging_config import setup_logging
+from parser.schema_registry import schema_registry
+
+setup_logging()
+
+
+class ChangeTracker:
+    """
+    Фильтр неизмененных строк справочника товаров и остатков магазина.
+
+    При первой записи товаров за запуск загружает из catalog_products
+    компактный хэш «артикул → CRC32 наименования», дальше пропускает
+    товары, наименование которых не изменилось. При diff_stocks=True
+    остатки сравниваются с уже записанными за ту же дату (повторная
+    выгрузка дня, пересечение периодов), и записываются только новые
+    или измененные строки. Строки, отобранные для записи, копятся
+    в изменениях транзакции (метод begin) и попадают в кэш только после
+    фиксации транзакции (метод commit), поэтому при откате или ошибке
+    commit кэш по-прежнему совпадает с базой.
+    При shared=True используются общие таблицы, строки которых
+    начинаются с shop_id магазина.
+    """
+
+    def __init__(
+        self,
+        shop_name: str,
+        diff_stocks: bool = True,
+        shared: bool = False
+    ):
+        self.products_table = f'catalog_products_{shop_name}'
+        self.stocks_table = f'reports_stocks_{shop_name}'
+        self.select_names = SELECT_PRODUCT_NAMES
+        self.select_stocks = SELECT_STOCKS_FOR_DATE
+        if shared:
+            self.products_table = 'catalog_products'
+            self.stocks_table = 'reports_stocks'
+            self.select_names = SELECT_SHARED_PRODUCT_NAMES
+            self.select_stocks = SELECT_SHARED_STOCKS_FOR_DATE
+        self.diff_stocks = diff_stocks
+        self.stats = defaultdict(Counter)
+        self._names = None
+        self._stocks_date = None
+        self._stocks = {}
+
+    @staticmethod
+    def _hash(name: str) -> int:
+        """Защищенный метод возвращает компактный хэш наименования."""
+        return zlib.crc32(name.encode('utf-8'))
+
+    def _load_names(self, cursor, key: tuple) -> dict:
+        """
+        Защищенный метод загружает хэши наименований товаров.
+        key - shop_id магазина для общих таблиц (пустой кортеж иначе).
+        """
+        if self._names is None:
+            self._names = {}
+            if schema_registry.exists(self.products_table):
+                cursor.execute(
+                    self.select_names.format(table_name=self.products_table),
+                    key
+                )
+                self._names = {
+                    article: self._hash(name)
+                    for article, name in cursor.fetchall()
+                }
+                logging.info(
+                    'Загружены хэши %s товаров из %s',
+                    len(self._names),
+                    self.products_table
+                )
+        return self._names
+
+    def _load_stocks(self, cursor, key: tuple, date) -> dict:
+        """Защищенный метод загружает остатки, записанные за дату."""
+        if self._stocks_date != date:
+            self._stocks = {}
+            if schema_registry.exists(self.stocks_table):
+                cursor.execute(
+                    self.select_stocks.format(table_name=self.stocks_table),
+                    (*key, date)
+                )
+                self._stocks = dict(cursor.fetchall())
+            self._stocks_date = date
+        return self._stocks
+
+    def _filter_products(self, cursor, params: list, pending: dict) -> list:
+        """Защищенный метод оставляет новые и переименованные товары."""
+        names = None
+        changed = []
+        for row in params:
+            *key, article, name = row
+            if names is None:
+                names = self._load_names(cursor, tuple(key))
+            name_hash = self._hash(name)
+            if pending.get(article, names.get(article)) != name_hash:
+                pending[article] = name_hash
+                changed.append(row)
+        return changed
+
+    def _filter_stocks(self, cursor, params: list, pending: dict) -> list:
+        """Защищенный метод оставляет новые и измененные остатки."""
+        changed = []
+        for row in params:
+            *key, date, article, stock = row
+            stocks = self._load_stocks(cursor, tuple(key), date)
+            if pending.get((date, article), stocks.get(article)) != stock:
+                pending[(date, article)] = stock
+                changed.append(row)
+        return changed
+
+    @staticmethod
+    def begin() -> dict:
+        """
+        Возвращает пустые изменения кэша для новой транзакции:
+        хэши наименований и остатки отобранных для записи строк.
+        """
+        return {'names': {}, 'stocks': {}}
+
+    def filter(
+        self,
+        cursor,
+        query: str,
+        params: list,
+        pending: dict
+    ) -> list:
+        """
+        Возвращает строки params, которые нужно записать запросом query,
+        и запоминает их в изменениях транзакции pending (см. begin).
+        Строки других таблиц возвращаются без изменений.
+        """
+        table = BulkLoader.table_name(query)
+        if table == self.products_table:
+            changed = self._filter_products(cursor, params, pending['names'])
+        elif table == self.stocks_table and self.diff_stocks:
+            changed = self._filter_stocks(cursor, params, pending['stocks'])
+        else:
+            return params
+        self.stats[table]['written'] += len(changed)
+        self.stats[table]['skipped'] += len(params) - len(changed)
+        return changed
+
+    def commit(self, pending: dict) -> None:
+        """
+        Переносит в кэш изменения транзакции pending
+        после ее успешной фиксации.
+        """
+        if self._names is not None:
+            self._names.update(pending['names'])
+        for (date, article), stock in pending['stocks'].items():
+            if date == self._stocks_date:
+                self._stocks[article] = stock
+
+    def reset(self) -> None:
+        """Сбрасывает кэш: при следующей записи он загрузится из базы."""
+        self._names = None
+        self._stocks_date = None
+        self._stocks = {}
+
+    def report(self) -> dict:
+        """Возвращает и логирует количество записанных и пропущенных строк."""
+        report = {table: dict(stats) for table, stats in self.stats.items()}
+        for table, stats in report.items():
+            logging.info(
+                'Таблица %s: записано строк %s, пропущено без изменений %s',
+                table,
+                stats.get('written', 0),
+                stats.get('skipped', 0)
+            )
+        return report
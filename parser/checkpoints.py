@@ -0,0 +1,117 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Iterator
+from contextlib import suppress
+from parser.constants import CHECKPOINT_TTL
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+
+class PaginationCheckpoint:
+    """
+    Контрольные точки постраничной выгрузки отчетов.
+
+    Для каждой выгрузки (магазин, отчет, дата) хранит состояние пагинации
+    (offset для остатков, lastChangeDate для продаж) и уже полученные
+    страницы. Перезапущенная выгрузка сначала отдает сохраненные страницы,
+    а затем продолжает запросы с места остановки. После успешного
+    завершения выгрузки контрольная точка удаляется.
+    """
+
+    def __init__(
+        self,
+        folder: str = 'checkpoints',
+        ttl: float = CHECKPOINT_TTL
+    ):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self._remove_stale(ttl)
+
+    def _remove_stale(self, ttl: float) -> None:
+        """
+        Защищенный метод удаляет контрольные точки, которые так и не были
+        использованы для продолжения выгрузки за время ttl. Файл могут
+        одновременно удалять несколько потоков, создающих контрольные
+        точки, поэтому уже удаленные файлы пропускаются.
+        """
+        now = time.time()
+        for entry in os.scandir(self.folder):
+            with suppress(FileNotFoundError):
+                if now - entry.stat().st_mtime > ttl:
+                    os.remove(entry.path)
+
+    def _base(self, shop_name: str, report: str, key: str) -> str:
+        """Защищенный метод возвращает общий префикс файлов выгрузки."""
+        name = re.sub(r'[^\w-]', '-', f'{shop_name}_{report}_{key}')
+        return os.path.join(self.folder, name)
+
+    def _read_state(self, base: str):
+        """Защищенный метод читает состояние пагинации из файла."""
+        try:
+            with open(f'{base}.state.json', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, shop_name: str, report: str, key: str):
+        """
+        Возвращает сохраненное состояние пагинации или None,
+        если выгрузка начинается с начала.
+        """
+        state = self._read_state(self._base(shop_name, report, key))
+        if state:
+            logging.info(
+                'Продолжение выгрузки %s магазина %s с контрольной '
+                'точки: %s',
+                report,
+                shop_name,
+                state
+            )
+        return state
+
+    def pages(self, shop_name: str, report: str, key: str) -> Iterator:
+        """Поочередно отдает страницы, полученные до остановки выгрузки."""
+        base = self._base(shop_name, report, key)
+        state = self._read_state(base) or {'pages': 0}
+        for number in range(state['pages']):
+            with gzip.open(
+                f'{base}.{number}.json.gz', 'rt', encoding='utf-8'
+            ) as file:
+                yield json.load(file)
+
+    def save_page(
+        self,
+        shop_name: str,
+        report: str,
+        key: str,
+        state: dict,
+        page: list
+    ) -> None:
+        """
+        Сохраняет полученную страницу и новое состояние пагинации.
+        Состояние записывается после страницы, поэтому при сбое между
+        ними страница будет просто запрошена повторно.
+        """
+        base = self._base(shop_name, report, key)
+        number = (self._read_state(base) or {'pages': 0})['pages']
+        with gzip.open(
+            f'{base}.{number}.json.gz', 'wt', encoding='utf-8'
+        ) as file:
+            json.dump(page, file, ensure_ascii=False)
+        tmp_path = f'{base}.state.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({**state, 'pages': number + 1}, file)
+        os.replace(tmp_path, f'{base}.state.json')
+
+    def clear(self, shop_name: str, report: str, key: str) -> None:
+        """Удаляет контрольную точку успешно завершенной выгрузки."""
+        base = glob.escape(self._base(shop_name, report, key))
+        for path in glob.glob(f'{base}.*'):
+            with suppress(FileNotFoundError):
+                os.remove(path)
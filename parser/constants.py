@@ -21,18 +21,198 @@ DATE_FORMAT = '%Y-%m-%d'
 
 TIME_FORMAT = '%H:%M:%S'
 
+SALES_FIELDS = (
+    'srid', 'nmId', 'date', 'lastChangeDate', 'isRealization', 'isCancel'
+)
+"""Поля заказа, которые извлекаются из отчета о продажах."""
+
 DATA_PAGE_LIMIT = 100
 """Пагинация. Лимит данных на страницу."""
 
 MAX_RETRYING = 10
 """Максимально допустимое количество попыток запроса к серверу."""
 
+RETRY_STRATEGIES = {
+    None: (1, 60, MAX_RETRYING),
+    429: (0, 0, MAX_RETRYING),
+    502: (1, 60, MAX_RETRYING),
+    503: (1, 60, MAX_RETRYING),
+    504: (1, 60, MAX_RETRYING),
+}
+"""
+Стратегии повторных запросов по кодам ответа: (начальная задержка,
+предельная задержка в секундах, количество попыток). Ключ None -
+сетевые ошибки без HTTP-ответа (таймауты, разрывы соединения);
+остальные ошибки без ответа клиенты API не повторяют. При 429 время
+ожидания определяет ограничитель запросов по заголовкам ответа,
+а не задержка стратегии, поэтому суммарное время ожидания MAX_RETRY_TIME
+на 429 не распространяется и повторы ограничены количеством попыток:
+десять ответов 429 подряд, несмотря на ожидание по заголовкам, означают
+исчерпанную квоту токена, и поток не занимается магазином бесконечно.
+"""
+
+MAX_RETRY_TIME = 15 * 60
+"""Предельное суммарное время ожидания повторов одного магазина в секундах."""
+
+BREAKER_THRESHOLD = 5
+"""Количество ошибок сервера подряд, после которого хост приостанавливается."""
+
+BREAKER_COOLDOWN = 60
+"""Время приостановки запросов к недоступному хосту в секундах."""
+
 DAYS = 14
 """Количество дней."""
 
 MAX_BYTE_SIZE = 1024
 """Максимальный размер токена в байтах."""
 
+RATE_LIMITS = {
+    'statistics-api.wildberries.ru': (1, 60),
+    'seller-analytics-api.wildberries.ru': (3, 20),
+}
+"""
+Квоты API Wildberries по хостам: (размер всплеска, интервал
+восстановления одного запроса в секундах).
+"""
+
+DEFAULT_RATE_LIMIT = (1, 60)
+"""Квота для хостов, отсутствующих в RATE_LIMITS."""
+
+REQUEST_TIMEOUT = (10, 120)
+"""Таймауты запроса к API в секундах: (подключение, чтение)."""
+
+RUN_TIMEOUT = 4 * 60 * 60
+"""Предельное время работы одного клиента API в секундах."""
+
+POOL_CONNECTIONS = 2
+"""Количество хостов API, для которых кэшируются пулы соединений."""
+
+POOL_MAXSIZE = 4
+"""Максимальное количество соединений в пуле одного хоста."""
+
+CACHE_TTL = 24 * 60 * 60
+"""Время жизни страницы в кэше ответов API в секундах."""
+
+CACHE_MAX_SIZE = 1024 * 1024 * 1024
+"""Максимальный размер кэша ответов API в байтах."""
+
+CACHE_EVICT_INTERVAL = 500
+"""
+Количество записей в кэш ответов API, после которого каталог кэша
+проверяется на устаревшие записи, даже если размер кэша не превышен.
+"""
+
+CHECKPOINT_TTL = 7 * 24 * 60 * 60
+"""Время хранения неиспользованной контрольной точки выгрузки в секундах."""
+
+MAX_WORKERS = 4
+"""Количество магазинов, обрабатываемых параллельно."""
+
+PROCESSES = 1
+"""Количество процессов, между которыми распределяются магазины."""
+
+ASYNC_MAX_SHOPS = 100
+"""Количество магазинов, обрабатываемых одновременно в асинхронном режиме."""
+
+DAYS_PER_COMMIT = 1
+"""Количество дней выгрузки за период, записываемых одной транзакцией."""
+
+DIFF_STOCKS = True
+"""Пропускать остатки, не изменившиеся с прошлой записи за ту же дату."""
+
+PARTITIONED_REPORTS = False
+"""
+Создавать таблицы reports_stocks и reports_sales секционированными
+по месяцам. Секционированные таблицы создаются без внешних ключей.
+"""
+
+PARTITION_RETENTION_MONTHS = 24
+"""
+Количество месяцев, за которые хранятся секции отчетов
+(0 - секции не удаляются).
+"""
+
+PARTITION_PREMAKE_MONTHS = 3
+"""Количество будущих месяцев, секции которых создаются заранее."""
+
+PARTITION_ARCHIVE = False
+"""Переносить устаревшие секции в архивные таблицы вместо удаления."""
+
+ROLLUP_PERIODS = ('weekly', 'monthly')
+"""Периоды агрегатов отчетов: неделя (с понедельника) и месяц."""
+
+SHARED_SCHEMA = False
+"""
+Хранить данные всех магазинов в общих таблицах с ключом shop_id
+вместо отдельных таблиц для каждого магазина.
+"""
+
+SHOPS_TABLE_NAME = 'shops'
+"""Название таблицы магазинов общей схемы."""
+
+MIGRATION_BATCH_SIZE = 10000
+"""Количество строк, переносимых в общие таблицы одной транзакцией."""
+
+PURGE_CHUNK_SIZE = 10000
+"""Количество строк, удаляемых одной транзакцией при очистке данных."""
+
+PURGE_PAUSE = 0.1
+"""Пауза между порциями удаления в секундах (снижает нагрузку на БД)."""
+
+BULK_CHUNK_SIZE = 1000
+"""Количество строк в одном многострочном запросе INSERT."""
+
+DB_POOL_SIZE = 16
+"""Максимальное количество подключений в пуле подключений к базе данных."""
+
+DB_POOL_TIMEOUT = 60
+"""Время ожидания свободного подключения из пула в секундах."""
+
+DB_CONNECTIONS_PER_WORKER = 3
+"""
+Количество подключений к базе данных, которые один поток обработки
+магазина держит одновременно: транзакция записи дня, вложенное
+подключение создания таблиц (реестр схемы вызывается при подготовке
+запросов и пересчете агрегатов) и продление аренды задания очереди
+(heartbeat). Пул процесса должен вмещать столько подключений на поток.
+"""
+
+DB_POOL_PING_INTERVAL = 30
+"""Время простоя подключения в пуле, после которого оно проверяется ping."""
+
+WORK_QUEUE_TABLE_NAME = 'work_queue'
+"""Название таблицы очереди заданий выгрузки."""
+
+REPORTS = ('stocks', 'sales')
+"""Типы отчетов, на которые делится выгрузка магазина за дату."""
+
+LEASE_TIME = 10 * 60
+"""Время аренды задания очереди в секундах без продления."""
+
+HEARTBEAT_INTERVAL = 60
+"""Интервал продления аренды задания очереди в секундах."""
+
+MAX_ITEM_ATTEMPTS = 3
+"""Количество попыток выполнения задания очереди."""
+
+CLAIM_RETRY_PAUSE = 5
+"""
+Начальная пауза в секундах перед повторной попыткой получить задание
+очереди после ошибки базы данных (растет с каждой ошибкой подряд).
+"""
+
+MAX_CLAIM_ERRORS = 5
+"""
+Количество ошибок получения задания очереди подряд, после которого
+поток обработки заданий завершает работу.
+"""
+
+PIPELINE_QUEUE_SIZE = 8
+"""Емкость очередей между стадиями конвейера выгрузки."""
+
+PIPELINE_POLL_INTERVAL = 0.1
+"""Интервал проверки остановки конвейера при ожидании очереди в секундах."""
+
 CREATE_TOKEN_TABLE = '''
     CREATE TABLE IF NOT EXISTS {table_name_token} (
     `id` int(11) NOT NULL AUTO_INCREMENT,
@@ -44,6 +224,65 @@ CREATE_TOKEN_TABLE = '''
 '''
 """SQL запрос для создания модели токенов."""
 
+SELECT_PRODUCT_NAMES = '''
+    SELECT article, name FROM {table_name}
+'''
+"""SQL запрос для получения наименований товаров магазина."""
+
+SELECT_STOCKS_FOR_DATE = '''
+    SELECT article, stock FROM {table_name} WHERE date = %s
+'''
+"""SQL запрос для получения остатков магазина за дату."""
+
+SELECT_FOREIGN_KEYS = '''
+    SELECT TABLE_NAME, REFERENCED_TABLE_NAME
+    FROM information_schema.REFERENTIAL_CONSTRAINTS
+    WHERE CONSTRAINT_SCHEMA = DATABASE()
+'''
+"""SQL запрос для получения связей таблиц по внешним ключам."""
+
+DELETE_CHUNK = '''
+    DELETE FROM {table_name} {condition} LIMIT {limit}
+'''
+"""SQL запрос для удаления одной порции строк таблицы."""
+
+SELECT_TABLE_ROWS = '''
+    SELECT TABLE_ROWS FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+'''
+"""SQL запрос для оценки количества строк таблицы."""
+
+TRUNCATE_TABLE = '''
+    TRUNCATE TABLE {table_name}
+'''
+"""SQL запрос для быстрой очистки таблицы целиком."""
+
+SELECT_TABLES = '''
+    SELECT TABLE_NAME FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE()
+'''
+"""SQL запрос для получения списка таблиц текущей базы данных."""
+
+CREATE_WORK_QUEUE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `id` int(11) NOT NULL AUTO_INCREMENT,
+    `shop_name` varchar(255) NOT NULL,
+    `date` date NOT NULL,
+    `report` varchar(32) NOT NULL,
+    `status` varchar(16) NOT NULL DEFAULT 'pending',
+    `worker` varchar(255) DEFAULT NULL,
+    `lease_until` datetime DEFAULT NULL,
+    `attempts` int(11) NOT NULL DEFAULT '0',
+    `error` text,
+    `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `shop_date_report` (`shop_name`,`date`,`report`),
+    KEY `status_lease` (`status`,`lease_until`)
+);
+'''
+"""SQL запрос для создания модели очереди заданий выгрузки."""
+
 CREATE_DATES_TABLE = '''
     CREATE TABLE IF NOT EXISTS {table_name} (
     `id` int(11) NOT NULL AUTO_INCREMENT,
@@ -112,6 +351,381 @@ CREATE_STOCKS_TABLE = '''
 '''
 """SQL запрос для создания модели остатков."""
 
+CREATE_PARTITIONED_SALES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `sale` float DEFAULT '0',
+    PRIMARY KEY (`date`,`article`),
+    KEY `article` (`article`)
+)
+PARTITION BY RANGE COLUMNS(`date`) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+'''
+"""
+SQL запрос для создания модели продаж, секционированной по дате.
+Секции по месяцам создает PartitionManager.
+"""
+
+CREATE_PARTITIONED_STOCKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `stock` int(10) unsigned NOT NULL DEFAULT '0',
+    PRIMARY KEY (`date`,`article`),
+    KEY `article` (`article`)
+)
+PARTITION BY RANGE COLUMNS(`date`) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+'''
+"""
+SQL запрос для создания модели остатков, секционированной по дате.
+Секции по месяцам создает PartitionManager.
+"""
+
+PARTITION_BY_DATE = '''
+PARTITION BY RANGE COLUMNS(`date`) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+)'''
+"""Секционирование общей таблицы отчетов по дате (см. PartitionManager)."""
+
+CREATE_SHOPS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `id` int(11) NOT NULL AUTO_INCREMENT,
+    `shop_name` varchar(255) NOT NULL,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `shop_name` (`shop_name`)
+);
+'''
+"""SQL запрос для создания модели магазинов общей схемы."""
+
+CREATE_SHARED_PRODUCTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `name` varchar(255) NOT NULL,
+    PRIMARY KEY (`shop_id`,`article`),
+    FULLTEXT KEY `name` (`name`)
+);
+'''
+"""SQL запрос для создания общей модели продуктов."""
+
+CREATE_SHARED_SALES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `sale` float DEFAULT '0',
+    PRIMARY KEY (`shop_id`,`date`,`article`),
+    KEY `shop_article` (`shop_id`,`article`,`date`),
+    KEY `date` (`date`)
+){partitioning};
+'''
+"""
+SQL запрос для создания общей модели продаж. Первичный ключ
+начинается с shop_id, поэтому данные магазина хранятся компактно,
+а индекс по дате обслуживает аналитику по всем магазинам.
+"""
+
+CREATE_SHARED_STOCKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `stock` int(10) unsigned NOT NULL DEFAULT '0',
+    PRIMARY KEY (`shop_id`,`date`,`article`),
+    KEY `shop_article` (`shop_id`,`article`,`date`),
+    KEY `date` (`date`)
+){partitioning};
+'''
+"""SQL запрос для создания общей модели остатков."""
+
+CREATE_SHARED_ORDERS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `srid` varchar(64) NOT NULL,
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `is_sale` tinyint(1) NOT NULL DEFAULT '0',
+    PRIMARY KEY (`shop_id`,`srid`),
+    KEY `shop_date_article` (`shop_id`,`date`,`article`)
+);
+'''
+"""SQL запрос для создания общей модели заказов."""
+
+CREATE_SHARED_CURSORS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `report` varchar(32) NOT NULL,
+    `last_change_date` varchar(32) NOT NULL,
+    PRIMARY KEY (`shop_id`,`report`)
+);
+'''
+"""SQL запрос для создания общей модели курсоров инкрементальной выгрузки."""
+
+INSERT_SHOP = '''
+    INSERT IGNORE INTO {table_name} (shop_name) VALUES (%s)
+'''
+"""SQL запрос для регистрации магазина в общей схеме."""
+
+SELECT_SHOP_ID = '''
+    SELECT id FROM {table_name} WHERE shop_name = %s
+'''
+"""SQL запрос для получения идентификатора магазина."""
+
+INSERT_SHARED_PRODUCTS = '''
+    INSERT INTO {table_name} (shop_id, article, name)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    name = VALUES(name)
+'''
+"""SQL запрос для наполнения данными общей модели продуктов."""
+
+INSERT_SHARED_STOCKS = '''
+    INSERT INTO {table_name} (shop_id, date, article, stock)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    stock = VALUES(stock)
+'''
+"""SQL запрос для наполнения данными общей модели остатков."""
+
+INSERT_SHARED_SALES = '''
+    INSERT INTO {table_name} (shop_id, date, article, sale)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    sale = VALUES(sale)
+'''
+"""SQL запрос для наполнения данными общей модели продаж."""
+
+INSERT_SHARED_ORDERS = '''
+    INSERT INTO {table_name} (shop_id, srid, date, article, is_sale)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    date = VALUES(date),
+    article = VALUES(article),
+    is_sale = VALUES(is_sale)
+'''
+"""SQL запрос для наполнения данными общей модели заказов."""
+
+INSERT_SHARED_CURSOR = '''
+    INSERT INTO {table_name} (shop_id, report, last_change_date)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    last_change_date = VALUES(last_change_date)
+'''
+"""SQL запрос для сохранения курсора в общей схеме."""
+
+SELECT_SHARED_CURSOR = '''
+    SELECT last_change_date FROM {table_name}
+    WHERE shop_id = %s AND report = %s
+'''
+"""SQL запрос для получения курсора из общей схемы."""
+
+DELETE_SHARED_OLD_ORDERS = '''
+    DELETE FROM {table_name} WHERE shop_id = %s AND date < %s
+'''
+"""SQL запрос для удаления заказов магазина за пределами окна расчета."""
+
+SELECT_SHARED_SALES_COUNTS = '''
+    SELECT article, COUNT(*) FROM {table_name}
+    WHERE shop_id = %s AND is_sale = 1 AND date BETWEEN %s AND %s
+    GROUP BY article
+'''
+"""SQL запрос для подсчета продаж магазина по артикулам за период."""
+
+SELECT_SHARED_PRODUCT_NAMES = '''
+    SELECT article, name FROM {table_name} WHERE shop_id = %s
+'''
+"""SQL запрос для получения наименований товаров магазина общей схемы."""
+
+SELECT_SHARED_STOCKS_FOR_DATE = '''
+    SELECT article, stock FROM {table_name}
+    WHERE shop_id = %s AND date = %s
+'''
+"""SQL запрос для получения остатков магазина общей схемы за дату."""
+
+SELECT_BATCH = '''
+    SELECT {columns} FROM {table_name} {condition}
+    ORDER BY {key} LIMIT {limit}
+'''
+"""SQL запрос для чтения порции строк таблицы по возрастанию ключа."""
+
+CREATE_ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `period_start` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `stock_days` int(11) NOT NULL DEFAULT '0',
+    `avg_stock` float DEFAULT NULL,
+    `min_stock` int(10) unsigned DEFAULT NULL,
+    `max_stock` int(10) unsigned DEFAULT NULL,
+    `sales_days` int(11) NOT NULL DEFAULT '0',
+    `total_sales` float DEFAULT NULL,
+    `avg_sales` float DEFAULT NULL,
+    PRIMARY KEY (`period_start`,`article`),
+    KEY `article` (`article`,`period_start`)
+);
+'''
+"""
+SQL запрос для создания модели агрегатов остатков и продаж
+по артикулам за неделю или месяц.
+"""
+
+CREATE_SHARED_ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `shop_id` int(11) NOT NULL,
+    `period_start` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `stock_days` int(11) NOT NULL DEFAULT '0',
+    `avg_stock` float DEFAULT NULL,
+    `min_stock` int(10) unsigned DEFAULT NULL,
+    `max_stock` int(10) unsigned DEFAULT NULL,
+    `sales_days` int(11) NOT NULL DEFAULT '0',
+    `total_sales` float DEFAULT NULL,
+    `avg_sales` float DEFAULT NULL,
+    PRIMARY KEY (`shop_id`,`period_start`,`article`),
+    KEY `shop_article` (`shop_id`,`article`,`period_start`)
+);
+'''
+"""SQL запрос для создания общей модели агрегатов остатков и продаж."""
+
+DELETE_ROLLUP_PERIOD = '''
+    DELETE FROM {table_name} WHERE period_start = %s
+'''
+"""SQL запрос для удаления агрегатов периода перед пересчетом."""
+
+DELETE_SHARED_ROLLUP_PERIOD = '''
+    DELETE FROM {table_name} WHERE shop_id = %s AND period_start = %s
+'''
+"""SQL запрос для удаления агрегатов периода магазина перед пересчетом."""
+
+ROLLUP_STOCKS = '''
+    INSERT INTO {table_name} (
+    period_start, article, stock_days, avg_stock, min_stock, max_stock
+    )
+    SELECT %s, article, COUNT(*), AVG(stock), MIN(stock), MAX(stock)
+    FROM {source_table}
+    WHERE date >= %s AND date < %s
+    GROUP BY article
+'''
+"""SQL запрос для расчета агрегатов остатков за период."""
+
+ROLLUP_SALES = '''
+    INSERT INTO {table_name} (
+    period_start, article, sales_days, total_sales, avg_sales
+    )
+    SELECT %s, article, COUNT(*), SUM(sale), AVG(sale)
+    FROM {source_table}
+    WHERE date >= %s AND date < %s
+    GROUP BY article
+    ON DUPLICATE KEY UPDATE
+    sales_days = VALUES(sales_days),
+    total_sales = VALUES(total_sales),
+    avg_sales = VALUES(avg_sales)
+'''
+"""SQL запрос для расчета агрегатов продаж за период."""
+
+SHARED_ROLLUP_STOCKS = '''
+    INSERT INTO {table_name} (
+    shop_id, period_start, article,
+    stock_days, avg_stock, min_stock, max_stock
+    )
+    SELECT shop_id, %s, article,
+    COUNT(*), AVG(stock), MIN(stock), MAX(stock)
+    FROM {source_table}
+    WHERE shop_id = %s AND date >= %s AND date < %s
+    GROUP BY shop_id, article
+'''
+"""SQL запрос для расчета агрегатов остатков магазина общей схемы."""
+
+SHARED_ROLLUP_SALES = '''
+    INSERT INTO {table_name} (
+    shop_id, period_start, article, sales_days, total_sales, avg_sales
+    )
+    SELECT shop_id, %s, article, COUNT(*), SUM(sale), AVG(sale)
+    FROM {source_table}
+    WHERE shop_id = %s AND date >= %s AND date < %s
+    GROUP BY shop_id, article
+    ON DUPLICATE KEY UPDATE
+    sales_days = VALUES(sales_days),
+    total_sales = VALUES(total_sales),
+    avg_sales = VALUES(avg_sales)
+'''
+"""SQL запрос для расчета агрегатов продаж магазина общей схемы."""
+
+SELECT_DATE_RANGE = '''
+    SELECT MIN(date), MAX(date) FROM {table_name}
+'''
+"""SQL запрос для получения периода данных таблицы отчета."""
+
+SELECT_SHARED_DATE_RANGE = '''
+    SELECT MIN(date), MAX(date) FROM {table_name} WHERE shop_id = %s
+'''
+"""SQL запрос для получения периода данных магазина в общей таблице."""
+
+SELECT_PARTITIONS = '''
+    SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+'''
+"""SQL запрос для получения секций таблицы."""
+
+ADD_PARTITIONS = '''
+    ALTER TABLE {table_name} REORGANIZE PARTITION pmax INTO (
+    {partitions},
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+    )
+'''
+"""SQL запрос для создания секций перед секцией pmax."""
+
+DROP_PARTITIONS = '''
+    ALTER TABLE {table_name} DROP PARTITION {partitions}
+'''
+"""SQL запрос для удаления секций вместе с данными."""
+
+CREATE_ARCHIVE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {archive_table} LIKE {table_name}
+'''
+"""SQL запрос для создания архивной таблицы по образцу таблицы отчета."""
+
+REMOVE_PARTITIONING = '''
+    ALTER TABLE {archive_table} REMOVE PARTITIONING
+'''
+"""SQL запрос для снятия секционирования с архивной таблицы."""
+
+EXCHANGE_PARTITION = '''
+    ALTER TABLE {table_name} EXCHANGE PARTITION {partition}
+    WITH TABLE {archive_table}
+'''
+"""SQL запрос для переноса данных секции в архивную таблицу."""
+
+CREATE_ORDERS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `srid` varchar(64) NOT NULL,
+    `date` date NOT NULL,
+    `article` bigint(20) unsigned NOT NULL,
+    `is_sale` tinyint(1) NOT NULL DEFAULT '0',
+    PRIMARY KEY (`srid`),
+    KEY `date_article` (`date`,`article`)
+);
+'''
+"""
+SQL запрос для создания модели заказов. Хранит по одной компактной
+строке на заказ для инкрементального расчета средних продаж.
+"""
+
+CREATE_CURSORS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+    `report` varchar(32) NOT NULL,
+    `last_change_date` varchar(32) NOT NULL,
+    PRIMARY KEY (`report`)
+);
+'''
+"""SQL запрос для создания модели курсоров инкрементальной выгрузки."""
+
 INSERT_DATES = '''
     INSERT INTO {table_name} (
     full_date,
@@ -156,3 +770,103 @@ INSERT_TOKEN = '''
     token = VALUES(token)
 '''
 """SQL запрос для наполнения данными модели токенов."""
+
+INSERT_ORDERS = '''
+    INSERT INTO {table_name} (srid, date, article, is_sale)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    date = VALUES(date),
+    article = VALUES(article),
+    is_sale = VALUES(is_sale)
+'''
+"""SQL запрос для наполнения данными модели заказов."""
+
+DELETE_OLD_ORDERS = '''
+    DELETE FROM {table_name} WHERE date < %s
+'''
+"""SQL запрос для удаления заказов за пределами окна расчета."""
+
+SELECT_SALES_COUNTS = '''
+    SELECT article, COUNT(*) FROM {table_name}
+    WHERE is_sale = 1 AND date BETWEEN %s AND %s
+    GROUP BY article
+'''
+"""SQL запрос для подсчета продаж по артикулам за период."""
+
+INSERT_CURSOR = '''
+    INSERT INTO {table_name} (report, last_change_date)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE
+    last_change_date = VALUES(last_change_date)
+'''
+"""SQL запрос для сохранения курсора инкрементальной выгрузки."""
+
+SELECT_CURSOR = '''
+    SELECT last_change_date FROM {table_name} WHERE report = %s
+'''
+"""SQL запрос для получения курсора инкрементальной выгрузки."""
+
+SALES_CURSOR = 'sales'
+"""Название курсора отчета о продажах."""
+
+INSERT_WORK_ITEM = '''
+    INSERT IGNORE INTO {table_name} (shop_name, date, report)
+    VALUES (%s, %s, %s)
+'''
+"""SQL запрос для постановки задания в очередь (повторно не ставится)."""
+
+EXPIRE_WORK_ITEMS = '''
+    UPDATE {table_name} SET status = 'failed', worker = NULL
+    WHERE status = 'leased' AND lease_until < NOW() AND attempts >= %s
+'''
+"""
+SQL запрос для отметки заданий, аренда которых истекла
+после последней попытки.
+"""
+
+SELECT_WORK_ITEM = '''
+    SELECT id, shop_name, date, report FROM {table_name}
+    WHERE status = 'pending'
+    OR (status = 'leased' AND lease_until < NOW())
+    ORDER BY id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+'''
+"""
+SQL запрос для выбора свободного задания (новое или с истекшей
+арендой). Задания, заблокированные другими процессами, пропускаются.
+"""
+
+LEASE_WORK_ITEM = '''
+    UPDATE {table_name}
+    SET status = 'leased', worker = %s,
+    lease_until = NOW() + INTERVAL %s SECOND,
+    attempts = attempts + 1
+    WHERE id = %s
+'''
+"""SQL запрос для аренды задания очереди."""
+
+EXTEND_LEASE = '''
+    UPDATE {table_name}
+    SET lease_until = NOW() + INTERVAL %s SECOND
+    WHERE id = %s AND worker = %s AND status = 'leased'
+'''
+"""SQL запрос для продления аренды задания очереди."""
+
+COMPLETE_WORK_ITEM = '''
+    UPDATE {table_name}
+    SET status = 'done', lease_until = NULL, error = NULL
+    WHERE id = %s AND worker = %s
+'''
+"""SQL запрос для отметки выполненного задания очереди."""
+
+FAIL_WORK_ITEM = '''
+    UPDATE {table_name}
+    SET status = IF(attempts >= %s, 'failed', 'pending'),
+    worker = NULL, lease_until = NULL, error = %s
+    WHERE id = %s AND worker = %s
+'''
+"""
+SQL запрос для возврата задания в очередь после ошибки
+(или отметки о неудаче после последней попытки).
+"""
@@ -0,0 +1,200 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from parser.constants import (DB_CONNECTIONS_PER_WORKER, DB_POOL_PING_INTERVAL,
+                              DB_POOL_SIZE, DB_POOL_TIMEOUT)
+from parser.db_config import config
+from parser.exceptions import ConnectionPoolError
+from parser.logging_config import setup_logging
+
+import mysql.connector
+
+setup_logging()
+
+
+class ConnectionPool:
+    """
+    Пул подключений к MySQL на время одного запуска парсера.
+
+    Подключение выдается на одну единицу работы (вызов функции
+    с декоратором connection_db) и после commit/rollback возвращается
+    в пул, поэтому семантика транзакций не меняется. Подключение,
+    простоявшее в пуле дольше ping_interval секунд, перед выдачей
+    проверяется ping; разорванные подключения заменяются новыми.
+    Если все size подключений заняты, запрос ждет освобождения
+    не дольше timeout секунд.
+    """
+
+    def __init__(
+        self,
+        size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        ping_interval: float = DB_POOL_PING_INTERVAL
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.pid = os.getpid()
+        self.stats = Counter()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @staticmethod
+    def _connect():
+        """Защищенный метод открывает новое подключение к базе данных."""
+        return mysql.connector.connect(**config)
+
+    def _healthy(self, connection, idle_since: float) -> bool:
+        """
+        Защищенный метод проверяет подключение, простоявшее в пуле
+        дольше ping_interval секунд.
+        """
+        if time.monotonic() - idle_since < self.ping_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception as error:
+            logging.warning('Подключение из пула недоступно: %s', error)
+            return False
+
+    def _discard(self, connection) -> None:
+        """Защищенный метод закрывает подключение, не возвращая в пул."""
+        self.stats['discarded'] += 1
+        try:
+            connection.close()
+        except Exception as error:
+            logging.debug('Ошибка закрытия подключения: %s', error)
+
+    def acquire(self):
+        """Выдает подключение из пула (или открывает новое)."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ConnectionPoolError(
+                f'Нет свободных подключений к базе данных '
+                f'за {self.timeout} сек.'
+            )
+        try:
+            while True:
+                try:
+                    connection, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    self.stats['created'] += 1
+                    return self._connect()
+                if self._healthy(connection, idle_since):
+                    self.stats['reused'] += 1
+                    return connection
+                self._discard(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, broken: bool = False) -> None:
+        """
+        Возвращает подключение в пул. Разорванное подключение
+        (broken=True) закрывается.
+        """
+        try:
+            if broken:
+                self._discard(connection)
+            else:
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def detach(self) -> list:
+        """
+        Забирает из пула свободные подключения, не закрывая их.
+        Используется в дочернем процессе для подключений родителя.
+        """
+        connections = []
+        while True:
+            try:
+                connections.append(self._idle.get_nowait()[0])
+            except queue.Empty:
+                return connections
+
+    def close(self) -> None:
+        """Закрывает все свободные подключения пула."""
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception as error:
+                logging.debug('Ошибка закрытия подключения: %s', error)
+        logging.info('Статистика пула подключений к БД: %s', dict(self.stats))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_inherited = []
+"""
+Подключения пула родительского процесса, унаследованные при fork.
+Ссылки на них хранятся до завершения дочернего процесса: при сборке
+мусора подключение выполняет shutdown сокета, общего с родителем,
+и разрывает его подключение.
+"""
+
+
+def pool_size(max_workers: int, size: int = DB_POOL_SIZE) -> int:
+    """
+    Возвращает размер пула для max_workers потоков обработки магазинов.
+    Каждому потоку нужно DB_CONNECTIONS_PER_WORKER подключений, иначе
+    вложенные подключения ждут друг друга до ConnectionPoolError;
+    заданный размер size меньше этого увеличивается с предупреждением.
+    """
+    required = max(max_workers, 1) * DB_CONNECTIONS_PER_WORKER
+    if size >= required:
+        return size
+    logging.warning(
+        'Размер пула подключений %s меньше необходимого для %s потоков, '
+        'используется %s',
+        size,
+        max_workers,
+        required
+    )
+    return required
+
+
+def init_pool(size: int = DB_POOL_SIZE) -> ConnectionPool:
+    """
+    Создает пул подключений на время запуска. Пока пул не создан,
+    connection_db открывает отдельное подключение на каждый вызов.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = ConnectionPool(size)
+        return _pool
+
+
+def get_pool():
+    """
+    Возвращает пул подключений текущего процесса или None, если пул
+    не создан. Дочерний процесс не использует подключения родителя
+    и не закрывает их (см. _inherited), а создает собственный пул
+    того же размера.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid != os.getpid():
+            _inherited.extend(_pool.detach())
+            _pool = ConnectionPool(
+                _pool.size, _pool.timeout, _pool.ping_interval
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    """Закрывает пул подключений по завершении запуска."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
@@ -5,6 +5,7 @@ import time
 from datetime import datetime as dt
 from parser.constants import DATE_FORMAT, TIME_FORMAT
 from parser.db_config import config
+from parser.db_pool import get_pool
 from parser.logging_config import setup_logging
 
 import mysql.connector
@@ -48,6 +49,8 @@ def connection_db(func):
     Подключается к базе данных, обрабатывает ошибки в процессе подключения,
     логирует все успешные/неуспешные действия, вызывает функцию, выполняющую
     действия в базе данных и закрывает подключение.
+    Если создан пул подключений (parser.db_pool.init_pool), подключение
+    берется из пула и после commit/rollback возвращается в него.
 
     Args:
         func (callable): Декорируемая функция, которая выполняет
@@ -58,10 +61,14 @@ def connection_db(func):
         подключения к базе данных и логирования.
     """
     def wrapper(*args, **kwargs):
+        pool = get_pool()
         connection = None
         cursor = None
         try:
-            connection = mysql.connector.connect(**config)
+            if pool is not None:
+                connection = pool.acquire()
+            else:
+                connection = mysql.connector.connect(**config)
             cursor = connection.cursor()
             kwargs['cursor'] = cursor
             result = func(*args, **kwargs)
@@ -75,7 +82,9 @@ def connection_db(func):
         finally:
             if cursor:
                 cursor.close()
-            if connection and connection.is_connected():
+            if connection and pool is not None:
+                pool.release(connection, broken=not connection.is_connected())
+            elif connection and connection.is_connected():
                 connection.close()
     return wrapper
 
@@ -42,3 +42,11 @@ class EnvFileError(ValueError):
 
 class DataFetchError(Exception):
     """Исключение для ошибок получения данных"""
+
+
+class ShopProcessingError(Exception):
+    """Ошибка обработки одного или нескольких магазинов."""
+
+
+class ConnectionPoolError(Exception):
+    """Ошибка получения подключения из пула."""
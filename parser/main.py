@@ -1,8 +1,12 @@
 import logging
+import os
+from parser.constants import DB_POOL_SIZE, MAX_WORKERS, PROCESSES
+from parser.db_pool import close_pool, init_pool, pool_size
 from parser.decorators import time_of_function, time_of_script
-from parser.exceptions import DataFetchError
+from parser.exceptions import DataFetchError, ShopProcessingError
 from parser.logging_config import setup_logging
-from parser.utils import main_logic
+from parser.response_cache import ResponseCache
+from parser.utils import main_logic, main_logic_queue
 from parser.wb_token import WBTokensClient
 
 import requests
@@ -27,12 +31,71 @@ def main():
     load_dotenv()
     try:
         # db_client, client, date_str = initialize_components()
+        max_workers = int(os.getenv('MAX_WORKERS_WB', MAX_WORKERS))
+        init_pool(pool_size(
+            max_workers, int(os.getenv('DB_POOL_SIZE_WB', DB_POOL_SIZE))
+        ))
         token_client = WBTokensClient()
-        main_logic(token_client)
+        cache_mode = os.getenv('CACHE_MODE_WB', '')
+        cache = None
+        if cache_mode:
+            cache = ResponseCache(replay=cache_mode == 'replay')
+        incremental = os.getenv('INCREMENTAL_WB', '') == '1'
+        if os.getenv('QUEUE_MODE_WB', '') == '1':
+            results = main_logic_queue(
+                token_client,
+                max_workers=max_workers,
+                incremental=incremental,
+                cache=cache
+            )
+        else:
+            results = main_logic(
+                token_client,
+                max_workers=max_workers,
+                incremental=incremental,
+                cache=cache,
+                pipeline=os.getenv('PIPELINE_WB', '') == '1',
+                processes=int(os.getenv('PROCESSES_WB', PROCESSES))
+            )
+        failed = [
+            result['SHOP'] for result in results
+            if result['STATUS'] != 'SUCCESS'
+        ]
+        if failed:
+            raise ShopProcessingError(
+                f'Не удалось обработать магазины: {", ".join(failed)}'
+            )
 
         """
         Расширенные возможности скрипта.
+        - Кэш ответов API - переменная окружения CACHE_MODE_WB:
+        'record' сохраняет страницы в кэш, 'replay' выполняет выгрузку
+        только из кэша без обращения к API.
+        - Инкрементальная выгрузка продаж - переменная окружения
+        INCREMENTAL_WB=1: запрашиваются только заказы, измененные после
+        предыдущей выгрузки; по умолчанию продажи выгружаются полностью.
+        - Конвейерная выгрузка - переменная окружения PIPELINE_WB=1:
+        получение, разбор и запись данных выполняются одновременно.
+        - Многопроцессная обработка - переменная окружения PROCESSES_WB:
+        количество процессов, между которыми распределяются магазины.
+        - Очередь заданий - переменная окружения QUEUE_MODE_WB=1:
+        несколько контейнеров делят выгрузку через общую очередь в БД.
+        - Размер пула подключений к БД - переменная окружения
+        DB_POOL_SIZE_WB. Пул каждого процесса вмещает не меньше
+        MAX_WORKERS_WB * DB_CONNECTIONS_PER_WORKER подключений: поток
+        магазина держит до трех подключений одновременно, меньший
+        размер увеличивается с предупреждением.
+        - Секционирование таблиц отчетов по месяцам - константа
+        PARTITIONED_REPORTS, хранение секций - PARTITION_RETENTION_MONTHS.
         - Очистка данных таблиц - метод clean_db() класса WbDataBaseClient.
+        - Удаление данных старше N дней или за период - метод purge()
+        класса WbDataBaseClient.
+        - Общие таблицы всех магазинов с ключом shop_id - константа
+        SHARED_SCHEMA, перенос существующих таблиц магазинов -
+        команда python -m parser.migration.
+        - Агрегаты остатков и продаж по неделям и месяцам обновляются
+        при каждой записи, перестроение истории - команда
+        python -m parser.rebuild_rollups.
         - Экспорт данных в json-файл - функция export_data().
         """
         # db_client.clean_db(reports_sales_some_shop=True)
@@ -46,12 +109,17 @@ def main():
     except DataFetchError as error:
         logging.error('Не удалось получить данные: %s', error)
         raise
+    except ShopProcessingError as error:
+        logging.error('❌ %s', error)
+        raise
     except requests.RequestException as error:
         logging.error('❌ Ошибка запроса: %s', error)
         raise
     except Exception as error:
         logging.error('❌ Неожиданная ошибка: %s', error)
         raise
+    finally:
+        close_pool()
 
 
 if __name__ == '__main__':
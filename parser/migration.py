@@ -0,0 +1,177 @@
+import argparse
+import logging
+import time
+from parser.bulk_loader import BulkLoader
+from parser.constants import (INSERT_DATES, INSERT_SHARED_CURSOR,
+                              INSERT_SHARED_ORDERS, INSERT_SHARED_PRODUCTS,
+                              INSERT_SHARED_SALES, INSERT_SHARED_STOCKS,
+                              MIGRATION_BATCH_SIZE, PURGE_PAUSE, SELECT_BATCH)
+from parser.db_pool import close_pool, init_pool
+from parser.decorators import connection_db
+from parser.logging_config import setup_logging
+from parser.schema_registry import schema_registry
+from parser.wb_db import WbDataBaseClient
+from parser.wb_token import WBTokensClient
+
+setup_logging()
+
+MIGRATED_TABLES = (
+    ('catalog', 'dates', 'full_date, day, month, year, day_of_week',
+     ('full_date',), INSERT_DATES),
+    ('catalog', 'products', 'article, name', ('article',),
+     INSERT_SHARED_PRODUCTS),
+    ('reports', 'stocks', 'date, article, stock', ('date', 'article'),
+     INSERT_SHARED_STOCKS),
+    ('reports', 'sales', 'date, article, sale', ('date', 'article'),
+     INSERT_SHARED_SALES),
+    ('reports', 'orders', 'srid, date, article, is_sale', ('srid',),
+     INSERT_SHARED_ORDERS),
+    ('service', 'cursors', 'report, last_change_date', ('report',),
+     INSERT_SHARED_CURSOR),
+)
+"""
+Переносимые таблицы магазина: (тип таблицы, тип данных, столбцы,
+ключ для чтения порциями, запрос записи в общую таблицу).
+"""
+
+
+class SchemaMigrator:
+    """
+    Перенос таблиц магазинов в общую схему (WbDataBaseClient(shared=True)).
+
+    Каждая таблица магазина читается порциями по batch_size строк
+    в порядке ключа (keyset: WHERE (ключ) > (последний ключ)), порция
+    записывается в общую таблицу многострочными INSERT ... ON DUPLICATE
+    KEY UPDATE в той же транзакции. Повторный запуск безопасен: уже
+    перенесенные строки перезаписываются теми же значениями. Даты
+    переносятся в общий справочник без shop_id. Таблицы магазина
+    не удаляются - после проверки их можно очистить через clean_db.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = MIGRATION_BATCH_SIZE,
+        pause: float = PURGE_PAUSE,
+        sleep=time.sleep
+    ):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.sleep = sleep
+        self.loader = BulkLoader(batch_size)
+
+    @connection_db
+    def _copy_batch(
+        self,
+        source: str,
+        target: str,
+        spec: tuple,
+        key: tuple,
+        last: tuple,
+        cursor=None
+    ) -> tuple:
+        """
+        Защищенный метод переносит одну порцию строк после ключа last.
+        Возвращает количество строк и ключ последней строки.
+        """
+        _, _, columns, order, insert = spec
+        condition = ''
+        if last:
+            condition = 'WHERE ({key}) > ({values})'.format(
+                key=', '.join(order),
+                values=', '.join(['%s'] * len(order))
+            )
+        cursor.execute(
+            SELECT_BATCH.format(
+                columns=columns,
+                table_name=source,
+                condition=condition,
+                key=', '.join(order),
+                limit=self.batch_size
+            ),
+            last
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return 0, last
+        names = [column.strip() for column in columns.split(',')]
+        positions = [names.index(column) for column in order]
+        self.loader.load(
+            cursor,
+            insert.format(table_name=target),
+            [key + tuple(row) for row in rows]
+        )
+        return len(rows), tuple(rows[-1][i] for i in positions)
+
+    def migrate_table(self, shop_name: str, shop_id: int, spec: tuple) -> int:
+        """
+        Переносит одну таблицу магазина в общую таблицу.
+        Возвращает количество перенесенных строк.
+        """
+        type_table, type_data = spec[:2]
+        source = f'{type_table}_{type_data}_{shop_name}'
+        if not schema_registry.exists(source):
+            return 0
+        target = f'{type_table}_{type_data}'
+        key = () if type_data == 'dates' else (shop_id,)
+        total = 0
+        last = ()
+        while True:
+            rows, last = self._copy_batch(source, target, spec, key, last)
+            total += rows
+            if rows < self.batch_size:
+                break
+            if self.pause:
+                self.sleep(self.pause)
+        logging.info(
+            'Таблица %s перенесена в %s: %s строк', source, target, total
+        )
+        return total
+
+    def migrate_shop(self, shop_name: str) -> dict:
+        """
+        Переносит все таблицы магазина в общую схему.
+        Возвращает количество перенесенных строк по таблицам.
+        """
+        client = WbDataBaseClient(shop_name, shared=True)
+        client.ensure_tables()
+        shop_id = client.register_shop()
+        return {
+            f'{spec[0]}_{spec[1]}': self.migrate_table(
+                shop_name, shop_id, spec
+            )
+            for spec in MIGRATED_TABLES
+        }
+
+    def migrate(self, shops) -> dict:
+        """Переносит таблицы магазинов shops в общую схему."""
+        results = {
+            shop_name: self.migrate_shop(shop_name) for shop_name in shops
+        }
+        self.loader.report()
+        return results
+
+
+def main(argv=None) -> dict:
+    """
+    Команда переноса таблиц магазинов в общую схему:
+    python -m parser.migration [магазин ...] [--batch-size N].
+    Без списка магазинов переносятся все магазины из таблицы токенов.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='Перенос таблиц магазинов в общую схему'
+    )
+    arg_parser.add_argument('shops', nargs='*')
+    arg_parser.add_argument(
+        '--batch-size', type=int, default=MIGRATION_BATCH_SIZE
+    )
+    args = arg_parser.parse_args(argv)
+    init_pool()
+    try:
+        shops = args.shops or WBTokensClient().get_exists_shop()
+        return SchemaMigrator(args.batch_size).migrate(shops)
+    finally:
+        close_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import logging
+from datetime import date as date_type
+from datetime import datetime as dt
+from parser.constants import (ADD_PARTITIONS, CREATE_ARCHIVE_TABLE,
+                              DATE_FORMAT, DROP_PARTITIONS, EXCHANGE_PARTITION,
+                              PARTITION_ARCHIVE, PARTITION_PREMAKE_MONTHS,
+                              PARTITION_RETENTION_MONTHS, REMOVE_PARTITIONING,
+                              SELECT_PARTITIONS)
+from parser.decorators import connection_db
+from parser.logging_config import setup_logging
+from parser.schema_registry import schema_registry
+
+setup_logging()
+
+
+def shift_month(day: date_type, months: int) -> date_type:
+    """Возвращает первое число месяца, отстоящего от day на months."""
+    index = day.year * 12 + day.month - 1 + months
+    return date_type(index // 12, index % 12 + 1, 1)
+
+
+class PartitionManager:
+    """
+    Управление секциями таблиц отчетов, секционированных по месяцам.
+
+    Секция pYYYYMM хранит строки месяца и ограничена первым числом
+    следующего месяца, последняя секция pmax принимает все остальные
+    даты. Менеджер заранее создает секции на premake_months месяцев
+    вперед (для новой таблицы - начиная с окна хранения), а секции
+    старше retention_months месяцев удаляет целиком через DROP PARTITION
+    либо при archive=True переносит в архивную таблицу
+    archive_<таблица>_YYYYMM через EXCHANGE PARTITION. Запросы
+    за период и удаление старых данных затрагивают только нужные
+    секции, без просмотра всей таблицы.
+    """
+
+    def __init__(
+        self,
+        retention_months: int = PARTITION_RETENTION_MONTHS,
+        premake_months: int = PARTITION_PREMAKE_MONTHS,
+        archive: bool = PARTITION_ARCHIVE,
+        today=None
+    ):
+        self.retention_months = retention_months
+        self.premake_months = premake_months
+        self.archive = archive
+        self.today = today or date_type.today
+
+    @staticmethod
+    def partition_name(month: date_type) -> str:
+        """Возвращает название секции месяца."""
+        return f'p{month:%Y%m}'
+
+    @staticmethod
+    def _bound(description: str):
+        """
+        Защищенный метод возвращает верхнюю границу секции
+        (None для секции pmax).
+        """
+        value = description.strip("'")
+        if value == 'MAXVALUE':
+            return None
+        return dt.strptime(value, DATE_FORMAT).date()
+
+    def _partitions(self, cursor, table_name: str) -> dict:
+        """
+        Защищенный метод возвращает секции таблицы:
+        название → верхняя граница.
+        """
+        cursor.execute(SELECT_PARTITIONS, (table_name,))
+        return {
+            name: self._bound(description)
+            for name, description, _ in cursor.fetchall()
+        }
+
+    def _cutoff(self):
+        """
+        Защищенный метод возвращает первое число самого раннего
+        хранимого месяца (None, если секции не удаляются).
+        """
+        if not self.retention_months:
+            return None
+        return shift_month(self.today(), -self.retention_months)
+
+    def _missing(self, bounds: list) -> list:
+        """
+        Защищенный метод возвращает месяцы, секции которых нужно
+        создать перед pmax.
+        """
+        last = shift_month(self.today(), self.premake_months)
+        if bounds:
+            month = max(bounds)
+        else:
+            month = self._cutoff() or shift_month(self.today(), 0)
+        months = []
+        while month <= last:
+            months.append(month)
+            month = shift_month(month, 1)
+        return months
+
+    def _create(self, cursor, table_name: str, months: list) -> list:
+        """Защищенный метод создает секции месяцев перед pmax."""
+        if not months:
+            return []
+        partitions = ',\n    '.join(
+            f'PARTITION {self.partition_name(month)} VALUES LESS THAN '
+            f"('{shift_month(month, 1):{DATE_FORMAT}}')"
+            for month in months
+        )
+        cursor.execute(ADD_PARTITIONS.format(
+            table_name=table_name, partitions=partitions
+        ))
+        created = [self.partition_name(month) for month in months]
+        logging.info('Таблица %s: созданы секции %s', table_name, created)
+        return created
+
+    def _archive(self, cursor, table_name: str, partitions: list) -> list:
+        """
+        Защищенный метод переносит данные секций в архивные таблицы.
+        Возвращает названия архивных таблиц.
+        """
+        archived = []
+        for partition in partitions:
+            archive_table = f'archive_{table_name}_{partition[1:]}'
+            names = {'table_name': table_name, 'archive_table': archive_table}
+            cursor.execute(CREATE_ARCHIVE_TABLE.format(**names))
+            cursor.execute(REMOVE_PARTITIONING.format(**names))
+            cursor.execute(
+                EXCHANGE_PARTITION.format(partition=partition, **names)
+            )
+            schema_registry.add(archive_table)
+            archived.append(archive_table)
+            logging.info(
+                'Таблица %s: секция %s перенесена в %s',
+                table_name,
+                partition,
+                archive_table
+            )
+        return archived
+
+    def _expire(self, cursor, table_name: str, partitions: dict) -> tuple:
+        """
+        Защищенный метод удаляет (или архивирует) секции старше
+        окна хранения. Возвращает удаленные секции и архивные таблицы.
+        """
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return [], []
+        expired = [
+            name for name, bound in partitions.items()
+            if bound is not None and bound <= cutoff
+        ]
+        if not expired:
+            return [], []
+        archived = []
+        if self.archive:
+            archived = self._archive(cursor, table_name, expired)
+        cursor.execute(DROP_PARTITIONS.format(
+            table_name=table_name, partitions=', '.join(expired)
+        ))
+        logging.info('Таблица %s: удалены секции %s', table_name, expired)
+        return expired, archived
+
+    @connection_db
+    def maintain(self, table_name: str, cursor=None) -> dict:
+        """
+        Создает недостающие секции таблицы и удаляет устаревшие.
+        Возвращает словарь со списками created, dropped и archived.
+        Таблица без секции pmax (созданная до включения секционирования)
+        пропускается.
+        """
+        partitions = self._partitions(cursor, table_name)
+        if 'pmax' not in partitions:
+            logging.warning(
+                'Таблица %s не секционирована, обслуживание секций пропущено',
+                table_name
+            )
+            return {'created': [], 'dropped': [], 'archived': []}
+        bounds = [bound for bound in partitions.values() if bound]
+        created = self._create(cursor, table_name, self._missing(bounds))
+        dropped, archived = self._expire(cursor, table_name, partitions)
+        return {'created': created, 'dropped': dropped, 'archived': archived}
+
+
+partition_manager = PartitionManager()
+"""Менеджер секций таблиц отчетов с политикой хранения по умолчанию."""
@@ -0,0 +1,297 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from itertools import chain
+from parser.constants import PIPELINE_POLL_INTERVAL, PIPELINE_QUEUE_SIZE
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+_DONE = object()
+"""Маркер завершения работы стадии конвейера."""
+
+
+class _Cancelled(Exception):
+    """Стадия остановлена из-за ошибки в другой стадии конвейера."""
+
+
+class StageStats:
+    """
+    Статистика стадии конвейера: количество обработанных элементов,
+    время работы и ожидания очередей, глубина входной очереди.
+    """
+
+    __slots__ = (
+        'name', 'items', 'elapsed', 'waiting', 'max_depth', '_depth_sum',
+        '_depth_samples'
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.elapsed = 0.0
+        self.waiting = 0.0
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+
+    def sample_depth(self, depth: int) -> None:
+        """Учитывает текущую глубину входной очереди стадии."""
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    @property
+    def busy(self) -> float:
+        """Время полезной работы стадии без ожидания очередей."""
+        return max(self.elapsed - self.waiting, 0.0)
+
+    @property
+    def throughput(self) -> float:
+        """Пропускная способность стадии: элементов в секунду работы."""
+        return self.items / self.busy if self.busy else 0.0
+
+    @property
+    def avg_depth(self) -> float:
+        """Средняя глубина входной очереди стадии."""
+        if not self._depth_samples:
+            return 0.0
+        return self._depth_sum / self._depth_samples
+
+    def as_dict(self) -> dict:
+        """Возвращает статистику стадии в виде словаря."""
+        return {
+            'items': self.items,
+            'busy': round(self.busy, 3),
+            'waiting': round(self.waiting, 3),
+            'throughput': round(self.throughput, 3),
+            'max_depth': self.max_depth,
+            'avg_depth': round(self.avg_depth, 3)
+        }
+
+
+class Pipeline:
+    """
+    Конвейер ежедневной выгрузки магазина.
+
+    Стадии получения страниц остатков из API (fetch), получения
+    и агрегации продаж (sales), разбора (parse) и записи в базу данных
+    (write) работают в отдельных потоках и связаны ограниченными
+    очередями: быстрая стадия блокируется на заполненной очереди, пока
+    медленная не освободит место. Разбор передает запросы наборами
+    (запросы одной страницы), и стадия записи фиксирует каждый набор
+    отдельной короткой транзакцией, пока следующие страницы еще
+    загружаются и разбираются; транзакция не ждет сетевых запросов.
+    Таблицы магазина создаются, а магазин регистрируется до запуска
+    стадий, поэтому в базу пишет только стадия записи; инкрементальные
+    продажи (sales_updater) тоже рассчитываются и сохраняются заранее.
+    Ошибка любой стадии останавливает остальные, незафиксированный
+    набор откатывается. По статистике стадий (stats) видно, какая из них
+    узкое место: у нее наибольшее время работы, а ее входная очередь
+    заполнена.
+    """
+
+    STAGES = ('fetch', 'sales', 'parse', 'write')
+
+    def __init__(
+        self,
+        client,
+        db_client,
+        name_of_shop: str,
+        date_str: str,
+        incremental: bool = False,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        sales_updater: Callable = None
+    ):
+        self.client = client
+        self.db_client = db_client
+        self.name_of_shop = name_of_shop
+        self.date_str = date_str
+        self.incremental = incremental
+        self.sales_updater = sales_updater
+        self.pages = queue.Queue(maxsize=queue_size)
+        self.queries = queue.Queue(maxsize=queue_size)
+        self.sales_queries = queue.Queue(maxsize=1)
+        self.stats = {stage: StageStats(stage) for stage in self.STAGES}
+        self.sales = None
+        self.rows = 0
+        self._error = None
+        self._stop = threading.Event()
+
+    def _put(self, target: queue.Queue, item, stats: StageStats) -> None:
+        """
+        Защищенный метод помещает элемент в очередь, ожидая свободного
+        места. Время ожидания учитывается в статистике стадии.
+        """
+        start = time.monotonic()
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                target.put(item, timeout=PIPELINE_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        stats.waiting += time.monotonic() - start
+
+    def _get(self, source: queue.Queue, stats: StageStats):
+        """
+        Защищенный метод забирает элемент из очереди, ожидая его
+        поступления. Время ожидания учитывается в статистике стадии.
+        """
+        start = time.monotonic()
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                item = source.get(timeout=PIPELINE_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                continue
+        stats.waiting += time.monotonic() - start
+        return item
+
+    def _drain(self, source: queue.Queue, stats: StageStats) -> Iterator:
+        """
+        Защищенный метод поочередно отдает элементы очереди до маркера
+        завершения. Время ожидания учитывается в статистике стадии.
+        """
+        while True:
+            item = self._get(source, stats)
+            stats.sample_depth(source.qsize())
+            if item is _DONE:
+                return
+            stats.items += 1
+            yield item
+
+    def _fetch(self) -> None:
+        """Стадия получения страниц отчета об остатках из API."""
+        stats = self.stats['fetch']
+        pages = self.client.iter_stock_pages(self.date_str, self.date_str)
+        for page in pages:
+            stats.items += 1
+            self._put(self.pages, page, stats)
+        self._put(self.pages, _DONE, stats)
+
+    def _sales(self) -> None:
+        """
+        Стадия получения отчета о продажах из API одновременно
+        с отчетом об остатках. Продажи агрегируются за один проход
+        по страницам отчета, запрос их записи передается стадии разбора.
+        В инкрементальном режиме передаются продажи, рассчитанные
+        до запуска стадий.
+        """
+        stats = self.stats['sales']
+
+        def pages():
+            for page in self.client.iter_sales_pages(self.date_str):
+                if self._stop.is_set():
+                    raise _Cancelled
+                stats.items += 1
+                yield page
+
+        sales = self.sales
+        if not self.incremental:
+            sales = self.db_client.parse_avg_sales(
+                chain.from_iterable(pages()), self.date_str, compact=True
+            )
+        self._put(
+            self.sales_queries, self.db_client.validate_sales_db(sales), stats
+        )
+
+    def _parse(self) -> None:
+        """
+        Стадия разбора страниц остатков и подготовки наборов запросов:
+        дата, затем по набору на страницу и последним - продажи, которые
+        ссылаются на уже записанные товары.
+        """
+        stats = self.stats['parse']
+        self._put(
+            self.queries,
+            [self.db_client.validate_date_db(self.date_str)],
+            stats
+        )
+        for page in self._drain(self.pages, stats):
+            products = self.db_client.parse_product_data(
+                page, self.date_str, compact=True
+            )
+            self._put(
+                self.queries,
+                [
+                    self.db_client.validate_products_db(products),
+                    self.db_client.validate_stocks_db(products)
+                ],
+                stats
+            )
+        self._put(
+            self.queries, [self._get(self.sales_queries, stats)], stats
+        )
+        self._put(self.queries, _DONE, stats)
+
+    def _write(self) -> None:
+        """
+        Стадия записи наборов запросов в базу данных: каждый набор
+        фиксируется отдельной транзакцией по мере поступления
+        (см. WbDataBaseClient.save_batches_to_db).
+        """
+        self.rows = self.db_client.save_batches_to_db(
+            self.name_of_shop, self._drain(self.queries, self.stats['write'])
+        )
+
+    def _run_stage(self, stage: str, target: Callable) -> None:
+        """
+        Защищенный метод выполняет стадию и при ошибке останавливает
+        остальные стадии конвейера.
+        """
+        start = time.monotonic()
+        try:
+            target()
+        except _Cancelled:
+            logging.debug('Стадия %s остановлена', stage)
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+            self._stop.set()
+        finally:
+            self.stats[stage].elapsed = time.monotonic() - start
+
+    def run(self) -> int:
+        """
+        Запускает стадии конвейера и дожидается их завершения.
+        Предварительно в текущем потоке создает таблицы и регистрирует
+        магазин (ensure_tables), а в инкрементальном режиме сохраняет
+        заказы и рассчитывает продажи (sales_updater).
+        Возвращает количество записанных строк.
+        """
+        self.db_client.ensure_tables()
+        if self.incremental:
+            self.sales = self.sales_updater(
+                self.client, self.db_client, self.name_of_shop, self.date_str
+            )
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(stage, getattr(self, f'_{stage}')),
+                name=f'{stage}-{self.name_of_shop}'
+            ) for stage in self.STAGES
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._log_stats()
+        if self._error is not None:
+            raise self._error
+        return self.rows
+
+    def _log_stats(self) -> None:
+        """Защищенный метод логирует статистику стадий конвейера."""
+        for stage in self.stats.values():
+            logging.info(
+                'Конвейер магазина %s, стадия %s: %s',
+                self.name_of_shop,
+                stage.name,
+                stage.as_dict()
+            )
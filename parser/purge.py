@@ -0,0 +1,167 @@
+import logging
+import time
+from collections import defaultdict
+from parser.constants import (DELETE_CHUNK, PURGE_CHUNK_SIZE, PURGE_PAUSE,
+                              SELECT_FOREIGN_KEYS, SELECT_TABLE_ROWS,
+                              TRUNCATE_TABLE)
+from parser.decorators import connection_db
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+
+class Purger:
+    """
+    Очистка таблиц базы данных порциями.
+
+    Строки удаляются запросами DELETE ... LIMIT chunk_size, каждая порция -
+    отдельной транзакцией, поэтому блокировки и журнал отмены ограничены
+    одной порцией, а между порциями выдерживается пауза pause секунд.
+    Таблицы, на которые не ссылаются внешние ключи, при очистке целиком
+    очищаются через TRUNCATE. Для каждой таблицы ведется статистика:
+    количество удаленных строк, время и скорость удаления.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = PURGE_CHUNK_SIZE,
+        pause: float = PURGE_PAUSE,
+        sleep=time.sleep
+    ):
+        if chunk_size < 1:
+            raise ValueError('Размер порции должен быть положительным')
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.sleep = sleep
+        self.stats = defaultdict(lambda: {'rows': 0, 'seconds': 0.0})
+
+    @connection_db
+    def foreign_keys(self, cursor=None) -> dict:
+        """
+        Возвращает связи таблиц по внешним ключам:
+        таблица → множество таблиц, которые на нее ссылаются.
+        """
+        cursor.execute(SELECT_FOREIGN_KEYS)
+        referenced = defaultdict(set)
+        for table_name, referenced_table in cursor.fetchall():
+            if table_name != referenced_table:
+                referenced[referenced_table].add(table_name)
+        return dict(referenced)
+
+    @staticmethod
+    def order(tables, referenced: dict) -> list:
+        """
+        Возвращает таблицы в порядке очистки: таблицы, ссылающиеся
+        на другую таблицу, очищаются раньше нее.
+        """
+        tables = list(dict.fromkeys(tables))
+        ordered = []
+        visiting = set()
+
+        def visit(table_name):
+            if table_name in ordered or table_name in visiting:
+                return
+            visiting.add(table_name)
+            for child in sorted(referenced.get(table_name, ())):
+                if child in tables:
+                    visit(child)
+            ordered.append(table_name)
+
+        for table_name in tables:
+            visit(table_name)
+        return ordered
+
+    @connection_db
+    def _delete_chunk(
+        self,
+        table_name: str,
+        condition: str,
+        params: tuple,
+        cursor=None
+    ) -> int:
+        """Защищенный метод удаляет одну порцию строк и фиксирует ее."""
+        cursor.execute(
+            DELETE_CHUNK.format(
+                table_name=table_name,
+                condition=condition,
+                limit=self.chunk_size
+            ),
+            params
+        )
+        return cursor.rowcount
+
+    def delete(
+        self,
+        table_name: str,
+        condition: str = '',
+        params: tuple = ()
+    ) -> int:
+        """
+        Удаляет порциями строки таблицы, подходящие под condition
+        (например, 'WHERE date < %s'), и возвращает их количество.
+        """
+        start = time.perf_counter()
+        rows = 0
+        while True:
+            deleted = self._delete_chunk(table_name, condition, params)
+            rows += deleted
+            if deleted < self.chunk_size:
+                break
+            if self.pause:
+                self.sleep(self.pause)
+        self._account(table_name, rows, start)
+        return rows
+
+    @connection_db
+    def truncate(self, table_name: str, cursor=None) -> None:
+        """
+        Очищает таблицу целиком через TRUNCATE. Количество строк
+        в статистике - оценка из information_schema.
+        """
+        start = time.perf_counter()
+        cursor.execute(SELECT_TABLE_ROWS, (table_name,))
+        row = cursor.fetchone()
+        rows = int(row[0] or 0) if row else 0
+        cursor.execute(TRUNCATE_TABLE.format(table_name=table_name))
+        self._account(table_name, rows, start)
+
+    def clear(self, table_name: str, referenced: dict) -> None:
+        """
+        Очищает таблицу целиком: через TRUNCATE, если на нее
+        не ссылаются внешние ключи, иначе порциями DELETE.
+        """
+        if referenced.get(table_name):
+            self.delete(table_name)
+        else:
+            self.truncate(table_name)
+        logging.info('Таблица %s очищена', table_name)
+
+    def _account(self, table_name: str, rows: int, start: float) -> None:
+        """Защищенный метод учитывает удаленные строки в статистике."""
+        stats = self.stats[table_name]
+        stats['rows'] += rows
+        stats['seconds'] += time.perf_counter() - start
+
+    def report(self) -> dict:
+        """
+        Возвращает и логирует статистику очистки по таблицам:
+        строки, время и строки в секунду.
+        """
+        report = {}
+        for table_name, stats in self.stats.items():
+            seconds = stats['seconds']
+            report[table_name] = {
+                'rows': stats['rows'],
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(
+                    stats['rows'] / seconds if seconds else 0.0, 1
+                )
+            }
+            logging.info(
+                'Очистка %s: удалено %s строк за %s сек. (%s строк/сек.)',
+                table_name,
+                report[table_name]['rows'],
+                report[table_name]['seconds'],
+                report[table_name]['rows_per_second']
+            )
+        return report
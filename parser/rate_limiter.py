@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from parser.constants import DEFAULT_RATE_LIMIT, RATE_LIMITS
+from parser.logging_config import setup_logging
+from urllib.parse import urlparse
+
+setup_logging()
+
+
+class _Bucket:
+    """Состояние квоты для пары (хост, токен)."""
+
+    __slots__ = ('capacity', 'interval', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, capacity: int, interval: float, now: float):
+        self.capacity = capacity
+        self.interval = interval
+        self.tokens = float(capacity)
+        self.updated = now
+        self.blocked_until = now
+
+    def refill(self, now: float) -> None:
+        """Восстанавливает запросы, накопленные с момента прошлого вызова."""
+        elapsed = max(now - self.updated, 0)
+        self.tokens = min(
+            self.capacity, self.tokens + elapsed / self.interval
+        )
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов к API Wildberries (token bucket).
+
+    Квоты ведутся отдельно для каждой пары (хост API, токен продавца).
+    Модель квоты задается в RATE_LIMITS и уточняется по заголовкам ответа
+    X-Ratelimit-Remaining, X-Ratelimit-Retry, X-Ratelimit-Reset и
+    Retry-After, поэтому ожидание длится ровно столько, сколько требует
+    сервер. Часы и функция сна передаются извне для тестирования.
+    """
+
+    def __init__(
+        self,
+        quotas: dict = RATE_LIMITS,
+        clock=time.monotonic,
+        sleep=time.sleep
+    ):
+        self.quotas = quotas
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str, token: str, now: float) -> _Bucket:
+        """Защищенный метод возвращает (создает) квоту для хоста и токена."""
+        host = urlparse(url).netloc
+        key = (host, token)
+        if key not in self._buckets:
+            capacity, interval = self.quotas.get(host, DEFAULT_RATE_LIMIT)
+            self._buckets[key] = _Bucket(capacity, interval, now)
+        return self._buckets[key]
+
+    def reserve(self, url: str, token: str) -> float:
+        """
+        Резервирует один запрос и возвращает время в секундах,
+        которое нужно подождать перед его отправкой.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(url, token, now)
+            bucket.refill(now)
+            wait = max(bucket.blocked_until - now, 0)
+            if bucket.tokens < 1:
+                wait = max(wait, (1 - bucket.tokens) * bucket.interval)
+            bucket.tokens -= 1
+            return wait
+
+    def acquire(self, url: str, token: str) -> float:
+        """Ждет, пока квота позволит отправить запрос."""
+        wait = self.reserve(url, token)
+        if wait > 0:
+            logging.info(
+                '⏳ Ожидание квоты API %s: %s сек.',
+                urlparse(url).netloc,
+                round(wait, 3)
+            )
+            self.sleep(wait)
+        return wait
+
+    @staticmethod
+    def _header_seconds(headers, name: str):
+        """Защищенный метод читает числовой заголовок ответа."""
+        value = headers.get(name)
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0)
+        except (TypeError, ValueError):
+            return None
+
+    def update(
+        self,
+        url: str,
+        token: str,
+        headers,
+        status_code: int = 200
+    ) -> None:
+        """Уточняет состояние квоты по заголовкам ответа сервера."""
+        retry = self._header_seconds(headers, 'X-Ratelimit-Retry')
+        if retry is None:
+            retry = self._header_seconds(headers, 'Retry-After')
+        remaining = self._header_seconds(headers, 'X-Ratelimit-Remaining')
+        reset = self._header_seconds(headers, 'X-Ratelimit-Reset')
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(url, token, now)
+            bucket.refill(now)
+            if remaining is not None:
+                bucket.tokens = min(remaining, bucket.capacity)
+            if status_code == 429 and retry is None:
+                retry = reset if reset is not None else bucket.interval
+            if retry is not None:
+                bucket.tokens = 1 - retry / bucket.interval
+                bucket.blocked_until = max(bucket.blocked_until, now + retry)
+
+
+rate_limiter = RateLimiter()
+"""Общий ограничитель запросов для всех клиентов процесса."""
@@ -0,0 +1,51 @@
+import argparse
+import logging
+from parser.db_pool import close_pool, init_pool
+from parser.logging_config import setup_logging
+from parser.wb_db import WbDataBaseClient
+from parser.wb_token import WBTokensClient
+
+setup_logging()
+
+
+def rebuild_rollups(shops, date_start: str = '', date_end: str = '') -> dict:
+    """
+    Перестраивает агрегаты остатков и продаж магазинов shops
+    за период (по умолчанию - за весь период данных).
+    Возвращает количество пересчитанных периодов по магазинам.
+    """
+    results = {}
+    for shop_name in shops:
+        db_client = WbDataBaseClient(shop_name)
+        db_client.ensure_tables()
+        results[shop_name] = db_client.rebuild_rollups(date_start, date_end)
+    logging.info('Перестроение агрегатов завершено: %s', results)
+    return results
+
+
+def main(argv=None) -> dict:
+    """
+    Команда перестроения агрегатов:
+    python -m parser.rebuild_rollups [магазин ...] [--start YYYY-MM-DD]
+    [--end YYYY-MM-DD]. Без списка магазинов перестраиваются агрегаты
+    всех магазинов из таблицы токенов.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='Перестроение агрегатов остатков и продаж'
+    )
+    arg_parser.add_argument('shops', nargs='*')
+    arg_parser.add_argument('--start', default='')
+    arg_parser.add_argument('--end', default='')
+    args = arg_parser.parse_args(argv)
+    if bool(args.start) != bool(args.end):
+        arg_parser.error('Период задается параметрами --start и --end вместе')
+    init_pool()
+    try:
+        shops = args.shops or WBTokensClient().get_exists_shop()
+        return rebuild_rollups(shops, args.start, args.end)
+    finally:
+        close_pool()
+
+
+if __name__ == '__main__':
+    main()
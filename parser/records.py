@@ -0,0 +1,107 @@
+from array import array
+from datetime import date
+from decimal import Decimal
+from parser.constants import DECIMAL_ROUNDING
+
+
+class StocksBatch:
+    """
+    Колоночное представление остатков и наименований товаров за одну дату.
+
+    Дата хранится один раз на весь набор, артикулы и остатки - в
+    компактных массивах array вместо словаря на каждую строку.
+    """
+
+    __slots__ = ('date', 'articles', 'names', 'stocks')
+
+    def __init__(self, date_str: str):
+        self.date = date_str
+        self.articles = array('Q')
+        self.names = []
+        self.stocks = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def append(self, article: int, name: str, stock: int) -> None:
+        """Добавляет строку остатков."""
+        self.articles.append(article)
+        self.names.append(name)
+        self.stocks.append(stock)
+
+    def product_params(self) -> list[tuple]:
+        """Возвращает параметры запроса INSERT_PRODUCTS."""
+        return list(zip(self.articles, self.names))
+
+    def stock_params(self, report_date: date) -> list[tuple]:
+        """Возвращает параметры запроса INSERT_STOCKS."""
+        return [
+            (report_date, article, stock)
+            for article, stock in zip(self.articles, self.stocks)
+        ]
+
+    def to_dicts(self) -> list[dict]:
+        """Возвращает данные в формате parse_product_data."""
+        return [
+            {
+                'дата': self.date,
+                'наименование': name,
+                'артикул': article,
+                'остаток': stock
+            } for article, name, stock in zip(
+                self.articles, self.names, self.stocks
+            )
+        ]
+
+
+class SalesBatch:
+    """
+    Колоночное представление средних продаж за одну дату.
+
+    Средние значения хранятся целыми числами в единицах
+    10 ** -DECIMAL_ROUNDING и превращаются в Decimal только при записи.
+    """
+
+    __slots__ = ('date', 'articles', 'averages')
+
+    def __init__(self, date_str: str):
+        self.date = date_str
+        self.articles = array('Q')
+        self.averages = array('q')
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def append(self, article: int, average: Decimal) -> None:
+        """Добавляет среднее значение продаж артикула."""
+        self.append_scaled(article, int(average.scaleb(DECIMAL_ROUNDING)))
+
+    def append_scaled(self, article: int, scaled: int) -> None:
+        """
+        Добавляет среднее значение продаж артикула, уже выраженное
+        в единицах 10 ** -DECIMAL_ROUNDING.
+        """
+        self.articles.append(article)
+        self.averages.append(scaled)
+
+    def _decimals(self):
+        """Защищенный метод отдает средние значения в виде Decimal."""
+        for scaled in self.averages:
+            yield Decimal(scaled).scaleb(-DECIMAL_ROUNDING)
+
+    def sales_params(self, report_date: date) -> list[tuple]:
+        """Возвращает параметры запроса INSERT_SALES."""
+        return [
+            (report_date, article, average)
+            for article, average in zip(self.articles, self._decimals())
+        ]
+
+    def to_dicts(self) -> list[dict]:
+        """Возвращает данные в формате parse_avg_sales."""
+        return [
+            {
+                'дата': self.date,
+                'артикул': article,
+                'среднее значение': average
+            } for article, average in zip(self.articles, self._decimals())
+        ]
@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import suppress
+from parser.constants import CACHE_EVICT_INTERVAL, CACHE_MAX_SIZE, CACHE_TTL
+from parser.exceptions import DataFetchError
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+
+class ResponseCache:
+    """
+    Кэш страниц API Wildberries на диске.
+
+    Страницы хранятся в сжатом виде (gzip) в файлах, имя которых - хэш
+    от магазина, отчета и параметров запроса. Страницы отчета о продажах
+    сохраняются в том виде, в каком их отдает потоковый разбор ответа,
+    то есть только с используемыми полями. Записи старше ttl секунд
+    не выдаются. Каталог кэша просматривается не при каждой записи,
+    а когда размер записанного превысит max_size байт или после
+    evict_interval записей: тогда удаляются устаревшие записи и самые
+    старые файлы сверх max_size. Каталог может использоваться
+    несколькими процессами, поэтому удаленные другим процессом файлы
+    пропускаются. В режиме replay кэш не обращается к API: TTL
+    не учитывается, а отсутствие страницы в кэше считается ошибкой
+    получения данных.
+    """
+
+    def __init__(
+        self,
+        folder: str = 'cache',
+        ttl: float = CACHE_TTL,
+        max_size: int = CACHE_MAX_SIZE,
+        replay: bool = False,
+        clock=time.time,
+        evict_interval: int = CACHE_EVICT_INTERVAL
+    ):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_size = max_size
+        self.replay = replay
+        self.clock = clock
+        self.evict_interval = evict_interval
+        self._size = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(shop_name: str, endpoint: str, params: dict) -> str:
+        """Защищенный метод возвращает ключ записи кэша."""
+        raw = json.dumps(
+            [shop_name, endpoint, params],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Защищенный метод возвращает путь к файлу записи кэша."""
+        return os.path.join(self.folder, f'{key}.json.gz')
+
+    def get(self, shop_name: str, endpoint: str, params: dict):
+        """
+        Возвращает страницу из кэша или None, если ее нет (или она
+        устарела). В режиме replay при отсутствии страницы
+        выбрасывает DataFetchError.
+        """
+        path = self._path(self._key(shop_name, endpoint, params))
+        try:
+            age = self.clock() - os.path.getmtime(path)
+            if self.replay or age <= self.ttl:
+                with gzip.open(path, 'rt', encoding='utf-8') as file:
+                    data = json.load(file)
+                logging.info('Страница %s получена из кэша', endpoint)
+                return data
+        except (OSError, ValueError) as error:
+            logging.debug('Промах кэша %s: %s', endpoint, error)
+        if self.replay:
+            raise DataFetchError(
+                f'Страница {endpoint} {params} отсутствует в кэше'
+            )
+        return None
+
+    def set(self, shop_name: str, endpoint: str, params: dict, data) -> None:
+        """
+        Сохраняет страницу в кэш и при превышении размера или числа
+        записей с прошлой проверки освобождает место.
+        """
+        if self.replay:
+            return
+        path = self._path(self._key(shop_name, endpoint, params))
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            if self._size is not None:
+                self._size += size
+            due = (
+                self._size is None
+                or self._size > self.max_size
+                or self._writes >= self.evict_interval
+            )
+        if due:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Защищенный метод удаляет устаревшие записи и самые старые записи
+        сверх допустимого размера кэша и запоминает размер оставшихся.
+        """
+        with self._lock:
+            now = self.clock()
+            entries = []
+            for entry in os.scandir(self.folder):
+                if not entry.name.endswith('.json.gz'):
+                    continue
+                with suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    if now - stat.st_mtime > self.ttl:
+                        os.remove(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size:
+                    break
+                with suppress(FileNotFoundError):
+                    os.remove(path)
+                total -= size
+            self._size = total
+            self._writes = 0
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        with self._lock:
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith('.json.gz'):
+                    with suppress(FileNotFoundError):
+                        os.remove(entry.path)
+            self._size = 0
+            self._writes = 0
@@ -0,0 +1,168 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from parser.constants import (BREAKER_COOLDOWN, BREAKER_THRESHOLD,
+                              MAX_RETRY_TIME, RETRY_STRATEGIES)
+from parser.logging_config import setup_logging
+from urllib.parse import urlparse
+
+setup_logging()
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель запросов к хостам API.
+
+    После threshold ошибок сервера подряд хост считается недоступным
+    и запросы к нему приостанавливаются на cooldown секунд сразу для всех
+    магазинов процесса. По истечении паузы запросы снова разрешаются:
+    успешный ответ сбрасывает счетчик ошибок, а новая ошибка снова
+    открывает выключатель.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        clock=time.monotonic
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._failures = Counter()
+        self._open_until = {}
+        self._lock = threading.Lock()
+
+    def wait_time(self, url: str) -> float:
+        """
+        Возвращает время в секундах, на которое приостановлены
+        запросы к хосту (0, если выключатель закрыт).
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            return max(self._open_until.get(host, 0) - self.clock(), 0)
+
+    def record_success(self, url: str) -> None:
+        """Сбрасывает счетчик ошибок хоста после успешного ответа."""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._failures.pop(host, None)
+
+    def record_failure(self, url: str) -> bool:
+        """
+        Учитывает ошибку сервера. Возвращает True, если выключатель
+        хоста открылся.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            self._failures[host] += 1
+            if self._failures[host] < self.threshold:
+                return False
+            self._open_until[host] = self.clock() + self.cooldown
+        logging.warning(
+            '⛔ Хост %s недоступен: %s ошибок подряд. '
+            'Запросы приостановлены на %s сек.',
+            host,
+            self._failures[host],
+            self.cooldown
+        )
+        return True
+
+    def reset(self) -> None:
+        """Закрывает выключатели всех хостов."""
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+
+
+circuit_breaker = CircuitBreaker()
+"""Общий выключатель запросов для всех клиентов процесса."""
+
+
+class RetryPolicy:
+    """
+    Политика повторных запросов к API Wildberries для одного магазина.
+
+    Для каждого кода ответа из strategies задается стратегия
+    (начальная задержка, предельная задержка, количество попыток).
+    Задержка растет экспоненциально и выбирается случайно в пределах
+    текущего шага (full jitter), чтобы повторы разных магазинов
+    не совпадали по времени. Суммарное время ожидания повторов
+    ограничено max_retry_time. Ошибки сервера и ошибки без ответа
+    (код None: таймауты, разрывы соединения) передаются в общий
+    CircuitBreaker. Метрики повторов доступны через stats().
+    """
+
+    def __init__(
+        self,
+        strategies: dict = RETRY_STRATEGIES,
+        max_retry_time: float = MAX_RETRY_TIME,
+        breaker: CircuitBreaker = circuit_breaker,
+        rng=random.random
+    ):
+        self.strategies = strategies
+        self.max_retry_time = max_retry_time
+        self.breaker = breaker
+        self.rng = rng
+        self.retries = Counter()
+        self.retry_wait = 0.0
+        self.breaker_wait = 0.0
+        self.gave_up = 0
+
+    def backoff(self, url: str, status_code, attempt: int):
+        """
+        Возвращает задержку в секундах перед попыткой номер attempt
+        после ответа status_code или None, если запрос не нужно
+        повторять (код не из strategies, исчерпаны попытки или
+        превышено суммарное время ожидания).
+        """
+        strategy = self.strategies.get(status_code)
+        if strategy is None:
+            logging.error('Код ответа сервера: %s', status_code)
+            return None
+        base_delay, max_delay, max_attempts = strategy
+        if status_code is None or status_code >= 500:
+            self.breaker.record_failure(url)
+        delay = self.rng() * min(max_delay, base_delay * 2 ** (attempt - 1))
+        if attempt > max_attempts:
+            reason = 'Количество попыток превысило допустимую квоту'
+        elif self.retry_wait + delay > self.max_retry_time:
+            reason = 'Превышено допустимое время ожидания повторов'
+        else:
+            self.retries[status_code] += 1
+            self.retry_wait += delay
+            logging.warning(
+                '⏳ Ошибка сервера (%s). Попытка %s/%s. Ждём %s сек...',
+                status_code,
+                attempt,
+                max_attempts,
+                round(delay, 3)
+            )
+            return delay
+        self.gave_up += 1
+        logging.error('%s. Ответ сервера: %s', reason, status_code)
+        return None
+
+    def pause(self, url: str) -> float:
+        """
+        Возвращает время в секундах, которое нужно подождать перед
+        запросом к хосту, приостановленному выключателем.
+        """
+        wait = self.breaker.wait_time(url)
+        self.breaker_wait += wait
+        return wait
+
+    def success(self, url: str) -> None:
+        """Учитывает успешный ответ сервера."""
+        self.breaker.record_success(url)
+
+    def stats(self) -> dict:
+        """Возвращает метрики повторных запросов."""
+        return {
+            'retries': dict(self.retries),
+            'retry_wait': round(self.retry_wait, 3),
+            'breaker_wait': round(self.breaker_wait, 3),
+            'gave_up': self.gave_up
+        }
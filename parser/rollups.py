@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime as dt
+from datetime import timedelta
+from parser.bulk_loader import BulkLoader
+from parser.constants import (DATE_FORMAT, DELETE_ROLLUP_PERIOD,
+                              DELETE_SHARED_ROLLUP_PERIOD, ROLLUP_PERIODS,
+                              ROLLUP_SALES, ROLLUP_STOCKS, SHARED_ROLLUP_SALES,
+                              SHARED_ROLLUP_STOCKS)
+from parser.logging_config import setup_logging
+from parser.partitions import shift_month
+
+setup_logging()
+
+
+def period_bounds(period: str, day) -> tuple:
+    """
+    Возвращает начало периода period ('weekly' - неделя с понедельника,
+    'monthly' - месяц), в который попадает day, и начало следующего.
+    """
+    if isinstance(day, str):
+        day = dt.strptime(day, DATE_FORMAT).date()
+    if period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if period == 'monthly':
+        return shift_month(day, 0), shift_month(day, 1)
+    raise ValueError(f'Неизвестный период агрегатов: {period}')
+
+
+class RollupManager:
+    """
+    Инкрементальное обновление агрегатов остатков и продаж магазина.
+
+    Для каждого артикула за неделю и месяц хранятся средний, минимальный
+    и максимальный остаток, сумма и среднее значение продаж. При записи
+    строк остатков и продаж (метод touch) затронутые периоды запоминаются
+    в наборе периодов своей транзакции, после записи (метод flush, в той
+    же транзакции и на том же подключении) агрегаты только этих периодов
+    пересчитываются по дневным строкам одним запросом INSERT ... SELECT
+    на тип отчета. Менеджер не хранит затронутые периоды, поэтому
+    транзакции на разных подключениях не пересчитывают чужие периоды.
+    Пересчет идемпотентен, поэтому тем же методом выполняется
+    и перестроение истории.
+    """
+
+    def __init__(
+        self,
+        shop_name: str,
+        shared: bool = False,
+        periods: tuple = ROLLUP_PERIODS
+    ):
+        self.periods = periods
+        self.shared = shared
+        suffix = '' if shared else f'_{shop_name}'
+        self.stocks_table = f'reports_stocks{suffix}'
+        self.sales_table = f'reports_sales{suffix}'
+        self.tables = {
+            period: f'rollup_{period}{suffix}' for period in periods
+        }
+
+    def touch(self, query: str, params: list, touched: set) -> None:
+        """
+        Добавляет в набор touched периоды транзакции, затронутые
+        записью строк params запросом query в таблицу остатков
+        или продаж.
+        """
+        if BulkLoader.table_name(query) not in (
+            self.stocks_table, self.sales_table
+        ):
+            return
+        days = {tuple(row[:-2]) for row in params}
+        for *key, day in days:
+            for period in self.periods:
+                start, _ = period_bounds(period, day)
+                touched.add((period, start, tuple(key)))
+
+    def refresh(self, cursor, period: str, start, key: tuple = ()) -> None:
+        """
+        Пересчитывает агрегаты периода period, начинающегося с start.
+        key - shop_id магазина для общих таблиц.
+        """
+        start, end = period_bounds(period, start)
+        table_name = self.tables[period]
+        delete, stocks, sales = (
+            DELETE_ROLLUP_PERIOD, ROLLUP_STOCKS, ROLLUP_SALES
+        )
+        if self.shared:
+            delete, stocks, sales = (
+                DELETE_SHARED_ROLLUP_PERIOD,
+                SHARED_ROLLUP_STOCKS,
+                SHARED_ROLLUP_SALES
+            )
+        cursor.execute(
+            delete.format(table_name=table_name), (*key, start)
+        )
+        for query, source_table in (
+            (stocks, self.stocks_table),
+            (sales, self.sales_table)
+        ):
+            cursor.execute(
+                query.format(table_name=table_name, source_table=source_table),
+                (start, *key, start, end)
+            )
+
+    def flush(self, cursor, touched: set) -> int:
+        """
+        Пересчитывает на подключении транзакции агрегаты периодов
+        touched, затронутых ее записью.
+        Возвращает количество пересчитанных периодов.
+        """
+        for period, start, key in sorted(touched):
+            self.refresh(cursor, period, start, key)
+        if touched:
+            logging.info('Пересчитаны агрегаты периодов: %s', len(touched))
+        return len(touched)
+
+    def period_starts(self, period: str, date_start, date_end) -> list:
+        """Возвращает начала периодов period, покрывающих интервал дат."""
+        start, _ = period_bounds(period, date_start)
+        _, end = period_bounds(period, date_end)
+        starts = []
+        while start < end:
+            starts.append(start)
+            start = period_bounds(period, start)[1]
+        return starts
@@ -0,0 +1,127 @@
+import logging
+from datetime import date as date_type
+from datetime import datetime as dt
+from datetime import timedelta
+from decimal import Decimal
+from parser.constants import DATE_FORMAT, DAYS, DECIMAL_ROUNDING
+from parser.logging_config import setup_logging
+from parser.records import SalesBatch
+
+import numpy as np
+
+setup_logging()
+
+
+class RollingSalesEngine:
+    """
+    Векторный расчет средних продаж за скользящее окно.
+
+    Строит плотную матрицу продаж «день × артикул» и считает суммы
+    за окно DAYS дней (как в parse_avg_sales: от date - DAYS до date
+    включительно) для всех дней и артикулов сразу через префиксные суммы.
+    Округление выполняется в целых числах по правилу half-even,
+    поэтому результат совпадает с round(Decimal, DECIMAL_ROUNDING).
+    """
+
+    def __init__(
+        self,
+        daily_sales: dict[str, dict],
+        start_date: str,
+        end_date: str,
+        window: int = DAYS,
+        rounding: int = DECIMAL_ROUNDING
+    ):
+        self.window = window
+        self.rounding = rounding
+        self.first_day = (
+            dt.strptime(start_date, DATE_FORMAT).date()
+            - timedelta(days=window)
+        )
+        last_day = dt.strptime(end_date, DATE_FORMAT).date()
+        days = (last_day - self.first_day).days + 1
+        articles = sorted({
+            article
+            for counts in daily_sales.values()
+            for article in counts
+        })
+        self.articles = np.array(articles, dtype=np.uint64)
+        index = {article: i for i, article in enumerate(articles)}
+        counts = np.zeros((days, len(articles)), dtype=np.int64)
+        for day_str, sales in daily_sales.items():
+            row = self._row(day_str)
+            if not 0 <= row < days:
+                continue
+            for article, count in sales.items():
+                counts[row, index[article]] = count
+        self.sums = self._window_sums(counts, window)
+        self.averages = self._round_half_even(
+            self.sums, window, 10 ** rounding
+        )
+        logging.info(
+            'Матрица продаж построена: %s дней × %s артикулов',
+            days,
+            len(articles)
+        )
+
+    def _row(self, day) -> int:
+        """Защищенный метод возвращает номер строки матрицы для даты."""
+        if not isinstance(day, date_type):
+            day = dt.strptime(day[:10], DATE_FORMAT).date()
+        return (day - self.first_day).days
+
+    @staticmethod
+    def _window_sums(counts: np.ndarray, window: int) -> np.ndarray:
+        """
+        Защищенный метод считает суммы продаж за окно window + 1 дней,
+        заканчивающееся каждым днем матрицы, через префиксные суммы.
+        """
+        prefix = np.zeros(
+            (counts.shape[0] + 1, counts.shape[1]), dtype=np.int64
+        )
+        np.cumsum(counts, axis=0, out=prefix[1:])
+        lower = np.maximum(np.arange(counts.shape[0]) - window, 0)
+        return prefix[1:] - prefix[lower]
+
+    @staticmethod
+    def _round_half_even(
+        sums: np.ndarray,
+        window: int,
+        scale: int
+    ) -> np.ndarray:
+        """
+        Защищенный метод делит суммы на window и округляет до 1/scale
+        по правилу half-even. Возвращает целые числа в единицах 1/scale.
+        """
+        quotient, remainder = np.divmod(sums * scale, window)
+        round_up = (2 * remainder > window) | (
+            (2 * remainder == window) & (quotient % 2 == 1)
+        )
+        return quotient + round_up
+
+    def avg_sales(
+        self,
+        date_str: str,
+        compact: bool = False
+    ) -> list[dict] | SalesBatch:
+        """
+        Метод возвращает средние продажи за дату в формате
+        WbDataBaseClient.parse_avg_sales (или SalesBatch при compact=True).
+        """
+        row = self._row(date_str)
+        if not 0 <= row < self.sums.shape[0]:
+            return SalesBatch(date_str) if compact else []
+        sold = np.nonzero(self.sums[row])[0]
+        if compact:
+            batch = SalesBatch(date_str)
+            batch.articles.extend(self.articles[sold].tolist())
+            batch.averages.extend(self.averages[row, sold].tolist())
+            return batch
+        return [
+            {
+                'дата': date_str,
+                'артикул': int(self.articles[i]),
+                'среднее значение': Decimal(
+                    int(self.averages[row, i])
+                ).scaleb(-self.rounding)
+            } for i in sold
+        ]
@@ -0,0 +1,77 @@
+import logging
+import threading
+from parser.constants import SELECT_TABLES
+from parser.decorators import connection_db
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+
+class SchemaRegistry:
+    """
+    Кэш существующих таблиц базы данных на уровне процесса.
+
+    При первом обращении список таблиц всех магазинов загружается одним
+    запросом к information_schema, дальше проверки выполняются по кэшу
+    без обращения к базе данных. Таблицы, созданные через create,
+    добавляются в кэш. Если схема изменена в обход реестра (таблицы
+    удалены или созданы другим процессом), кэш сбрасывается
+    методом invalidate.
+    """
+
+    def __init__(self):
+        self._tables = None
+        self._lock = threading.Lock()
+
+    @connection_db
+    def _load(self, cursor=None) -> set:
+        """Защищенный метод загружает список таблиц текущей базы данных."""
+        cursor.execute(SELECT_TABLES)
+        tables = {row[0] for row in cursor.fetchall()}
+        logging.info('Реестр схемы загружен: %s таблиц', len(tables))
+        return tables
+
+    def tables(self) -> set:
+        """Возвращает множество существующих таблиц."""
+        with self._lock:
+            if self._tables is None:
+                self._tables = self._load()
+            return set(self._tables)
+
+    def exists(self, table_name: str) -> bool:
+        """Проверяет, существует ли таблица."""
+        return table_name in self.tables()
+
+    def add(self, table_name: str) -> None:
+        """Отмечает таблицу, созданную в обход реестра, как существующую."""
+        with self._lock:
+            if self._tables is not None:
+                self._tables.add(table_name)
+
+    @connection_db
+    def create(self, queries: list[tuple[str, str]], cursor=None) -> list:
+        """
+        Создает на одном подключении недостающие таблицы. queries -
+        пары (название таблицы, запрос CREATE TABLE) в порядке создания
+        (таблицы, на которые ссылаются внешние ключи, - первыми).
+        Возвращает названия созданных таблиц.
+        """
+        existing = self.tables()
+        created = []
+        for table_name, query in queries:
+            if table_name in existing:
+                continue
+            cursor.execute(query)
+            self.add(table_name)
+            created.append(table_name)
+            logging.info('Таблица %s успешно создана', table_name)
+        return created
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш; список таблиц будет загружен заново."""
+        with self._lock:
+            self._tables = None
+
+
+schema_registry = SchemaRegistry()
+"""Общий реестр схемы для всех клиентов базы данных процесса."""
@@ -1,16 +1,32 @@
+import asyncio
 import logging
 import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime as dt
 from datetime import timedelta
-from parser.constants import DATE_FORMAT, NAME_OF_SHOP
+from itertools import chain
+from parser.checkpoints import PaginationCheckpoint
+from parser.constants import (ASYNC_MAX_SHOPS, CLAIM_RETRY_PAUSE, DATE_FORMAT,
+                              DAYS, DAYS_PER_COMMIT, MAX_CLAIM_ERRORS,
+                              MAX_WORKERS, NAME_OF_SHOP, PROCESSES)
 from parser.decorators import time_of_function
 from parser.logging_config import setup_logging
+from parser.pipeline import Pipeline
+from parser.records import SalesBatch, StocksBatch
+from parser.response_cache import ResponseCache
+from parser.sales_engine import RollingSalesEngine
+from parser.wb_async_tools import AsyncWbAnalyticsClient
 from parser.wb_db import WbDataBaseClient
 from parser.wb_tools import WbAnalyticsClient
+from parser.work_queue import WorkQueue
 
+import aiohttp
 from dotenv import load_dotenv
 
 setup_logging()
+logger = logging.getLogger(__name__)
 
 
 def initialize_components() -> tuple:
@@ -105,7 +121,9 @@ def save_to_database(
     formatter_sales: list[dict]
 ) -> None:
     """
-    Сохраняет данные в базу данных.
+    Сохраняет данные в базу данных одной транзакцией. Агрегаты недели
+    и месяца, в которые попадает дата, пересчитываются в той же
+    транзакции (см. RollupManager).
     Args:
         - db_client (WbDataBaseClient): Клиент для работы с базой данных.
         - date_str (str): Дата в формате 'YYYY-MM-DD' для сохранения.
@@ -113,15 +131,217 @@ def save_to_database(
         остатках и продуктах.
         - formatter_sales (list[dict]): Отформатированные данные о продажах.
     """
-    queries = [
-        db_client.validate_date_db(date_str),
-        db_client.validate_products_db(formatter_data),
-        db_client.validate_stocks_db(formatter_data),
-        db_client.validate_sales_db(formatter_sales)
+    db_client.save_days(
+        name_of_shop, [(date_str, formatter_data, formatter_sales)]
+    )
+
+
+def update_sales_incremental(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    name_of_shop: str,
+    date_str: str
+) -> list[dict]:
+    """
+    Инкрементально обновляет заказы магазина и рассчитывает средние продажи.
+
+    Запрашивает только заказы, измененные после сохраненного курсора
+    lastChangeDate (при первом запуске - за все DAYS дней). Страницы
+    заказов сначала получаются целиком и сразу сжимаются до строк
+    запроса, затем заказы вместе с новым курсором сохраняются одной
+    короткой транзакцией, которая не ждет сетевых запросов, и средние
+    продажи считаются по сохраненным заказам. Вызывается до открытия
+    транзакции записи отчетов дня: если она откатится, курсор уже
+    сдвинут, но заказы сохранены, и повторная выгрузка посчитает
+    продажи по ним.
+
+    Args:
+        - client (WbAnalyticsClient): Клиент для работы с API Wildberries.
+        - db_client (WbDataBaseClient): Клиент для работы с базой данных.
+        - name_of_shop (str): Название магазина.
+        - date_str (str): Дата в формате 'YYYY-MM-DD'.
+
+    Returns:
+        SalesBatch: Средние продажи в колоночном формате.
+    """
+    start_date = (
+        dt.strptime(date_str, DATE_FORMAT) - timedelta(days=DAYS)
+    ).strftime(DATE_FORMAT)
+    date_from = db_client.get_sales_cursor() or start_date
+    logging.info(
+        'Инкрементальная выгрузка продаж магазина %s с %s',
+        name_of_shop,
+        date_from
+    )
+
+    queries = []
+    last_change_date = None
+    for page in client.iter_order_pages(date_from):
+        last_change_date = page[-1]['lastChangeDate']
+        query, params = db_client.validate_orders_db(page, start_date)
+        if params != []:
+            queries.append((query, params))
+    if last_change_date:
+        queries.append(db_client.validate_cursor_db(last_change_date))
+    queries.append(db_client.validate_orders_cleanup(date_str))
+    db_client.save_stream_to_db(name_of_shop, queries)
+    return db_client.get_avg_sales_from_orders(date_str, compact=True)
+
+
+def stream_to_database(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    name_of_shop: str,
+    date_str: str,
+    incremental: bool = False
+) -> int:
+    """
+    Получает, обрабатывает и сохраняет данные за дату.
+
+    Страницы отчета об остатках по мере получения разбираются
+    в колоночный формат, продажи агрегируются за один проход
+    по страницам отчета. Транзакция записи дня открывается только после
+    получения всех данных из API и не ждет сетевых запросов, поэтому
+    блокировки строк держатся лишь на время самой записи.
+
+    Args:
+        - client (WbAnalyticsClient): Клиент для работы с API Wildberries.
+        - db_client (WbDataBaseClient): Клиент для работы с базой данных.
+        - name_of_shop (str): Название магазина.
+        - date_str (str): Дата в формате 'YYYY-MM-DD'.
+        - incremental (bool): Рассчитывать продажи инкрементально
+        (см. update_sales_incremental).
+
+    Returns:
+        int: Количество записанных строк.
+    """
+    sales = _daily_sales(
+        client, db_client, name_of_shop, date_str, incremental
+    )
+    stocks = _fetch_stocks(client, db_client, date_str)
+    queries = chain(
+        [db_client.validate_date_db(date_str)],
+        _stock_queries(db_client, stocks),
+        [db_client.validate_sales_db(sales)]
+    )
+    return db_client.save_stream_to_db(name_of_shop, queries)
+
+
+def _fetch_stocks(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    date_str: str
+) -> list[StocksBatch]:
+    """
+    Получает все страницы отчета об остатках за дату до записи в базу.
+    Каждая страница сразу разбирается в колоночный формат.
+    """
+    return [
+        db_client.parse_product_data(page, date_str, compact=True)
+        for page in client.iter_stock_pages(date_str, date_str)
     ]
 
-    for query in queries:
-        db_client.save_to_db(name_of_shop, query)
+
+def _stock_queries(
+    db_client: WbDataBaseClient,
+    stocks: list[StocksBatch]
+) -> Iterator[tuple]:
+    """Поочередно отдает запросы записи остатков по страницам отчета."""
+    for products in stocks:
+        yield db_client.validate_products_db(products)
+        yield db_client.validate_stocks_db(products)
+
+
+def _daily_sales(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    name_of_shop: str,
+    date_str: str,
+    incremental: bool = False
+) -> SalesBatch:
+    """
+    Возвращает средние продажи за дату. Вызывается до открытия
+    транзакции записи отчетов дня, поэтому инкрементальное обновление
+    заказов (см. update_sales_incremental) фиксируется отдельно от нее.
+    """
+    if incremental:
+        return update_sales_incremental(
+            client, db_client, name_of_shop, date_str
+        )
+    return db_client.parse_avg_sales(
+        chain.from_iterable(client.iter_sales_pages(date_str)),
+        date_str,
+        compact=True
+    )
+
+
+def load_report(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    name_of_shop: str,
+    date_str: str,
+    report: str,
+    incremental: bool = False
+) -> int:
+    """
+    Получает и сохраняет один отчет магазина за дату ('stocks' или
+    'sales') одной транзакцией, которая открывается после получения
+    отчета из API.
+
+    Returns:
+        int: Количество записанных строк.
+    """
+    reports = {
+        'stocks': lambda: _stock_queries(
+            db_client, _fetch_stocks(client, db_client, date_str)
+        ),
+        'sales': lambda: [db_client.validate_sales_db(_daily_sales(
+            client, db_client, name_of_shop, date_str, incremental
+        ))]
+    }
+    if report not in reports:
+        raise ValueError(f'Неизвестный тип отчета: {report}')
+    queries = chain([db_client.validate_date_db(date_str)], reports[report]())
+    return db_client.save_stream_to_db(name_of_shop, queries)
+
+
+def pipeline_to_database(
+    client: WbAnalyticsClient,
+    db_client: WbDataBaseClient,
+    name_of_shop: str,
+    date_str: str,
+    incremental: bool = False
+) -> int:
+    """
+    Конвейерный вариант stream_to_database.
+
+    Получение страниц из API, их разбор и подготовка запросов записи
+    выполняются одновременно в отдельных потоках, связанных
+    ограниченными очередями (см. Pipeline); отчет о продажах
+    загружается одновременно с отчетом об остатках, а запросы каждой
+    страницы записываются отдельной транзакцией, пока следующие
+    страницы еще загружаются. Статистика стадий логируется
+    по завершении выгрузки.
+
+    Args:
+        - client (WbAnalyticsClient): Клиент для работы с API Wildberries.
+        - db_client (WbDataBaseClient): Клиент для работы с базой данных.
+        - name_of_shop (str): Название магазина.
+        - date_str (str): Дата в формате 'YYYY-MM-DD'.
+        - incremental (bool): Рассчитывать продажи инкрементально
+        (см. update_sales_incremental).
+
+    Returns:
+        int: Количество записанных строк.
+    """
+    return Pipeline(
+        client,
+        db_client,
+        name_of_shop,
+        date_str,
+        incremental=incremental,
+        sales_updater=update_sales_incremental
+    ).run()
 
 
 @time_of_function
@@ -130,36 +350,52 @@ def all_data_for_period(
     name_of_shop: str,
     db_client: WbDataBaseClient,
     start_date: str,
-    end_date: str
+    end_date: str,
+    days_per_commit: int = DAYS_PER_COMMIT
 ) -> None:
     """
     Функция для заполнения существующих таблиц базы данных
     данными за заданный период.
+
+    Заказы за весь период (с учетом окна DAYS перед start_date)
+    запрашиваются один раз и группируются по дням и артикулам,
+    средние продажи всех дней считаются по этой выборке одним
+    векторным проходом (RollingSalesEngine).
+    Остатки запрашиваются по дням, данные каждых days_per_commit дней
+    сохраняются одной транзакцией (см. WbDataBaseClient.save_days)
+    вместе с пересчетом агрегатов затронутых недель и месяцев.
     Args:
         - db_client (WbDataBaseClient): Клиент для работы с базой данных.
         - client (WbAnalyticsClient): Клиент для работы с API Wildberries.
         - start_date (str): Начальная дата периода.
         - end_date (str): Конечная дата периода.
+        - days_per_commit (int): Количество дней в одной транзакции.
     """
     fdate_start = dt.strptime(start_date, DATE_FORMAT).date()
     fdate_end = dt.strptime(end_date, DATE_FORMAT).date()
     days = (fdate_end - fdate_start).days + 1
     date_list = [fdate_start + timedelta(days=i) for i in range(days)]
     date_str_list = [d.strftime(DATE_FORMAT) for d in date_list]
-    for date in date_str_list:
-        stocks = client.get_all_stock_reports(start_date=date, end_date=date)
-        slaes = client.get_all_sales_reports(date_str=date)
-        parse_sales = db_client.parse_avg_sales(data=slaes, date_str=date)
-        parse_products = db_client.parse_product_data(
-            data=stocks, date_str=date)
-        queries = [
-            db_client.validate_date_db(date_str=date),
-            db_client.validate_products_db(data=parse_products),
-            db_client.validate_stocks_db(data=parse_products),
-            db_client.validate_sales_db(data=parse_sales)
-        ]
-        for query in queries:
-            db_client.save_to_db(name_of_shop, query)
+    sales_start = (
+        fdate_start - timedelta(days=DAYS)
+    ).strftime(DATE_FORMAT)
+    daily_sales = db_client.parse_daily_sales(
+        chain.from_iterable(client.iter_order_pages(sales_start)),
+        start_date=sales_start,
+        end_date=end_date
+    )
+    sales_engine = RollingSalesEngine(daily_sales, start_date, end_date)
+
+    def period_days():
+        for date in date_str_list:
+            stocks = client.get_all_stock_reports(
+                start_date=date, end_date=date)
+            parse_products = db_client.parse_product_data(
+                data=stocks, date_str=date, compact=True)
+            yield date, parse_products, sales_engine.avg_sales(
+                date, compact=True)
+
+    db_client.save_days(name_of_shop, period_days(), days_per_commit)
 
 
 def export_data(
@@ -186,12 +422,150 @@ def export_data(
     client.save_to_json(all_data, date_str)
 
 
+def process_shop(
+    token_client,
+    shop_name: str,
+    date_str: str,
+    date_start: str = '',
+    date_end: str = '',
+    incremental: bool = False,
+    cache: ResponseCache = None,
+    pipeline: bool = False
+) -> None:
+    """
+    Выполняет полный цикл выгрузки для одного магазина:
+    получение данных из API, обработку и сохранение в базу данных
+    (либо выгрузку за период, если переданы date_start и date_end).
+    При incremental=True продажи выгружаются инкрементально
+    по сохраненному курсору, cache - кэш ответов API (опционально).
+    При pipeline=True ежедневная выгрузка выполняется конвейером
+    (см. pipeline_to_database).
+    Прерванная постраничная выгрузка продолжается с контрольной точки.
+    """
+    token = token_client.decrypt(shop_name)
+    db_client = WbDataBaseClient(shop_name)
+    daily = not date_start and not date_end
+    if not (daily and pipeline):
+        # Конвейер создает таблицы сам перед запуском стадий.
+        db_client.ensure_tables()
+    with WbAnalyticsClient(
+        token,
+        cache=cache,
+        shop_name=shop_name,
+        checkpoints=PaginationCheckpoint()
+    ) as client:
+        if daily:
+            load = pipeline_to_database if pipeline else stream_to_database
+            load(client, db_client, shop_name, date_str, incremental)
+            token_client.encrypt(shop_name, token)
+        else:
+            all_data_for_period(
+                client,
+                shop_name,
+                db_client,
+                start_date=date_start,
+                end_date=date_end
+            )
+
+
+def run_shop(
+    token_client,
+    shop_name: str,
+    date_str: str,
+    date_start: str = '',
+    date_end: str = '',
+    incremental: bool = False,
+    cache: ResponseCache = None,
+    pipeline: bool = False
+) -> dict:
+    """
+    Обертка над process_shop, изолирующая ошибки магазина.
+    Исключение не пробрасывается дальше, а записывается в результат,
+    чтобы сбой одного магазина не прерывал обработку остальных.
+    """
+    start_ts = time.time()
+    try:
+        process_shop(
+            token_client,
+            shop_name,
+            date_str,
+            date_start,
+            date_end,
+            incremental,
+            cache,
+            pipeline
+        )
+    except Exception as error:
+        return _shop_result(shop_name, start_ts, error)
+    return _shop_result(shop_name, start_ts)
+
+
+def _shop_result(
+    shop_name: str,
+    start_ts: float,
+    error: Exception = None
+) -> dict:
+    """Формирует запись о результате обработки магазина."""
+    if error is None:
+        status = 'SUCCESS'
+        error_type = error_message = None
+    else:
+        logging.error(
+            'Ошибка обработки магазина %s: %s',
+            shop_name,
+            error,
+            exc_info=error
+        )
+        status = 'ERROR'
+        error_type, error_message = type(error).__name__, str(error)
+    return {
+        'SHOP': shop_name,
+        'STATUS': status,
+        'EXECUTION_TIME': round(time.time() - start_ts, 3),
+        'ERROR_TYPE': error_type,
+        'ERROR_MESSAGE': error_message
+    }
+
+
+def _log_results(results: list[dict]) -> None:
+    """Логирует итоговый статус обработки каждого магазина."""
+    for result in results:
+        logger.bot_event(
+            '%s Магазин %s обработан со статусом %s за %s сек.',
+            '✅' if result['STATUS'] == 'SUCCESS' else '❌',
+            result['SHOP'],
+            result['STATUS'],
+            result['EXECUTION_TIME']
+        )
+
+
+def _log_summary(results: list[dict], elapsed: float) -> None:
+    """
+    Логирует сводку запуска: количество обработанных и неудачных
+    магазинов, суммарное время обработки магазинов и общее время.
+    """
+    failed = sum(result['STATUS'] != 'SUCCESS' for result in results)
+    logging.info(
+        'Обработано магазинов: %s, с ошибкой: %s. Суммарное время '
+        'обработки магазинов %s сек., общее время %s сек.',
+        len(results),
+        failed,
+        round(sum(result['EXECUTION_TIME'] for result in results), 3),
+        round(elapsed, 3)
+    )
+
+
 def main_logic(
     token_client,
     all_shops: bool = True,
     date_start: str = '',
-    date_end: str = ''
-) -> None:
+    date_end: str = '',
+    max_workers: int = MAX_WORKERS,
+    incremental: bool = False,
+    cache: ResponseCache = None,
+    pipeline: bool = False,
+    processes: int = PROCESSES
+) -> list[dict]:
     """
     Функция основной логики скрипта.
     Принимает на входи аргументы:
@@ -203,6 +577,19 @@ def main_logic(
     данных за определенный период (опциональный).
     - date_end - принимает конечную дату формата 'YYYY-MM-DD' для выгрузки
     данных за определенный период (опциональный).
+    - max_workers - количество магазинов, обрабатываемых параллельно
+    в пуле потоков; при значении 1 магазины обрабатываются
+    последовательно (опциональный).
+    - incremental - по умолчанию False (полная выгрузка продаж
+    за DAYS дней), True - продажи выгружаются только с момента
+    предыдущей выгрузки (опциональный).
+    - cache - кэш ответов API ResponseCache для записи страниц или
+    воспроизведения выгрузки без обращения к API (опциональный).
+    - pipeline - по умолчанию False, True - получение, разбор и запись
+    данных магазина выполняются одновременно конвейером (опциональный).
+    - processes - количество процессов, между которыми распределяются
+    магазины; в каждом процессе магазины обрабатываются пулом
+    из max_workers потоков (опциональный).
 
     Выполняет последовательность операций:
     1. Инициализация компонентов (БД клиент, API клиент).
@@ -211,36 +598,297 @@ def main_logic(
     4. Сохранение данных в базу данных.
     5. Выполнение скрипта только для тестового магазина (опционально).
     6. Выгрузка данных за период (опционально).
+
+    Returns:
+        list[dict]: Результаты обработки по каждому магазину
+        в порядке списка магазинов.
     """
+    start_ts = time.time()
     date_str = (dt.now() - timedelta(days=1)).strftime(DATE_FORMAT)
     shops = token_client.get_exists_shop()
     if not all_shops:
         shops = [NAME_OF_SHOP]
-    for shop_name in shops:
-        token = token_client.decrypt(shop_name)
-        client = WbAnalyticsClient(token)
-        db_client = WbDataBaseClient(shop_name)
-        if not date_start and not date_end:
-            all_sales, all_data = fetch_data(client, date_str)
+    args = (date_str, date_start, date_end, incremental, cache, pipeline)
+    if processes <= 1 or len(shops) <= 1:
+        results = run_shops(token_client, shops, args, max_workers)
+    else:
+        results = _run_sharded(
+            token_client, shops, args, max_workers, processes
+        )
+    _log_results(results)
+    _log_summary(results, time.time() - start_ts)
+    return results
+
+
+def run_shops(
+    token_client,
+    shops: list[str],
+    args: tuple,
+    max_workers: int = MAX_WORKERS
+) -> list[dict]:
+    """
+    Обрабатывает список магазинов в пуле из max_workers потоков
+    (при max_workers <= 1 - последовательно). В args передаются
+    аргументы run_shop после названия магазина.
+
+    Returns:
+        list[dict]: Результаты обработки по каждому магазину
+        в порядке списка магазинов.
+    """
+    if max_workers <= 1 or len(shops) <= 1:
+        return [run_shop(token_client, shop, *args) for shop in shops]
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix='shop'
+    ) as executor:
+        futures = [
+            executor.submit(run_shop, token_client, shop, *args)
+            for shop in shops
+        ]
+        return [future.result() for future in futures]
+
+
+def _run_sharded(
+    token_client,
+    shops: list[str],
+    args: tuple,
+    max_workers: int,
+    processes: int
+) -> list[dict]:
+    """
+    Распределяет магазины по processes процессам (магазин i попадает
+    в процесс i % processes) и собирает результаты в порядке списка
+    магазинов. Каждый процесс обрабатывает свою часть магазинов через
+    run_shops со своими HTTP-сессиями, подключениями к базе данных
+    и ограничителем запросов: токен магазина используется только
+    в одном процессе, поэтому квоты API не делятся между процессами.
+    Если процесс завершился аварийно, его магазины отмечаются ошибкой.
+    """
+    shards = [shops[i::processes] for i in range(min(processes, len(shops)))]
+    by_shop = {}
+    start_ts = time.time()
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = {
+            executor.submit(
+                run_shops, token_client, shard, args, max_workers
+            ): shard
+            for shard in shards
+        }
+        for future, shard in futures.items():
+            try:
+                shard_results = future.result()
+            except Exception as error:
+                shard_results = [
+                    _shop_result(shop, start_ts, error) for shop in shard
+                ]
+            for result in shard_results:
+                by_shop[result['SHOP']] = result
+    return [by_shop[shop] for shop in shops]
+
+
+def process_item(
+    token_client,
+    item: dict,
+    incremental: bool = False,
+    cache: ResponseCache = None
+) -> int:
+    """
+    Выполняет задание очереди: выгружает отчет item['report']
+    магазина item['shop_name'] за дату item['date'].
+    """
+    shop_name = item['shop_name']
+    token = token_client.decrypt(shop_name)
+    db_client = WbDataBaseClient(shop_name)
+    db_client.ensure_tables()
+    with WbAnalyticsClient(
+        token,
+        cache=cache,
+        shop_name=shop_name,
+        checkpoints=PaginationCheckpoint()
+    ) as client:
+        rows = load_report(
+            client,
+            db_client,
+            shop_name,
+            item['date'],
+            item['report'],
+            incremental
+        )
+    token_client.encrypt(shop_name, token)
+    return rows
+
+
+def run_queue_worker(
+    token_client,
+    work_queue: WorkQueue,
+    incremental: bool = False,
+    cache: ResponseCache = None,
+    sleep=time.sleep
+) -> list[dict]:
+    """
+    Забирает задания из очереди и выполняет их, пока очередь не опустеет.
+    Аренда задания продлевается на время выполнения, ошибка задания
+    возвращает его в очередь и не прерывает обработку остальных.
+    Ошибка получения задания (взаимоблокировка, потеря подключения)
+    логируется, и после паузы задание запрашивается снова; после
+    MAX_CLAIM_ERRORS ошибок подряд поток завершает работу.
+
+    Returns:
+        list[dict]: Результаты выполнения заданий.
+    """
+    results = []
+    errors = 0
+    while True:
+        try:
+            item = work_queue.claim()
+        except Exception as error:
+            errors += 1
+            if errors >= MAX_CLAIM_ERRORS:
+                logging.error(
+                    'Не удалось получить задание очереди %s раз подряд, '
+                    'поток завершает работу: %s',
+                    errors,
+                    error
+                )
+                break
+            pause = CLAIM_RETRY_PAUSE * errors
+            logging.warning(
+                'Ошибка получения задания очереди: %s. Повтор через %s сек.',
+                error,
+                pause
+            )
+            sleep(pause)
+            continue
+        errors = 0
+        if item is None:
+            break
+        label = f'{item["shop_name"]}:{item["report"]}:{item["date"]}'
+        start_ts = time.time()
+        try:
+            with work_queue.leased(item['id']):
+                process_item(token_client, item, incremental, cache)
+        except Exception as error:
+            work_queue.fail(item['id'], error)
+            results.append(_shop_result(label, start_ts, error))
+            continue
+        if not work_queue.complete(item['id']):
+            logging.warning(
+                'Задание %s выполнено после потери аренды', label
+            )
+        results.append(_shop_result(label, start_ts))
+    return results
+
+
+def main_logic_queue(
+    token_client,
+    all_shops: bool = True,
+    max_workers: int = MAX_WORKERS,
+    incremental: bool = False,
+    cache: ResponseCache = None,
+    work_queue: WorkQueue = None
+) -> list[dict]:
+    """
+    Вариант main_logic для нескольких контейнеров парсера.
+    Ставит в очередь задания за вчерашний день для всех магазинов
+    (уже поставленные другими контейнерами не дублируются) и выполняет
+    их в max_workers потоках, пока очередь не опустеет.
+
+    Returns:
+        list[dict]: Результаты выполнения заданий этим процессом.
+    """
+    start_ts = time.time()
+    work_queue = work_queue or WorkQueue()
+    date_str = (dt.now() - timedelta(days=1)).strftime(DATE_FORMAT)
+    shops = token_client.get_exists_shop()
+    if not all_shops:
+        shops = [NAME_OF_SHOP]
+    work_queue.enqueue(shops, date_str)
+    args = (token_client, work_queue, incremental, cache)
+    with ThreadPoolExecutor(
+        max_workers=max(max_workers, 1),
+        thread_name_prefix='queue'
+    ) as executor:
+        futures = [
+            executor.submit(run_queue_worker, *args)
+            for _ in range(max(max_workers, 1))
+        ]
+        results = list(chain.from_iterable(
+            future.result() for future in futures
+        ))
+    _log_results(results)
+    _log_summary(results, time.time() - start_ts)
+    return results
+
+
+async def process_shop_async(
+    token_client,
+    shop_name: str,
+    date_str: str,
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore
+) -> dict:
+    """
+    Асинхронно выгружает данные одного магазина за дату.
+    Отчеты о продажах и остатках запрашиваются одновременно,
+    обращения к базе данных выполняются в отдельных потоках.
+    """
+    async with semaphore:
+        start_ts = time.time()
+        try:
+            token = await asyncio.to_thread(token_client.decrypt, shop_name)
+            client = AsyncWbAnalyticsClient(token, session=session)
+            all_sales, all_data = await asyncio.gather(
+                client.get_all_sales_reports(date_str),
+                client.get_all_stock_reports(
+                    start_date=date_str, end_date=date_str)
+            )
+            db_client = WbDataBaseClient(shop_name)
+            await asyncio.to_thread(db_client.ensure_tables)
             formatter_sales, formatter_data = process_data(
                 db_client,
                 all_sales,
                 all_data,
                 date_str
             )
-            save_to_database(
+            await asyncio.to_thread(
+                save_to_database,
                 db_client,
                 shop_name,
                 date_str,
                 formatter_data,
                 formatter_sales
             )
-            token_client.encrypt(shop_name, token)
-        else:
-            all_data_for_period(
-                client,
-                shop_name,
-                db_client,
-                start_date=date_start,
-                end_date=date_end
+            await asyncio.to_thread(token_client.encrypt, shop_name, token)
+        except Exception as error:
+            return _shop_result(shop_name, start_ts, error)
+        return _shop_result(shop_name, start_ts)
+
+
+async def main_logic_async(
+    token_client,
+    all_shops: bool = True,
+    max_shops: int = ASYNC_MAX_SHOPS
+) -> list[dict]:
+    """
+    Асинхронный вариант main_logic для ежедневной выгрузки.
+    Все магазины обрабатываются в одном потоке событий через общую
+    HTTP-сессию; одновременно обрабатывается не более max_shops магазинов.
+
+    Returns:
+        list[dict]: Результаты обработки по каждому магазину
+        в порядке списка магазинов.
+    """
+    date_str = (dt.now() - timedelta(days=1)).strftime(DATE_FORMAT)
+    shops = await asyncio.to_thread(token_client.get_exists_shop)
+    if not all_shops:
+        shops = [NAME_OF_SHOP]
+    semaphore = asyncio.Semaphore(max_shops)
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(
+            process_shop_async(
+                token_client, shop, date_str, session, semaphore
             )
+            for shop in shops
+        ))
+    _log_results(results)
+    return list(results)
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import time
+from parser.constants import (DATA_PAGE_LIMIT, POOL_MAXSIZE, REQUEST_TIMEOUT,
+                              RUN_TIMEOUT, SALES_FIELDS)
+from parser.exceptions import DataFetchError
+from parser.logging_config import setup_logging
+from parser.rate_limiter import RateLimiter, rate_limiter
+from parser.retry_policy import RetryPolicy
+from parser.wb_tools import WbAnalyticsClient
+from urllib.parse import urlparse
+
+import aiohttp
+import ijson
+
+setup_logging()
+
+
+class AsyncWbAnalyticsClient:
+    """
+    Асинхронный класс, который работает с API Wildberries.
+
+    Повторяет семантику пагинации WbAnalyticsClient, но не занимает поток
+    на время ожидания ответа или квоты, поэтому один процесс может вести
+    запросы сразу для многих магазинов. Квоты соблюдаются через общий
+    RateLimiter по ключу (хост API, токен продавца).
+    """
+
+    PRODUCT_DATA_URL = WbAnalyticsClient.PRODUCT_DATA_URL
+    AVG_SALES_URL = WbAnalyticsClient.AVG_SALES_URL
+    RETRYABLE_ERRORS = (
+        aiohttp.ClientResponseError,
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError
+    )
+
+    def __init__(
+        self,
+        token: str,
+        limiter: RateLimiter = rate_limiter,
+        timeout: tuple = REQUEST_TIMEOUT,
+        run_timeout: float = RUN_TIMEOUT,
+        session: aiohttp.ClientSession = None,
+        retry: RetryPolicy = None
+    ):
+        if not token:
+
+            logging.error('Токен не действителен или отсутствует.')
+
+            raise ValueError('API token is required')
+        self.token = token
+        self.headers = {
+            "Authorization": self.token,
+            "Content-Type": "application/json"
+        }
+        self.limiter = limiter
+        self.timeout = aiohttp.ClientTimeout(
+            connect=timeout[0],
+            sock_read=timeout[1]
+        )
+        self.deadline = time.monotonic() + run_timeout if run_timeout else None
+        self.session = session
+        self._owns_session = session is None
+        self.retry = retry if retry is not None else RetryPolicy()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Закрывает HTTP-сессию, если она создана клиентом,
+        и логирует статистику повторных запросов.
+        """
+        logging.info('Статистика повторных запросов: %s', self.retry.stats())
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Защищенный метод возвращает (создает) HTTP-сессию."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=POOL_MAXSIZE),
+                timeout=self.timeout
+            )
+        return self.session
+
+    def _check_deadline(self) -> None:
+        """
+        Защищенный метод прерывает работу клиента, если превышено
+        предельное время выполнения.
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            logging.error('Превышено предельное время работы клиента API.')
+            raise DataFetchError('Превышено предельное время работы клиента')
+
+    async def _acquire(self, url: str) -> None:
+        """
+        Защищенный метод ждет, пока выключатель и квота позволят
+        отправить запрос.
+        """
+        self._check_deadline()
+        pause = self.retry.pause(url)
+        if pause > 0:
+            logging.info(
+                '⏳ Запросы к %s приостановлены: %s сек.',
+                urlparse(url).netloc,
+                round(pause, 3)
+            )
+            await asyncio.sleep(pause)
+        wait = self.limiter.reserve(url, self.token)
+        if wait > 0:
+            logging.info(
+                '⏳ Ожидание квоты API %s: %s сек.',
+                urlparse(url).netloc,
+                round(wait, 3)
+            )
+            await asyncio.sleep(wait)
+        self._check_deadline()
+
+    @staticmethod
+    def _http_status(error: DataFetchError):
+        """
+        Защищенный метод возвращает код ответа сервера, вызвавший ошибку,
+        или None, если ошибка не связана с HTTP-ответом.
+        """
+        cause = error.__cause__
+        if isinstance(cause, aiohttp.ClientResponseError):
+            return cause.status
+        return None
+
+    @staticmethod
+    async def _decode_sales(response: aiohttp.ClientResponse) -> list[dict]:
+        """
+        Защищенный метод потоково разбирает ответ с заказами и оставляет
+        у каждого заказа только поля SALES_FIELDS.
+        """
+        return [
+            {field: item[field] for field in SALES_FIELDS if field in item}
+            async for item in ijson.items(
+                response.content, 'item', use_float=True
+            )
+        ]
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        decoder=None,
+        **kwargs
+    ):
+        """
+        Защищенный метод выполняет запрос с учетом квоты
+        и возвращает ответ, разобранный из JSON (или функцией decoder).
+        """
+        await self._acquire(url)
+        async with self._get_session().request(
+            method,
+            url,
+            headers=self.headers,
+            timeout=self.timeout,
+            **kwargs
+        ) as response:
+            logging.info(
+                '\nАсинхронный запрос.'
+                '\nURL: %s'
+                '\nСтатус: %s',
+                url,
+                response.status
+            )
+            self.limiter.update(
+                url,
+                self.token,
+                response.headers,
+                response.status
+            )
+            response.raise_for_status()
+            self.retry.success(url)
+            if decoder is not None:
+                return await decoder(response)
+            return await response.json(content_type=None)
+
+    async def _get_sale_report(self, date: str) -> list:
+        """
+        Защищенный метод, формирующий запрос к API Wildberries
+        без учета пагинации.
+        """
+        try:
+            return await self._request(
+                'GET',
+                self.AVG_SALES_URL,
+                decoder=self._decode_sales,
+                params={"dateFrom": date}
+            )
+        except Exception as error:
+            logging.error('Ошибка при получении данных: %s', error)
+            raise DataFetchError(
+                f'Не удалось получить данные sales: {error}'
+            ) from error
+
+    async def _get_stock_report(
+        self,
+        start_date: str,
+        end_date: str,
+        offset: int = 0,
+        limit: int = DATA_PAGE_LIMIT
+    ) -> dict:
+        """
+        Защищенный метод, формирующий запрос к API Wildberries
+        без учета пагинации.
+        """
+        try:
+            return await self._request(
+                'POST',
+                self.PRODUCT_DATA_URL,
+                json=WbAnalyticsClient._stock_payload(
+                    start_date, end_date, offset, limit
+                )
+            )
+        except Exception as error:
+            logging.error('Ошибка при получении данных: %s', error)
+            raise DataFetchError(
+                f'Не удалось получить данные stocks: {error}'
+            ) from error
+
+    async def _retry(
+        self,
+        url: str,
+        error: DataFetchError,
+        attempt: int
+    ) -> None:
+        """
+        Защищенный метод ждет перед повторной попыткой запроса
+        по политике повторов или пробрасывает ошибку. Повторяются только
+        ошибки ответа сервера и сетевые ошибки (RETRYABLE_ERRORS),
+        остальные пробрасываются сразу и не учитываются выключателем
+        (см. WbAnalyticsClient._retry).
+        """
+        if not isinstance(error.__cause__, self.RETRYABLE_ERRORS):
+            raise error
+        wait = self.retry.backoff(url, self._http_status(error), attempt)
+        if wait is None:
+            raise error
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def get_all_sales_reports(self, date_str: str) -> list[dict]:
+        """
+        Метод, формирующий запрос к API Wildberries
+        с учетом пагинации.
+        """
+        start_date, end_date = WbAnalyticsClient._sales_period(date_str)
+        all_data = []
+        current_date = start_date
+        attempts = 0
+
+        while True:
+            try:
+                result = await self._get_sale_report(current_date)
+            except DataFetchError as error:
+                attempts += 1
+                await self._retry(self.AVG_SALES_URL, error, attempts)
+                continue
+            attempts = 0
+            if not result:
+                logging.info('✅ Все страницы загружены.')
+                break
+            all_data.extend(
+                WbAnalyticsClient._filter_sales(result, start_date, end_date)
+            )
+            current_date = result[-1]['lastChangeDate']
+        return all_data
+
+    async def get_all_stock_reports(
+        self,
+        start_date: str,
+        end_date: str,
+        limit: int = DATA_PAGE_LIMIT
+    ) -> list[dict]:
+        """
+        Метод, формирующий запрос к API Wildberries
+        с учетом пагинации.
+        """
+        offset = 0
+        all_data = []
+        attempts = 0
+
+        while True:
+            try:
+                result = await self._get_stock_report(
+                    start_date, end_date, offset=offset, limit=limit)
+            except DataFetchError as error:
+                attempts += 1
+                await self._retry(self.PRODUCT_DATA_URL, error, attempts)
+                continue
+            attempts = 0
+            if not result or 'data' not in result:
+                logging.warning('Данные из api не получены.')
+                break
+            data = result.get('data', {})
+            if not data.get('items', []):
+                logging.info('✅ Все страницы загружены.')
+                break
+            all_data.extend(data['items'])
+            offset += limit
+        return all_data
@@ -1,15 +1,44 @@
 import logging
 from collections import defaultdict
+from collections.abc import Iterable
 from datetime import datetime as dt
+from datetime import timedelta
 from decimal import Decimal
-from parser.constants import (CREATE_DATES_TABLE, CREATE_PRODUCTS_TABLE,
-                              CREATE_SALES_TABLE, CREATE_STOCKS_TABLE,
-                              DATE_FORMAT, DAYS, DECIMAL_ROUNDING,
-                              INSERT_DATES, INSERT_PRODUCTS, INSERT_SALES,
-                              INSERT_STOCKS, NAME_OF_SHOP)
+from parser.bulk_loader import BulkLoader
+from parser.change_tracker import ChangeTracker
+from parser.constants import (BULK_CHUNK_SIZE, CREATE_CURSORS_TABLE,
+                              CREATE_DATES_TABLE, CREATE_ORDERS_TABLE,
+                              CREATE_PARTITIONED_SALES_TABLE,
+                              CREATE_PARTITIONED_STOCKS_TABLE,
+                              CREATE_PRODUCTS_TABLE, CREATE_ROLLUP_TABLE,
+                              CREATE_SALES_TABLE, CREATE_SHARED_CURSORS_TABLE,
+                              CREATE_SHARED_ORDERS_TABLE,
+                              CREATE_SHARED_PRODUCTS_TABLE,
+                              CREATE_SHARED_ROLLUP_TABLE,
+                              CREATE_SHARED_SALES_TABLE,
+                              CREATE_SHARED_STOCKS_TABLE, CREATE_SHOPS_TABLE,
+                              CREATE_STOCKS_TABLE, DATE_FORMAT, DAYS,
+                              DAYS_PER_COMMIT, DECIMAL_ROUNDING,
+                              DELETE_OLD_ORDERS, DELETE_SHARED_OLD_ORDERS,
+                              DIFF_STOCKS, INSERT_CURSOR, INSERT_DATES,
+                              INSERT_ORDERS, INSERT_PRODUCTS, INSERT_SALES,
+                              INSERT_SHARED_CURSOR, INSERT_SHARED_ORDERS,
+                              INSERT_SHARED_PRODUCTS, INSERT_SHARED_SALES,
+                              INSERT_SHARED_STOCKS, INSERT_SHOP, INSERT_STOCKS,
+                              NAME_OF_SHOP, PARTITION_BY_DATE,
+                              PARTITIONED_REPORTS, SALES_CURSOR, SELECT_CURSOR,
+                              SELECT_DATE_RANGE, SELECT_SALES_COUNTS,
+                              SELECT_SHARED_CURSOR, SELECT_SHARED_DATE_RANGE,
+                              SELECT_SHARED_SALES_COUNTS, SELECT_SHOP_ID,
+                              SHARED_SCHEMA, SHOPS_TABLE_NAME)
 from parser.decorators import connection_db
 from parser.exceptions import RefTableError, TableNameError, TypeDataError
 from parser.logging_config import setup_logging
+from parser.partitions import partition_manager
+from parser.purge import Purger
+from parser.records import SalesBatch, StocksBatch
+from parser.rollups import RollupManager
+from parser.schema_registry import schema_registry
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -18,37 +47,90 @@ logger = logging.getLogger(__name__)
 class WbDataBaseClient:
     """Класс, который работает с базой данных."""
 
-    def __init__(self, shop_name: str = NAME_OF_SHOP):
+    def __init__(
+        self,
+        shop_name: str = NAME_OF_SHOP,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        change_aware: bool = True,
+        diff_stocks: bool = DIFF_STOCKS,
+        partitioned: bool = PARTITIONED_REPORTS,
+        shared: bool = SHARED_SCHEMA,
+        rollups: bool = True
+    ):
         self.shop_name = shop_name
+        self.partitioned = partitioned
+        self.shared = shared
+        self.shop_id = None
+        self.loader = BulkLoader(chunk_size)
+        self.tracker = None
+        if change_aware:
+            self.tracker = ChangeTracker(shop_name, diff_stocks, shared)
+        self.rollups = None
+        if rollups:
+            self.rollups = RollupManager(shop_name, shared)
 
-    @connection_db
-    def _allowed_tables(self, cursor=None) -> list:
+    def _allowed_tables(self) -> set:
         """
-        Защищенный метод возвращает список существующих
-        таблиц в базе данных.
+        Защищенный метод возвращает множество существующих
+        таблиц в базе данных (из кэша реестра схемы).
         """
-        cursor.execute('SHOW TABLES')
-        return [table[0] for table in cursor.fetchall()]
+        return schema_registry.tables()
 
-    @connection_db
-    def _create_table_if_not_exist(
+    def _table_name(self, type_table: str, type_data: str) -> str:
+        """
+        Защищенный метод возвращает название таблицы магазина
+        (общей таблицы при shared=True).
+        """
+        if self.shared:
+            return f'{type_table}_{type_data}'
+        return f'{type_table}_{type_data}_{self.shop_name}'
+
+    def _shared_table_query(self, type_table: str, type_data: str) -> tuple:
+        """
+        Защищенный метод возвращает название общей таблицы
+        и запрос на ее создание. Общие таблицы не связаны внешними
+        ключами: порядок записи обеспечивает save_days.
+        """
+        templates = {
+            'dates': CREATE_DATES_TABLE,
+            'products': CREATE_SHARED_PRODUCTS_TABLE,
+            'orders': CREATE_SHARED_ORDERS_TABLE,
+            'cursors': CREATE_SHARED_CURSORS_TABLE,
+            'sales': CREATE_SHARED_SALES_TABLE,
+            'stocks': CREATE_SHARED_STOCKS_TABLE,
+            'weekly': CREATE_SHARED_ROLLUP_TABLE,
+            'monthly': CREATE_SHARED_ROLLUP_TABLE
+        }
+        if type_data not in templates:
+            logging.error('Неразрешенный тип данных таблицы: %s', type_data)
+            raise TypeDataError
+        partitioning = ''
+        if self.partitioned and type_data in ('sales', 'stocks'):
+            partitioning = PARTITION_BY_DATE
+        table_name = self._table_name(type_table, type_data)
+        return table_name, templates[type_data].format(
+            table_name=table_name, partitioning=partitioning
+        )
+
+    def _table_query(
         self,
         type_table: str,
         type_data: str,
         ref_dates_table: str = '',
-        ref_products_table: str = '',
-        cursor=None
-
-    ):
+        ref_products_table: str = ''
+    ) -> tuple[str, str]:
         """
-        Защищенный метод создает таблицу в базе данных если ее не существует.
-        Если таблица есть в базе данных возварщает ее имя.
+        Защищенный метод возвращает название таблицы магазина
+        и запрос на ее создание.
         """
-        table_name = f'{type_table}_{type_data}_{self.shop_name}'
-        if table_name in self._allowed_tables():
-            logging.info('Таблица %s найдена в базе', table_name)
-            return table_name
-
+        if self.shared:
+            return self._shared_table_query(type_table, type_data)
+        table_name = self._table_name(type_table, type_data)
+        sales_template = CREATE_SALES_TABLE
+        stocks_template = CREATE_STOCKS_TABLE
+        if self.partitioned:
+            sales_template = CREATE_PARTITIONED_SALES_TABLE
+            stocks_template = CREATE_PARTITIONED_STOCKS_TABLE
         table_config = {
             'dates': {
                 'template': CREATE_DATES_TABLE,
@@ -60,8 +142,28 @@ class WbDataBaseClient:
                 'requires_refs': False,
                 'format_args': {'table_name': table_name}
             },
+            'orders': {
+                'template': CREATE_ORDERS_TABLE,
+                'requires_refs': False,
+                'format_args': {'table_name': table_name}
+            },
+            'cursors': {
+                'template': CREATE_CURSORS_TABLE,
+                'requires_refs': False,
+                'format_args': {'table_name': table_name}
+            },
+            'weekly': {
+                'template': CREATE_ROLLUP_TABLE,
+                'requires_refs': False,
+                'format_args': {'table_name': table_name}
+            },
+            'monthly': {
+                'template': CREATE_ROLLUP_TABLE,
+                'requires_refs': False,
+                'format_args': {'table_name': table_name}
+            },
             'sales': {
-                'template': CREATE_SALES_TABLE,
+                'template': sales_template,
                 'requires_refs': True,
                 'format_args': {
                     'table_name': table_name,
@@ -70,7 +172,7 @@ class WbDataBaseClient:
                 }
             },
             'stocks': {
-                'template': CREATE_STOCKS_TABLE,
+                'template': stocks_template,
                 'requires_refs': True,
                 'format_args': {
                     'table_name': table_name,
@@ -91,20 +193,152 @@ class WbDataBaseClient:
         ):
             logging.error('Отсутствуют таблицы для ссылки')
             raise RefTableError
-        create_table_query = config['template'].format(**config['format_args'])
-        cursor.execute(create_table_query)
-        logging.info('Таблица %s успешно создана', table_name)
+        return table_name, config['template'].format(**config['format_args'])
+
+    def _create_table_if_not_exist(
+        self,
+        type_table: str,
+        type_data: str,
+        ref_dates_table: str = '',
+        ref_products_table: str = ''
+    ):
+        """
+        Защищенный метод создает таблицу в базе данных если ее не существует.
+        Если таблица есть в базе данных возварщает ее имя.
+        Наличие таблицы проверяется по реестру схемы без запроса к базе.
+        """
+        table_name = self._table_name(type_table, type_data)
+        if table_name in self._allowed_tables():
+            return table_name
+        schema_registry.create([self._table_query(
+            type_table, type_data, ref_dates_table, ref_products_table
+        )])
         return table_name
 
+    def ensure_tables(self) -> list:
+        """
+        Метод создает одним подключением все недостающие таблицы
+        магазина, а для секционированных таблиц отчетов обслуживает
+        секции. Возвращает названия созданных таблиц.
+        """
+        refs = {
+            'ref_dates_table': f'catalog_dates_{self.shop_name}',
+            'ref_products_table': f'catalog_products_{self.shop_name}'
+        }
+        queries = [] if not self.shared else [(
+            SHOPS_TABLE_NAME,
+            CREATE_SHOPS_TABLE.format(table_name=SHOPS_TABLE_NAME)
+        )]
+        queries += [
+            self._table_query('catalog', 'dates'),
+            self._table_query('catalog', 'products'),
+            self._table_query('reports', 'orders'),
+            self._table_query('service', 'cursors'),
+            self._table_query('reports', 'sales', **refs),
+            self._table_query('reports', 'stocks', **refs)
+        ]
+        if self.rollups is not None:
+            queries += [
+                self._table_query('rollup', period)
+                for period in self.rollups.periods
+            ]
+        existing = self._allowed_tables()
+        missing = [query for query in queries if query[0] not in existing]
+        created = schema_registry.create(missing) if missing else []
+        if self.shared:
+            self._key()
+        if self.partitioned:
+            self.maintain_partitions()
+        return created
+
+    @connection_db
+    def register_shop(self, cursor=None) -> int:
+        """
+        Метод регистрирует магазин в таблице магазинов общей схемы
+        (если его там нет) и возвращает его shop_id.
+        """
+        schema_registry.create([(
+            SHOPS_TABLE_NAME,
+            CREATE_SHOPS_TABLE.format(table_name=SHOPS_TABLE_NAME)
+        )])
+        cursor.execute(
+            INSERT_SHOP.format(table_name=SHOPS_TABLE_NAME),
+            (self.shop_name,)
+        )
+        cursor.execute(
+            SELECT_SHOP_ID.format(table_name=SHOPS_TABLE_NAME),
+            (self.shop_name,)
+        )
+        return cursor.fetchone()[0]
+
+    def _key(self) -> tuple:
+        """
+        Защищенный метод возвращает ключ магазина, с которого начинаются
+        строки общих таблиц: (shop_id,) или пустой кортеж.
+        """
+        if not self.shared:
+            return ()
+        if self.shop_id is None:
+            self.shop_id = self.register_shop()
+        return (self.shop_id,)
+
+    def _rows(self, params: list) -> list:
+        """Защищенный метод добавляет ключ магазина к строкам params."""
+        key = self._key()
+        if not key:
+            return params
+        return [key + tuple(row) for row in params]
+
+    def _sql(self, template: str, shared_template: str, table_name: str):
+        """
+        Защищенный метод возвращает запрос к таблице магазина
+        или общей таблице.
+        """
+        query = shared_template if self.shared else template
+        return query.format(table_name=table_name)
+
+    def maintain_partitions(self, manager=None) -> dict:
+        """
+        Метод создает заранее секции таблиц отчетов магазина и удаляет
+        (или архивирует) секции старше окна хранения (см. PartitionManager).
+        Возвращает результаты обслуживания по таблицам.
+        """
+        manager = manager or partition_manager
+        return {
+            table_name: manager.maintain(table_name)
+            for table_name in (
+                self._table_name('reports', 'sales'),
+                self._table_name('reports', 'stocks')
+            )
+        }
+
     def parse_product_data(
         self,
-        data: list[dict],
-        date_str: str
-    ) -> list[dict]:
+        data: Iterable[dict],
+        date_str: str,
+        compact: bool = False
+    ) -> list[dict] | StocksBatch:
         """
         Метод обрабатывает полученный словарь,
         вытягивает и группирует нужные данные.
+        Может обрабатывать отчет постранично (по одной странице
+        из WbAnalyticsClient.iter_stock_pages).
+        При compact=True возвращает колоночный StocksBatch
+        вместо списка словарей.
         """
+        if compact:
+            batch = StocksBatch(date_str)
+            for item in data:
+                if not item.get('nmID'):
+                    logging.warning('Товар без артикула пропущен: %s', item)
+                    continue
+                batch.append(
+                    item['nmID'],
+                    item.get('name', '').strip('""'),
+                    item.get('metrics', {}).get('stockCount', 0)
+                )
+            return batch
+
         stocks = []
 
         for item in data:
@@ -118,25 +352,74 @@ class WbDataBaseClient:
             )
         return stocks
 
-    def parse_avg_sales(self, data: list[dict], date_str: str) -> list[dict]:
+    def parse_avg_sales(
+        self,
+        data: Iterable[dict],
+        date_str: str,
+        compact: bool = False
+    ) -> list[dict] | SalesBatch:
         """
         Метод обрабатывает полученный словарь,
         вытягивает и группирует нужные данные.
+        Данные читаются за один проход, поэтому вместо списка можно
+        передать поток продаж, например
+        chain.from_iterable(client.iter_sales_pages(date_str)).
+        При compact=True возвращает колоночный SalesBatch.
         """
-        avg_sales = []
         sales_by_article = defaultdict(int)
 
         for item in data:
-            if item.get('isRealization') and not item.get('isCancel'):
+            if self._is_sale(item):
                 article = item['nmId']
                 sales_by_article[article] += 1
 
+        return self._format_avg_sales(sales_by_article, date_str, compact)
+
+    def parse_daily_sales(
+        self,
+        data: Iterable[dict],
+        start_date: str,
+        end_date: str
+    ) -> dict[str, dict]:
+        """
+        Метод за один проход группирует продажи по дням и артикулам.
+        Учитываются заказы с датой в периоде [start_date, end_date].
+        Возвращает словарь {дата: {артикул: количество продаж}}.
+        """
+        daily_sales = defaultdict(lambda: defaultdict(int))
+        for item in data:
+            day = item['date'][:10]
+            if start_date <= day <= end_date and self._is_sale(item):
+                daily_sales[day][item['nmId']] += 1
+        return daily_sales
+
+    @staticmethod
+    def _is_sale(item: dict) -> bool:
+        """Защищенный метод проверяет, учитывается ли заказ как продажа."""
+        return bool(item.get('isRealization') and not item.get('isCancel'))
+
+    @staticmethod
+    def _format_avg_sales(
+        sales_by_article: dict,
+        date_str: str,
+        compact: bool = False
+    ) -> list[dict] | SalesBatch:
+        """
+        Защищенный метод рассчитывает среднее количество продаж в день
+        по количеству продаж каждого артикула за DAYS дней.
+        """
+        avg_sales = SalesBatch(date_str) if compact else []
         for article, total_sales in sales_by_article.items():
-            avg_per_day = Decimal(total_sales) / Decimal(DAYS)
+            avg_per_day = round(
+                Decimal(total_sales) / Decimal(DAYS), DECIMAL_ROUNDING
+            )
+            if compact:
+                avg_sales.append(article, avg_per_day)
+                continue
             avg_sales.append({
                 'дата': date_str,
                 'артикул': article,
-                'среднее значение': round(avg_per_day, DECIMAL_ROUNDING)
+                'среднее значение': avg_per_day
             })
         return avg_sales
 
@@ -159,7 +442,21 @@ class WbDataBaseClient:
             logging.error('Ошибка во время валидации date: %s', error)
             return None, None
 
-    def validate_products_db(self, data: list) -> tuple:
+    @staticmethod
+    def _report_date(data: list | StocksBatch | SalesBatch):
+        """
+        Защищенный метод возвращает дату отчета из обработанных данных
+        (списка словарей или колоночного набора).
+        """
+        if isinstance(data, (StocksBatch, SalesBatch)):
+            if not data:
+                raise ValueError('Пустой набор данных')
+            date_str = data.date
+        else:
+            date_str = data[0].get('дата')
+        return dt.strptime(date_str, DATE_FORMAT).date()
+
+    def validate_products_db(self, data: list | StocksBatch) -> tuple:
         """
         Метод принимает обработанные данные,
         полученные из метода parse_product_data.
@@ -167,51 +464,59 @@ class WbDataBaseClient:
         """
         try:
             table_name = self._create_table_if_not_exist('catalog', 'products')
-            query = INSERT_PRODUCTS.format(table_name=table_name)
+            query = self._sql(
+                INSERT_PRODUCTS, INSERT_SHARED_PRODUCTS, table_name
+            )
+            if isinstance(data, StocksBatch):
+                return query, self._rows(data.product_params())
             params = [(item['артикул'], item['наименование']) for item in data]
-            return query, params
+            return query, self._rows(params)
         except Exception as error:
             logging.error('Ошибка во время валидации products: %s', error)
             return None, None
 
-    def validate_stocks_db(self, data: list) -> tuple:
+    def validate_stocks_db(self, data: list | StocksBatch) -> tuple:
         """
         Метод принимает обработанные данные,
         полученные из метода parse_product_data.
         Готовит SQL-запрос и параметры для сохранения в базу данных.
         """
         try:
-            date = dt.strptime(data[0].get('дата'), "%Y-%m-%d").date()
+            date = self._report_date(data)
             table_name = self._create_table_if_not_exist(
                 'reports',
                 'stocks',
                 ref_dates_table=f'catalog_dates_{self.shop_name}',
                 ref_products_table=f'catalog_products_{self.shop_name}'
             )
-            query = INSERT_STOCKS.format(table_name=table_name)
+            query = self._sql(INSERT_STOCKS, INSERT_SHARED_STOCKS, table_name)
+            if isinstance(data, StocksBatch):
+                return query, self._rows(data.stock_params(date))
             params = [
                 (date, item['артикул'], item['остаток']) for item in data
             ]
-            return query, params
+            return query, self._rows(params)
         except Exception as error:
             logging.error('Ошибка во время валидации stocks: %s', error)
             return None, None
 
-    def validate_sales_db(self, data: list) -> tuple:
+    def validate_sales_db(self, data: list | SalesBatch) -> tuple:
         """
         Метод принимает обработанные данные,
         полученные из метода parse_avg_sales.
         Готовит SQL-запрос и параметры для сохранения в базу данных.
         """
         try:
-            date = dt.strptime(data[0].get('дата'), "%Y-%m-%d").date()
+            date = self._report_date(data)
             table_name = self._create_table_if_not_exist(
                 'reports',
                 'sales',
                 ref_dates_table=f'catalog_dates_{self.shop_name}',
                 ref_products_table=f'catalog_products_{self.shop_name}'
             )
-            query = INSERT_SALES.format(table_name=table_name)
+            query = self._sql(INSERT_SALES, INSERT_SHARED_SALES, table_name)
+            if isinstance(data, SalesBatch):
+                return query, self._rows(data.sales_params(date))
             params = [
                 (
                     date,
@@ -219,58 +524,519 @@ class WbDataBaseClient:
                     item['среднее значение']
                 ) for item in data
             ]
-            return query, params
+            return query, self._rows(params)
         except Exception as error:
             logging.error('Ошибка во время валидации sales: %s', error)
             return None, None
 
+    def _sales_start(self, date_str: str) -> str:
+        """Защищенный метод возвращает начало окна расчета продаж."""
+        date = dt.strptime(date_str, DATE_FORMAT).date()
+        return (date - timedelta(days=DAYS)).strftime(DATE_FORMAT)
+
     @connection_db
-    def save_to_db(
+    def get_sales_cursor(self, cursor=None):
+        """
+        Метод возвращает lastChangeDate, на котором остановилась
+        предыдущая выгрузка продаж, или None при первой выгрузке.
+        """
+        table_name = self._create_table_if_not_exist('service', 'cursors')
+        cursor.execute(
+            self._sql(SELECT_CURSOR, SELECT_SHARED_CURSOR, table_name),
+            (*self._key(), SALES_CURSOR)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def validate_cursor_db(self, last_change_date: str) -> tuple:
+        """
+        Метод готовит SQL-запрос и параметры для сохранения курсора
+        выгрузки продаж в базу данных.
+        """
+        try:
+            table_name = self._create_table_if_not_exist('service', 'cursors')
+            query = self._sql(INSERT_CURSOR, INSERT_SHARED_CURSOR, table_name)
+            return query, (*self._key(), SALES_CURSOR, last_change_date)
+        except Exception as error:
+            logging.error('Ошибка во время валидации cursor: %s', error)
+            return None, None
+
+    def validate_orders_db(
         self,
-        name_of_shop: str,
-        query_data: tuple,
+        data: Iterable[dict],
+        start_date: str
+    ) -> tuple:
+        """
+        Метод принимает страницу заказов из iter_order_pages
+        и готовит SQL-запрос и параметры для сохранения заказов, попадающих
+        в окно расчета (начиная с start_date), в базу данных.
+        """
+        try:
+            table_name = self._create_table_if_not_exist('reports', 'orders')
+            query = self._sql(INSERT_ORDERS, INSERT_SHARED_ORDERS, table_name)
+            params = [
+                (
+                    item['srid'],
+                    item['date'][:10],
+                    item['nmId'],
+                    self._is_sale(item)
+                ) for item in data if item['date'][:10] >= start_date
+            ]
+            return query, self._rows(params)
+        except Exception as error:
+            logging.error('Ошибка во время валидации orders: %s', error)
+            return None, None
+
+    def validate_orders_cleanup(self, date_str: str) -> tuple:
+        """
+        Метод готовит SQL-запрос на удаление заказов, которые вышли
+        за пределы окна расчета средних продаж для даты date_str.
+        """
+        try:
+            table_name = self._create_table_if_not_exist('reports', 'orders')
+            query = self._sql(
+                DELETE_OLD_ORDERS, DELETE_SHARED_OLD_ORDERS, table_name
+            )
+            return query, (*self._key(), self._sales_start(date_str))
+        except Exception as error:
+            logging.error('Ошибка во время валидации orders: %s', error)
+            return None, None
+
+    @connection_db
+    def get_avg_sales_from_orders(
+        self,
+        date_str: str,
+        compact: bool = False,
+        cursor=None
+    ) -> list[dict] | SalesBatch:
+        """
+        Метод рассчитывает средние продажи за DAYS дней до date_str
+        по сохраненным заказам. Результат совпадает с parse_avg_sales.
+        """
+        table_name = self._create_table_if_not_exist('reports', 'orders')
+        cursor.execute(
+            self._sql(
+                SELECT_SALES_COUNTS, SELECT_SHARED_SALES_COUNTS, table_name
+            ),
+            (*self._key(), self._sales_start(date_str), date_str)
+        )
+        return self._format_avg_sales(
+            dict(cursor.fetchall()), date_str, compact
+        )
+
+    def _write_rows(
+        self,
+        cursor,
+        query: str,
+        params: list,
+        changes: dict
+    ) -> int:
+        """
+        Защищенный метод записывает набор строк, пропуская строки,
+        не изменившиеся с прошлой записи (см. ChangeTracker).
+        changes - изменения текущей транзакции (см. _begin_changes).
+        """
+        if self.tracker is not None:
+            params = self.tracker.filter(
+                cursor, query, params, changes['tracker']
+            )
+        if self.rollups is not None:
+            self.rollups.touch(query, params, changes['rollups'])
+        return self.loader.load(cursor, query, params)
+
+    def _flush_rollups(self, cursor, changes: dict) -> None:
+        """
+        Защищенный метод пересчитывает в текущей транзакции агрегаты
+        периодов, затронутых ее записью (см. RollupManager).
+        """
+        if self.rollups is None or not changes['rollups']:
+            return
+        for period in self.rollups.periods:
+            self._create_table_if_not_exist('rollup', period)
+        self.rollups.flush(cursor, changes['rollups'])
+
+    def _begin_changes(self) -> dict:
+        """
+        Защищенный метод создает изменения новой транзакции записи:
+        строки для кэша ChangeTracker, которые переносятся в кэш только
+        после фиксации транзакции (см. _commit_changes), и периоды
+        агрегатов, затронутые записью этой транзакции.
+        """
+        tracker = self.tracker.begin() if self.tracker is not None else None
+        return {'tracker': tracker, 'rollups': set()}
+
+    def _commit_changes(self, changes: dict) -> None:
+        """
+        Защищенный метод переносит изменения зафиксированной
+        транзакции в кэш ChangeTracker.
+        """
+        if self.tracker is not None:
+            self.tracker.commit(changes['tracker'])
+
+    @connection_db
+    def _report_range(self, cursor=None) -> tuple:
+        """
+        Защищенный метод возвращает первую и последнюю дату
+        в таблицах остатков и продаж магазина.
+        """
+        dates = []
+        for type_data in ('stocks', 'sales'):
+            table_name = self._table_name('reports', type_data)
+            if table_name not in self._allowed_tables():
+                continue
+            cursor.execute(
+                self._sql(
+                    SELECT_DATE_RANGE, SELECT_SHARED_DATE_RANGE, table_name
+                ),
+                self._key()
+            )
+            dates.extend(day for day in cursor.fetchone() or () if day)
+        if not dates:
+            return None, None
+        return min(dates), max(dates)
+
+    @connection_db
+    def _rebuild_period(
+        self,
+        rollups: RollupManager,
+        period: str,
+        start,
         cursor=None
     ) -> None:
+        """Защищенный метод пересчитывает агрегаты одного периода."""
+        rollups.refresh(cursor, period, start, self._key())
+
+    def rebuild_rollups(self, date_start: str = '', date_end: str = '') -> int:
+        """
+        Метод перестраивает агрегаты магазина по дневным строкам
+        за период с date_start по date_end (по умолчанию - за весь
+        период данных). Каждый период пересчитывается отдельной
+        транзакцией. Возвращает количество пересчитанных периодов.
+        """
+        rollups = self.rollups or RollupManager(self.shop_name, self.shared)
+        for period in rollups.periods:
+            self._create_table_if_not_exist('rollup', period)
+        if date_start and date_end:
+            first, last = date_start, date_end
+        else:
+            first, last = self._report_range()
+            if first is None:
+                logging.info(
+                    'Нет данных для агрегатов магазина %s',
+                    self.shop_name
+                )
+                return 0
+        count = 0
+        for period in rollups.periods:
+            for start in rollups.period_starts(period, first, last):
+                self._rebuild_period(rollups, period, start)
+                count += 1
+        logging.info(
+            'Агрегаты магазина %s перестроены: %s периодов',
+            self.shop_name,
+            count
+        )
+        return count
+
+    def _report(self) -> None:
+        """Защищенный метод логирует статистику записи."""
+        self.loader.report()
+        if self.tracker is not None:
+            self.tracker.report()
+
+    def save_to_db(self, name_of_shop: str, query_data: tuple) -> None:
         """Метод сохраняется обработанные данные в базу данных."""
+        query, params = query_data
+        if not query or not params:
+            logger.bot_event(
+                '❌ Данные для магазина %s не получены, получены частично '
+                'или повреждены. Сохранение данных успешно провалилось',
+                name_of_shop
+            )
+            return
+        changes = self._begin_changes()
+        self._save_query(query, params, changes)
+        self._commit_changes(changes)
+        logger.bot_event(
+            '✅ Данные для магазина %s успешно сохранены!',
+            name_of_shop
+        )
+
+    @connection_db
+    def _save_query(
+        self,
+        query: str,
+        params: list | tuple,
+        changes: dict,
+        cursor=None
+    ) -> None:
+        """
+        Защищенный метод выполняет один запрос записи в отдельной
+        транзакции.
+        """
         try:
-            query, params = query_data
+            if isinstance(params, list):
+                self._write_rows(cursor, query, params, changes)
+                self._flush_rollups(cursor, changes)
+            else:
+                cursor.execute(query, params)
+        except Exception as error:
+            logging.error('Ошибка во время сохранения: %s', error)
+            raise
+
+    def save_stream_to_db(
+        self,
+        name_of_shop: str,
+        queries: Iterable[tuple]
+    ) -> int:
+        """
+        Метод сохраняет поток подготовленных запросов на одном подключении
+        одной транзакцией. Каждый запрос выполняется сразу по мере
+        поступления; данные из API нужно получить до вызова, чтобы
+        транзакция не ждала сетевых запросов.
+        Наборы строк загружаются порциями многострочных INSERT
+        (см. BulkLoader). Кэш ChangeTracker обновляется только после
+        фиксации транзакции. Возвращает количество записанных строк.
+        """
+        changes = self._begin_changes()
+        rows = self._save_stream(name_of_shop, queries, changes)
+        self._commit_changes(changes)
+        logger.bot_event(
+            '✅ Данные для магазина %s успешно сохранены! Записано строк: %s',
+            name_of_shop,
+            rows
+        )
+        self._report()
+        return rows
+
+    def save_batches_to_db(
+        self,
+        name_of_shop: str,
+        batches: Iterable[list[tuple]]
+    ) -> int:
+        """
+        Метод сохраняет поток наборов подготовленных запросов: каждый
+        набор (например, запросы одной страницы отчета) записывается
+        отдельной короткой транзакцией по мере поступления, поэтому
+        запись идет одновременно с получением следующих наборов.
+        Наборы записываются в порядке поступления. Агрегаты периодов
+        пересчитываются одной транзакцией после записи всех наборов.
+        Возвращает количество записанных строк.
+        """
+        rows = 0
+        touched = set()
+        for queries in batches:
+            changes = self._begin_changes()
+            changes['rollups'] = touched
+            rows += self._save_stream(
+                name_of_shop, queries, changes, flush=False
+            )
+            self._commit_changes(changes)
+        if touched:
+            self._save_rollups({'rollups': touched})
+        logger.bot_event(
+            '✅ Данные для магазина %s успешно сохранены! Записано строк: %s',
+            name_of_shop,
+            rows
+        )
+        self._report()
+        return rows
+
+    @connection_db
+    def _save_rollups(self, changes: dict, cursor=None) -> None:
+        """
+        Защищенный метод пересчитывает в отдельной транзакции агрегаты
+        периодов, затронутых уже зафиксированной записью.
+        """
+        self._flush_rollups(cursor, changes)
+
+    @connection_db
+    def _save_stream(
+        self,
+        name_of_shop: str,
+        queries: Iterable[tuple],
+        changes: dict,
+        flush: bool = True,
+        cursor=None
+    ) -> int:
+        """
+        Защищенный метод выполняет поток запросов в одной транзакции.
+        При flush=False агрегаты периодов в ней не пересчитываются.
+        Возвращает количество записанных строк.
+        """
+        rows = 0
+        for query, params in queries:
             if not query or not params:
                 logger.bot_event(
-                    '❌ Данные для магазина %s не получены, получены частично '
-                    'или повреждены. Сохранение данных успешно провалилось',
+                    '❌ Часть данных для магазина %s не получена '
+                    'или повреждена и пропущена при сохранении',
                     name_of_shop
                 )
-                return
+                continue
             if isinstance(params, list):
-                cursor.executemany(query, params)
+                rows += self._write_rows(cursor, query, params, changes)
             else:
                 cursor.execute(query, params)
-            logger.bot_event(
-                '✅ Данные для магазина %s успешно сохранены!',
-                name_of_shop
+                rows += 1
+        if flush:
+            self._flush_rollups(cursor, changes)
+        return rows
+
+    def unit_of_work_queries(self, days: Iterable[tuple]) -> list[tuple]:
+        """
+        Метод готовит запросы записи нескольких дней магазина. days -
+        кортежи (дата, данные parse_product_data, данные parse_avg_sales).
+        Параметры одного типа объединяются в один набор строк, запросы
+        упорядочены по внешним ключам: даты, товары, остатки, продажи.
+        Наименования товаров берутся из последнего дня. Запросы, которые
+        не удалось подготовить, передаются как (None, None), чтобы
+        save_stream_to_db сообщил о пропуске данных.
+        """
+        queries = {}
+        params = defaultdict(list)
+        products = {}
+        invalid = []
+        for date_str, product_data, sales_data in days:
+            day_queries = (
+                ('dates', self.validate_date_db(date_str)),
+                ('products', self.validate_products_db(product_data)),
+                ('stocks', self.validate_stocks_db(product_data)),
+                ('sales', self.validate_sales_db(sales_data))
             )
-        except Exception as error:
-            logging.error('Ошибка во время сохранения: %s', error)
-            raise
+            for kind, (query, day_params) in day_queries:
+                if not query or not day_params:
+                    invalid.append((None, None))
+                    continue
+                queries[kind] = query
+                if kind == 'dates':
+                    params[kind].append(day_params)
+                elif kind == 'products':
+                    products.update((row[:-1], row[-1]) for row in day_params)
+                else:
+                    params[kind].extend(day_params)
+        params['products'] = [
+            (*key, name) for key, name in products.items()
+        ]
+        return [
+            (queries[kind], params[kind])
+            for kind in ('dates', 'products', 'stocks', 'sales')
+            if params[kind]
+        ] + invalid
 
-    @connection_db
-    def clean_db(self, cursor=None, **tables: bool) -> None:
+    def save_days(
+        self,
+        name_of_shop: str,
+        days: Iterable[tuple],
+        days_per_commit: int = DAYS_PER_COMMIT
+    ) -> int:
+        """
+        Метод сохраняет дни магазина единицами работы: даты, товары,
+        остатки и продажи группы из days_per_commit дней записываются
+        на одном подключении одной транзакцией, поэтому при ошибке
+        в базе не остается остатков без продаж. days - кортежи
+        (дата, данные parse_product_data, данные parse_avg_sales),
+        может быть генератором: в памяти держится только одна группа.
+        Возвращает количество записанных строк.
+        """
+        rows = 0
+        group = []
+        for day in days:
+            group.append(day)
+            if len(group) >= days_per_commit:
+                rows += self.save_stream_to_db(
+                    name_of_shop, self.unit_of_work_queries(group)
+                )
+                group = []
+        if group:
+            rows += self.save_stream_to_db(
+                name_of_shop, self.unit_of_work_queries(group)
+            )
+        return rows
+
+    def clean_db(self, purger=None, **tables: bool) -> dict:
         """
         Метод очищает базу данных. В tables передаются имеющиеся в базе данных
-        таблицы, которые нужно удалить, учитывая связь таблиц по PK и FK
-        (таблицы reports_sales и reports_stocks удаляются автоматически
-        если удалить catalog_products).
+        таблицы, которые нужно очистить (таблицы со значением False
+        пропускаются). Таблицы, ссылающиеся на очищаемые по внешним ключам
+        с каскадным удалением, очищаются вместе с ними (таблицы reports_sales
+        и reports_stocks очищаются, если очистить catalog_dates), причем
+        раньше них. Таблицы, на которые не ссылаются внешние ключи,
+        очищаются через TRUNCATE, остальные - порциями (см. Purger).
+        Возвращает статистику очистки по таблицам.
         """
+        purger = purger or Purger()
         try:
             existing_tables = self._allowed_tables()
-            for table_name, should_clean in tables.items():
-                if should_clean and table_name in existing_tables:
-                    cursor.execute(f'DELETE FROM {table_name}')
-                    logging.info('Таблица %s очищена', table_name)
-                else:
+            selected = [
+                table_name for table_name, should_clean in tables.items()
+                if should_clean
+            ]
+            for table_name in selected:
+                if table_name not in existing_tables:
                     raise TableNameError(
                         f'В базе данных отсутствует таблица {table_name}.'
                     )
+            referenced = purger.foreign_keys()
+            pending = list(selected)
+            for table_name in pending:
+                pending.extend(
+                    child for child in sorted(referenced.get(table_name, ()))
+                    if child not in pending
+                )
+            for table_name in purger.order(pending, referenced):
+                purger.clear(table_name, referenced)
         except Exception as error:
             logging.error('Ошибка очистки: %s', error)
             raise
+        return purger.report()
+
+    def purge(
+        self,
+        days: int = 0,
+        date_start: str = '',
+        date_end: str = '',
+        purger=None
+    ) -> dict:
+        """
+        Метод удаляет данные магазина старше days дней либо за период
+        с date_start по date_end включительно. Строки удаляются порциями
+        с паузами (см. Purger): сначала из таблиц отчетов, затем
+        из catalog_dates, поэтому каскадное удаление по внешним ключам
+        не затрагивает больших таблиц. Справочник товаров не очищается.
+        Для секционированных таблиц удаление затрагивает только секции
+        периода. В общей схеме удаляются только строки магазина,
+        общий справочник дат не очищается. Возвращает статистику
+        очистки по таблицам.
+        """
+        if days:
+            start = None
+            end = dt.now().date() - timedelta(days=days)
+        elif date_start and date_end:
+            start = dt.strptime(date_start, DATE_FORMAT).date()
+            end = dt.strptime(date_end, DATE_FORMAT).date() + timedelta(days=1)
+        else:
+            raise ValueError('Не задан срок хранения или период очистки')
+        purger = purger or Purger()
+        existing_tables = self._allowed_tables()
+        tables = [
+            (self._table_name('reports', 'stocks'), 'date'),
+            (self._table_name('reports', 'sales'), 'date'),
+            (self._table_name('reports', 'orders'), 'date')
+        ]
+        if not self.shared:
+            tables.append((self._table_name('catalog', 'dates'), 'full_date'))
+        for table_name, column in tables:
+            if table_name not in existing_tables:
+                continue
+            condition = 'WHERE shop_id = %s AND ' if self.shared else 'WHERE '
+            if start is None:
+                condition += f'{column} < %s'
+                params = (*self._key(), end)
+            else:
+                condition += f'{column} >= %s AND {column} < %s'
+                params = (*self._key(), start, end)
+            rows = purger.delete(table_name, condition, params)
+            logging.info(
+                'Таблица %s: удалено строк %s', table_name, rows
+            )
+        return purger.report()
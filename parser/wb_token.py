@@ -7,6 +7,7 @@ from parser.exceptions import (BinaryTokenError, EmptyTokenError, EnvFileError,
                                ModelTokenError, SizeTokenError,
                                VerificationError)
 from parser.logging_config import setup_logging
+from parser.schema_registry import schema_registry
 
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
@@ -59,13 +60,14 @@ class WBTokensClient:
         Создает таблицу токенов (если ее нет),
         получает названия магазинов из базы данных.
         """
-        if token_table_name in self._allowed_tables():
+        if schema_registry.exists(token_table_name):
             logging.info('Таблица токенов %s найдена в базе', token_table_name)
         else:
             create_tokens_table_query = CREATE_TOKEN_TABLE.format(
                 table_name_token=token_table_name
             )
             cursor.execute(create_tokens_table_query)
+            schema_registry.add(token_table_name)
             logging.info(
                 'Таблица токенов %s успешно создана',
                 token_table_name
@@ -2,15 +2,25 @@ import json
 import logging
 import os
 import time
+from collections.abc import Iterator
 from datetime import datetime as dt
 from datetime import timedelta
-from parser.constants import (DATA_PAGE_LIMIT, DATE_FORMAT, DAYS, MAX_RETRYING,
-                              WB_AVG_SALES, WB_PRODUCT_DATA)
+from parser.checkpoints import PaginationCheckpoint
+from parser.constants import (DATA_PAGE_LIMIT, DATE_FORMAT, DAYS,
+                              POOL_CONNECTIONS, POOL_MAXSIZE, REQUEST_TIMEOUT,
+                              RUN_TIMEOUT, SALES_FIELDS, WB_AVG_SALES,
+                              WB_PRODUCT_DATA)
 from parser.decorators import time_of_function
 from parser.exceptions import DataFetchError
 from parser.logging_config import setup_logging
+from parser.rate_limiter import RateLimiter, rate_limiter
+from parser.response_cache import ResponseCache
+from parser.retry_policy import RetryPolicy
 
+import ijson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
 
 setup_logging()
 
@@ -20,8 +30,25 @@ class WbAnalyticsClient:
 
     PRODUCT_DATA_URL = WB_PRODUCT_DATA
     AVG_SALES_URL = WB_AVG_SALES
+    RETRYABLE_ERRORS = (
+        requests.HTTPError,
+        requests.Timeout,
+        requests.ConnectionError,
+        ProtocolError,
+        ReadTimeoutError
+    )
 
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        limiter: RateLimiter = rate_limiter,
+        timeout: tuple = REQUEST_TIMEOUT,
+        run_timeout: float = RUN_TIMEOUT,
+        cache: ResponseCache = None,
+        shop_name: str = '',
+        checkpoints: PaginationCheckpoint = None,
+        retry: RetryPolicy = None
+    ):
         if not token:
 
             logging.error('Токен не действителен или отсутствует.')
@@ -32,6 +59,228 @@ class WbAnalyticsClient:
             "Authorization": self.token,
             "Content-Type": "application/json"
         }
+        self.limiter = limiter
+        self.timeout = timeout
+        self.deadline = time.monotonic() + run_timeout if run_timeout else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cache = cache
+        self.shop_name = shop_name
+        self.checkpoints = checkpoints
+        self.retry = retry if retry is not None else RetryPolicy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрывает HTTP-сессию и логирует статистику пула соединений
+        и повторных запросов.
+        """
+        logging.info('Статистика пула соединений: %s', self.pool_stats())
+        logging.info('Статистика повторных запросов: %s', self.retry.stats())
+        self.session.close()
+
+    def pool_stats(self) -> dict:
+        """
+        Возвращает статистику пулов соединений по хостам:
+        количество открытых соединений, выполненных запросов,
+        повторно использованных соединений и простаивающих соединений.
+        """
+        stats = {}
+        adapters = {id(item): item for item in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats[pool.host] = {
+                    'connections': pool.num_connections,
+                    'requests': pool.num_requests,
+                    'reused': pool.num_requests - pool.num_connections,
+                    'idle': pool.pool.qsize() if pool.pool else 0
+                }
+        return stats
+
+    def _check_deadline(self) -> None:
+        """
+        Защищенный метод прерывает работу клиента, если превышено
+        предельное время выполнения.
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            logging.error('Превышено предельное время работы клиента API.')
+            raise DataFetchError('Превышено предельное время работы клиента')
+
+    def _update_limits(self, url: str, response: requests.Response) -> None:
+        """Защищенный метод передает заголовки ответа в ограничитель."""
+        self.limiter.update(
+            url,
+            self.token,
+            response.headers,
+            response.status_code
+        )
+
+    def _pause(self, url: str) -> None:
+        """
+        Защищенный метод ждет, пока выключатель разрешит запросы
+        к хосту API.
+        """
+        wait = self.retry.pause(url)
+        if wait > 0:
+            logging.info(
+                '⏳ Запросы к %s приостановлены: %s сек.',
+                url,
+                round(wait, 3)
+            )
+            time.sleep(wait)
+
+    def _retry(self, url: str, error: DataFetchError, attempt: int) -> None:
+        """
+        Защищенный метод ждет перед повторной попыткой запроса
+        по политике повторов или пробрасывает ошибку. Повторяются только
+        ошибки ответа сервера и сетевые ошибки (RETRYABLE_ERRORS, код
+        None - таймауты и разрывы соединения при запросе или чтении
+        тела ответа). Превышение времени работы, отсутствие страницы
+        в кэше replay, ошибки разбора ответа и контрольных точек
+        пробрасываются сразу и не учитываются выключателем.
+        """
+        if not isinstance(error.__cause__, self.RETRYABLE_ERRORS):
+            raise error
+        wait = self.retry.backoff(url, self._http_status(error), attempt)
+        if wait is None:
+            raise error
+        if wait > 0:
+            time.sleep(wait)
+
+    def _from_cache(self, endpoint: str, params: dict):
+        """
+        Защищенный метод возвращает страницу из кэша ответов
+        или None, если кэш не используется или страницы в нем нет.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self.shop_name, endpoint, params)
+
+    def _to_cache(self, endpoint: str, params: dict, data) -> None:
+        """Защищенный метод сохраняет страницу в кэш ответов."""
+        if self.cache is not None:
+            self.cache.set(self.shop_name, endpoint, params, data)
+
+    def _resume(self, report: str, key: str):
+        """
+        Защищенный метод возвращает состояние прерванной выгрузки
+        или None, если выгрузка начинается с начала.
+        """
+        if self.checkpoints is None:
+            return None
+        return self.checkpoints.load(self.shop_name, report, key)
+
+    def _save_checkpoint(
+        self,
+        report: str,
+        key: str,
+        state: dict,
+        page: list
+    ) -> None:
+        """Защищенный метод сохраняет страницу в контрольную точку."""
+        if self.checkpoints is not None:
+            self.checkpoints.save_page(
+                self.shop_name, report, key, state, page
+            )
+
+    def _clear_checkpoint(self, report: str, key: str) -> None:
+        """Защищенный метод удаляет контрольную точку выгрузки."""
+        if self.checkpoints is not None:
+            self.checkpoints.clear(self.shop_name, report, key)
+
+    @staticmethod
+    def _http_status(error: DataFetchError):
+        """
+        Защищенный метод возвращает код ответа сервера, вызвавший ошибку,
+        или None, если ошибка не связана с HTTP-ответом.
+        """
+        cause = error.__cause__
+        if not isinstance(cause, requests.HTTPError):
+            return None
+        if cause.response is None:
+            return None
+        return cause.response.status_code
+
+    @staticmethod
+    def _stock_payload(
+        start_date: str,
+        end_date: str,
+        offset: int,
+        limit: int
+    ) -> dict:
+        """Защищенный метод формирует тело запроса отчета об остатках."""
+        return {
+            "stockType": "",
+            "currentPeriod": {
+                "start": start_date,
+                "end": end_date
+            },
+            "skipDeletedNm": True,
+            "orderBy": {
+                "field": "minPrice",
+                "mode": "asc"
+            },
+            "limit": limit,
+            "offset": offset,
+            "availabilityFilters": [
+                "deficient",
+                "actual",
+                "balanced",
+                "nonActual",
+                "nonLiquid",
+                "invalidData"
+            ]
+        }
+
+    @staticmethod
+    def _sales_period(date_str: str) -> tuple[str, str]:
+        """
+        Защищенный метод возвращает границы периода продаж
+        (DAYS дней до указанной даты включительно).
+        """
+        date_formatted = dt.strptime(date_str, DATE_FORMAT).date()
+        start_date = (
+            date_formatted - timedelta(days=DAYS)
+        ).strftime(DATE_FORMAT)
+        return start_date, date_formatted.strftime(DATE_FORMAT)
+
+    @staticmethod
+    def _filter_sales(
+        result: list[dict],
+        start_date: str,
+        end_date: str
+    ) -> list[dict]:
+        """Защищенный метод оставляет продажи, попавшие в период."""
+        return [
+            sale for sale in result
+            if start_date <= sale['date'][:10] <= end_date
+        ]
+
+    @staticmethod
+    def _decode_sales(response: requests.Response) -> list[dict]:
+        """
+        Защищенный метод потоково разбирает ответ с заказами по мере
+        чтения тела ответа и оставляет у каждого заказа только поля
+        SALES_FIELDS, не создавая в памяти весь документ целиком.
+        """
+        response.raw.decode_content = True
+        return [
+            {field: item[field] for field in SALES_FIELDS if field in item}
+            for item in ijson.items(response.raw, 'item', use_float=True)
+        ]
 
     def _get_sale_report(
             self,
@@ -41,26 +290,39 @@ class WbAnalyticsClient:
         Защищенный метод, формирующий запрос к API Wildberries
         без учета пагинации.
         """
+        params = {
+            "dateFrom": date
+        }
+        cached = self._from_cache('sales', params)
+        if cached is not None:
+            return cached
         try:
-            params = {
-                "dateFrom": date
-            }
-            response = requests.get(
+            self._check_deadline()
+            self._pause(self.AVG_SALES_URL)
+            self.limiter.acquire(self.AVG_SALES_URL, self.token)
+            self._check_deadline()
+            with self.session.get(
                 self.AVG_SALES_URL,
                 headers=self.headers,
-                params=params
-            )
-            logging.info(
-                '\nЗапрос отчета о продажах.'
-                '\nURL: %s'
-                '\nСтатус: %s'
-                '\nДата: %s',
-                self.AVG_SALES_URL,
-                response.status_code,
-                date
-            )
-            response.raise_for_status()
-            return response.json()
+                params=params,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                logging.info(
+                    '\nЗапрос отчета о продажах.'
+                    '\nURL: %s'
+                    '\nСтатус: %s'
+                    '\nДата: %s',
+                    self.AVG_SALES_URL,
+                    response.status_code,
+                    date
+                )
+                self._update_limits(self.AVG_SALES_URL, response)
+                response.raise_for_status()
+                self.retry.success(self.AVG_SALES_URL)
+                data = self._decode_sales(response)
+            self._to_cache('sales', params, data)
+            return data
         except Exception as error:
             logging.error('Ошибка при получении данных: %s', error)
             raise DataFetchError(
@@ -78,34 +340,20 @@ class WbAnalyticsClient:
         Защищенный метод, формирующий запрос к API Wildberries
         без учета пагинации.
         """
+        payload = self._stock_payload(start_date, end_date, offset, limit)
+        cached = self._from_cache('stocks', payload)
+        if cached is not None:
+            return cached
         try:
-            payload = {
-                "stockType": "",
-                "currentPeriod": {
-                    "start": start_date,
-                    "end": end_date
-                },
-                "skipDeletedNm": True,
-                "orderBy": {
-                    "field": "minPrice",
-                    "mode": "asc"
-                },
-                "limit": limit,
-                "offset": offset,
-                "availabilityFilters": [
-                    "deficient",
-                    "actual",
-                    "balanced",
-                    "nonActual",
-                    "nonLiquid",
-                    "invalidData"
-                ]
-            }
-
-            response = requests.post(
+            self._check_deadline()
+            self._pause(self.PRODUCT_DATA_URL)
+            self.limiter.acquire(self.PRODUCT_DATA_URL, self.token)
+            self._check_deadline()
+            response = self.session.post(
                 self.PRODUCT_DATA_URL,
                 headers=self.headers,
-                json=payload
+                json=payload,
+                timeout=self.timeout
             )
 
             logging.info(
@@ -119,137 +367,103 @@ class WbAnalyticsClient:
                 limit,
                 offset
             )
+            self._update_limits(self.PRODUCT_DATA_URL, response)
             response.raise_for_status()
-            return response.json()
+            self.retry.success(self.PRODUCT_DATA_URL)
+            data = response.json()
+            self._to_cache('stocks', payload, data)
+            return data
         except Exception as error:
             logging.error('Ошибка при получении данных: %s', error)
             raise DataFetchError(
                 f'Не удалось получить данные stocks: {error}'
             ) from error
 
-    @time_of_function
-    def get_all_sales_reports(self, date_str: str) -> list[dict]:
+    def iter_order_pages(self, date_from: str) -> Iterator[list[dict]]:
         """
-        Метод, формирующий запрос к API Wildberries
-        с учетом пагинации.
+        Генератор, запрашивающий заказы, измененные начиная с date_from
+        (дата или lastChangeDate), постранично и без фильтрации.
+        Если выгрузка была прервана, сначала отдает сохраненные
+        в контрольной точке страницы и продолжает с места остановки.
         """
-        date_formatted = dt.strptime(date_str, DATE_FORMAT).date()
-        start_date = (
-            date_formatted - timedelta(days=DAYS)
-        ).strftime(DATE_FORMAT)
-        all_data = []
-        current_date = start_date
+        current_date = date_from
+        state = self._resume('orders', date_from)
+        if state:
+            yield from self.checkpoints.pages(
+                self.shop_name, 'orders', date_from
+            )
+            current_date = state['date_from']
         attempts = 0
 
         while True:
             try:
                 result = self._get_sale_report(current_date)
-            except requests.HTTPError as e:
-                if e.response.status_code == requests.codes.too_many_requests:
-
-                    logging.warning(
-                        '⏳ Превышен лимит запросов (429). Ждём 60 секунд...'
-                    )
-                    time.sleep(60)
-                    continue
-                elif e.response.status_code in (
-                    requests.codes.service_unavailable,
-                    requests.codes.bad_gateway
-                ):
-                    attempts += 1
-                    logging.warning(
-                        '⏳ Сервер временно недоступен (%s). Попытка %s/%s. '
-                        'Ждём 60 секунд...',
-                        e.response.status_code,
-                        attempts,
-                        MAX_RETRYING
-                    )
-                    if attempts > MAX_RETRYING:
-                        logging.error(
-                            'Сервер недоступен. Количество попыток превысило '
-                            'допустимую квоту. Ответ сервера: %s',
-                            e.response.status_code
-                        )
-                        raise
-                    time.sleep(60)
-                    continue
-                else:
-                    logging.error(
-                        'Код ответа сервера: %s',
-                        e.response.status_code
-                    )
-                    raise
+            except DataFetchError as error:
+                attempts += 1
+                self._retry(self.AVG_SALES_URL, error, attempts)
+                continue
             attempts = 0
             if not result:
                 logging.info('✅ Все страницы загружены.')
                 break
-            filtered_result = [
-                sale for sale in result
-                if (
-                    start_date <= sale['date'][:10] <= date_formatted.strftime(
-                        DATE_FORMAT
-                    )
-                )
-            ]
-            all_data.extend(filtered_result)
             current_date = result[-1]['lastChangeDate']
-            time.sleep(60)
-        return all_data
+            self._save_checkpoint(
+                'orders', date_from, {'date_from': current_date}, result
+            )
+            yield result
+        self._clear_checkpoint('orders', date_from)
+
+    def iter_sales_pages(self, date_str: str) -> Iterator[list[dict]]:
+        """
+        Генератор, запрашивающий отчет о продажах постранично.
+        Отдает каждую страницу (продажи за DAYS дней до date_str),
+        как только она получена, не накапливая весь отчет в памяти.
+        """
+        start_date, end_date = self._sales_period(date_str)
+        for result in self.iter_order_pages(start_date):
+            page = self._filter_sales(result, start_date, end_date)
+            if page:
+                yield page
 
     @time_of_function
-    def get_all_stock_reports(
+    def get_all_sales_reports(self, date_str: str) -> list[dict]:
+        """
+        Метод, формирующий запрос к API Wildberries
+        с учетом пагинации.
+        """
+        all_data = []
+        for page in self.iter_sales_pages(date_str):
+            all_data.extend(page)
+        return all_data
+
+    def iter_stock_pages(
         self,
         start_date: str,
         end_date: str,
         limit: int = DATA_PAGE_LIMIT
-    ) -> list[dict]:
+    ) -> Iterator[list[dict]]:
         """
-        Метод, формирующий запрос к API Wildberries
-        с учетом пагинации.
+        Генератор, запрашивающий отчет об остатках постранично.
+        Отдает товары каждой страницы, как только она получена.
+        Если выгрузка была прервана, сначала отдает сохраненные
+        в контрольной точке страницы и продолжает с места остановки.
         """
+        key = f'{start_date}_{end_date}_{limit}'
         offset = 0
-        all_data = []
+        state = self._resume('stocks', key)
+        if state:
+            yield from self.checkpoints.pages(self.shop_name, 'stocks', key)
+            offset = state['offset']
         attempts = 0
 
         while True:
             try:
                 result = self._get_stock_report(
                     start_date, end_date, offset=offset, limit=limit)
-            except requests.HTTPError as e:
-                if e.response.status_code == requests.codes.too_many_requests:
-
-                    logging.warning(
-                        '⏳ Превышен лимит запросов (429). Ждём 60 секунд...'
-                    )
-                    time.sleep(60)
-                    continue
-                elif e.response.status_code in (
-                    requests.codes.service_unavailable,
-                    requests.codes.bad_gateway
-                ):
-                    attempts += 1
-                    logging.warning(
-                        '⏳ Сервер временно недоступен (%s). Попытка %s/%s. '
-                        'Ждём 20 секунд...',
-                        e.response.status_code,
-                        attempts,
-                        MAX_RETRYING
-                    )
-                    if attempts > MAX_RETRYING:
-                        logging.error(
-                            'Сервер недоступен. Количество попыток превысило '
-                            'допустимую квоту. Ответ сервера: %s',
-                            e.response.status_code
-                        )
-                        raise
-                    time.sleep(20)
-                    continue
-                else:
-                    logging.error(
-                        'Код ответа сервера: %s',
-                        e.response.status_code
-                    )
-                    raise
+            except DataFetchError as error:
+                attempts += 1
+                self._retry(self.PRODUCT_DATA_URL, error, attempts)
+                continue
             attempts = 0
             if not result or 'data' not in result:
                 logging.warning('Данные из api не получены.')
@@ -258,9 +472,27 @@ class WbAnalyticsClient:
             if not data.get('items', []):
                 logging.info('✅ Все страницы загружены.')
                 break
-            all_data.extend(data['items'])
             offset += limit
-            time.sleep(20)
+            self._save_checkpoint(
+                'stocks', key, {'offset': offset}, data['items']
+            )
+            yield data['items']
+        self._clear_checkpoint('stocks', key)
+
+    @time_of_function
+    def get_all_stock_reports(
+        self,
+        start_date: str,
+        end_date: str,
+        limit: int = DATA_PAGE_LIMIT
+    ) -> list[dict]:
+        """
+        Метод, формирующий запрос к API Wildberries
+        с учетом пагинации.
+        """
+        all_data = []
+        for page in self.iter_stock_pages(start_date, end_date, limit):
+            all_data.extend(page)
         logging.debug('Функция завершила работу')
         return all_data
 
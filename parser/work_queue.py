@@ -0,0 +1,198 @@
+import logging
+import os
+import socket
+import threading
+from collections.abc import Iterable
+from contextlib import contextmanager
+from datetime import datetime as dt
+from parser.constants import (COMPLETE_WORK_ITEM, CREATE_WORK_QUEUE_TABLE,
+                              DATE_FORMAT, EXPIRE_WORK_ITEMS, EXTEND_LEASE,
+                              FAIL_WORK_ITEM, HEARTBEAT_INTERVAL,
+                              INSERT_WORK_ITEM, LEASE_TIME, LEASE_WORK_ITEM,
+                              MAX_ITEM_ATTEMPTS, REPORTS, SELECT_WORK_ITEM,
+                              WORK_QUEUE_TABLE_NAME)
+from parser.decorators import connection_db
+from parser.logging_config import setup_logging
+
+setup_logging()
+
+
+class WorkQueue:
+    """
+    Очередь заданий выгрузки в MySQL (магазин × дата × тип отчета).
+
+    Позволяет нескольким контейнерам парсера делить работу: задание
+    выбирается через SELECT ... FOR UPDATE SKIP LOCKED и арендуется
+    на lease_time секунд. Пока задание выполняется, аренда продлевается
+    (heartbeat). Если процесс упал, аренда истекает и задание забирает
+    другой процесс. Время аренды считается по часам сервера базы данных,
+    поэтому не зависит от расхождения часов хостов. Арендатором задания
+    записывается поток, который его забрал (worker_id и идентификатор
+    потока), поэтому потоки одного процесса не завершают чужие задания.
+    """
+
+    def __init__(
+        self,
+        worker_id: str = '',
+        lease_time: int = LEASE_TIME,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        max_attempts: int = MAX_ITEM_ATTEMPTS,
+        table_name: str = WORK_QUEUE_TABLE_NAME
+    ):
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.lease_time = lease_time
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        self.table_name = table_name
+        self._owners = {}
+
+    def _owner(self, item_id: int = None) -> str:
+        """
+        Защищенный метод возвращает арендатора задания item_id,
+        а для нового задания - арендатора от имени текущего потока.
+        """
+        owner = self._owners.get(item_id)
+        if owner is None:
+            owner = f'{self.worker_id}-{threading.get_ident()}'
+        return owner
+
+    @connection_db
+    def enqueue(
+        self,
+        shops: Iterable[str],
+        date_str: str,
+        reports: Iterable[str] = REPORTS,
+        cursor=None
+    ) -> int:
+        """
+        Создает таблицу очереди (если ее нет) и ставит в очередь
+        задания для магазинов за дату. Уже поставленные задания
+        не дублируются. Возвращает количество новых заданий.
+        """
+        cursor.execute(
+            CREATE_WORK_QUEUE_TABLE.format(table_name=self.table_name)
+        )
+        date = dt.strptime(date_str, DATE_FORMAT).date()
+        params = [
+            (shop, date, report) for shop in shops for report in reports
+        ]
+        if not params:
+            return 0
+        cursor.executemany(
+            INSERT_WORK_ITEM.format(table_name=self.table_name), params
+        )
+        logging.info(
+            'Поставлено в очередь заданий за %s: %s',
+            date_str,
+            cursor.rowcount
+        )
+        return cursor.rowcount
+
+    @connection_db
+    def claim(self, cursor=None):
+        """
+        Арендует следующее свободное задание. Возвращает словарь
+        с ключами id, shop_name, date, report или None,
+        если свободных заданий нет.
+        """
+        cursor.execute(
+            EXPIRE_WORK_ITEMS.format(table_name=self.table_name),
+            (self.max_attempts,)
+        )
+        cursor.execute(SELECT_WORK_ITEM.format(table_name=self.table_name))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        item_id, shop_name, date, report = row
+        owner = self._owner()
+        cursor.execute(
+            LEASE_WORK_ITEM.format(table_name=self.table_name),
+            (owner, self.lease_time, item_id)
+        )
+        self._owners[item_id] = owner
+        logging.info(
+            'Задание %s (%s, %s, %s) арендовано потоком %s',
+            item_id,
+            shop_name,
+            date,
+            report,
+            owner
+        )
+        return {
+            'id': item_id,
+            'shop_name': shop_name,
+            'date': date.strftime(DATE_FORMAT),
+            'report': report
+        }
+
+    @connection_db
+    def heartbeat(self, item_id: int, cursor=None) -> bool:
+        """
+        Продлевает аренду задания. Возвращает False, если аренда
+        потеряна (истекла и задание забрал другой процесс).
+        """
+        cursor.execute(
+            EXTEND_LEASE.format(table_name=self.table_name),
+            (self.lease_time, item_id, self._owner(item_id))
+        )
+        return cursor.rowcount > 0
+
+    @connection_db
+    def complete(self, item_id: int, cursor=None) -> bool:
+        """Отмечает задание выполненным."""
+        cursor.execute(
+            COMPLETE_WORK_ITEM.format(table_name=self.table_name),
+            (item_id, self._owner(item_id))
+        )
+        self._owners.pop(item_id, None)
+        return cursor.rowcount > 0
+
+    @connection_db
+    def fail(self, item_id: int, error: Exception, cursor=None) -> None:
+        """
+        Возвращает задание в очередь после ошибки, а после
+        max_attempts попыток отмечает его неудачным.
+        """
+        cursor.execute(
+            FAIL_WORK_ITEM.format(table_name=self.table_name),
+            (self.max_attempts, str(error), item_id, self._owner(item_id))
+        )
+        self._owners.pop(item_id, None)
+
+    def _beat(self, item_id: int, stop: threading.Event) -> None:
+        """Защищенный метод продлевает аренду задания до остановки."""
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                if not self.heartbeat(item_id):
+                    logging.warning(
+                        'Аренда задания %s потеряна потоком %s',
+                        item_id,
+                        self._owner(item_id)
+                    )
+                    return
+            except Exception as error:
+                logging.warning(
+                    'Не удалось продлить аренду задания %s: %s',
+                    item_id,
+                    error
+                )
+
+    @contextmanager
+    def leased(self, item_id: int):
+        """
+        Контекстный менеджер, продлевающий аренду задания в фоновом
+        потоке, пока выполняется блок.
+        """
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._beat,
+            args=(item_id, stop),
+            name=f'heartbeat-{item_id}',
+            daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
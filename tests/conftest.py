@@ -1,10 +1,25 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from parser.rate_limiter import RateLimiter
+from parser.retry_policy import circuit_breaker
+from parser.schema_registry import schema_registry
 from parser.wb_tools import WbAnalyticsClient
 from parser.wb_db import WbDataBaseClient
 from parser.wb_token import WBTokensClient
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    yield
+    circuit_breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_schema_registry():
+    yield
+    schema_registry.invalidate()
+
+
 @pytest.fixture
 def mock_db_cursor():
     mock_cursor = MagicMock()
@@ -16,6 +31,26 @@ def mock_db_cursor():
         yield mock_cursor
 
 
+class FakeClock:
+    """Управляемые часы для тестов ограничителя запросов."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
+
+
 @pytest.fixture
 def client():
     return WBTokensClient()
@@ -23,7 +58,7 @@ def client():
 
 @pytest.fixture
 def wb_client():
-    return WbAnalyticsClient('test_token')
+    return WbAnalyticsClient('test_token', limiter=RateLimiter())
 
 
 @pytest.fixture
@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+
+import pytest
+from parser.bulk_loader import BulkLoader
+from parser.constants import INSERT_STOCKS
+
+
+def test_multirow_query_expands_values_only():
+    query = INSERT_STOCKS.format(table_name='stocks')
+    result = BulkLoader.multirow_query(query, 3)
+    assert 'VALUES (%s, %s, %s), (%s, %s, %s), (%s, %s, %s)' in result
+    assert 'stock = VALUES(stock)' in result
+    assert result.count('%s') == 9
+
+
+def test_load_splits_rows_into_chunks():
+    cursor = MagicMock()
+    loader = BulkLoader(chunk_size=2)
+    query = INSERT_STOCKS.format(table_name='stocks')
+    params = [('2025-01-01', article, article * 10) for article in range(5)]
+    assert loader.load(cursor, query, params) == 5
+    assert cursor.execute.call_count == 3
+    last_query, last_params = cursor.execute.call_args.args
+    assert last_query.count('%s') == 3
+    assert last_params == ('2025-01-01', 4, 40)
+    assert cursor.execute.call_args_list[0].args[1] == (
+        '2025-01-01', 0, 0, '2025-01-01', 1, 10
+    )
+
+
+def test_report_contains_rows_per_second():
+    loader = BulkLoader(chunk_size=10)
+    loader.load(MagicMock(), INSERT_STOCKS.format(table_name='t1'), [(1, 2, 3)])
+    report = loader.report()
+    assert report['t1']['rows'] == 1
+    assert report['t1']['rows_per_second'] > 0
+
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        BulkLoader(chunk_size=0)
@@ -0,0 +1,111 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser.change_tracker import ChangeTracker
+from parser.constants import INSERT_DATES, INSERT_PRODUCTS, INSERT_STOCKS
+from parser.wb_db import WbDataBaseClient
+
+PRODUCTS = INSERT_PRODUCTS.format(table_name='catalog_products_shop')
+STOCKS = INSERT_STOCKS.format(table_name='reports_stocks_shop')
+
+
+def make_cursor(products=(), stocks=()):
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [list(products), list(stocks)]
+    return cursor
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=True)
+def test_skips_unchanged_product_names(mock_exists):
+    tracker = ChangeTracker('shop')
+    cursor = make_cursor(products=[(1, 'Old'), (2, 'Same')])
+    rows = [(1, 'New'), (2, 'Same'), (3, 'Added')]
+    pending = tracker.begin()
+    assert tracker.filter(cursor, PRODUCTS, rows, pending) == [
+        (1, 'New'), (3, 'Added')
+    ]
+    assert tracker.filter(cursor, PRODUCTS, rows, pending) == []
+    assert cursor.execute.call_count == 1
+    assert tracker.report()['catalog_products_shop'] == {
+        'written': 2, 'skipped': 4
+    }
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=True)
+def test_skips_unchanged_stocks_for_same_date(mock_exists):
+    tracker = ChangeTracker('shop')
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [[(1, 10), (2, 20)], []]
+    rows = [('2025-01-01', 1, 10), ('2025-01-01', 2, 25)]
+    pending = tracker.begin()
+    assert tracker.filter(cursor, STOCKS, rows, pending) == [
+        ('2025-01-01', 2, 25)
+    ]
+    next_day = [('2025-01-02', 1, 10)]
+    assert tracker.filter(cursor, STOCKS, next_day, pending) == next_day
+    assert cursor.execute.call_args.args[1] == ('2025-01-02',)
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=False)
+def test_new_tables_and_other_queries_pass_through(mock_exists):
+    tracker = ChangeTracker('shop', diff_stocks=False)
+    cursor = MagicMock()
+    rows = [('2025-01-01', 1, 10)]
+    pending = tracker.begin()
+    assert tracker.filter(cursor, STOCKS, rows, pending) == rows
+    dates = INSERT_DATES.format(table_name='dates_shop')
+    assert tracker.filter(cursor, dates, [('2025-01-01',)], pending) == [
+        ('2025-01-01',)
+    ]
+    assert tracker.filter(cursor, PRODUCTS, [(1, 'Name')], pending) == [
+        (1, 'Name')
+    ]
+    cursor.execute.assert_not_called()
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=True)
+def test_cache_updated_only_after_commit(mock_exists):
+    tracker = ChangeTracker('shop')
+    cursor = make_cursor(stocks=[(1, 10)])
+    rows = [(1, 'Name')]
+    stocks = [('2025-01-01', 1, 15)]
+    tracker.filter(cursor, PRODUCTS, rows, tracker.begin())
+    tracker.filter(cursor, STOCKS, stocks, tracker.begin())
+    assert tracker.filter(cursor, PRODUCTS, rows, tracker.begin()) == rows
+    assert tracker.filter(cursor, STOCKS, stocks, tracker.begin()) == stocks
+    pending = tracker.begin()
+    tracker.filter(cursor, PRODUCTS, rows, pending)
+    tracker.filter(cursor, STOCKS, stocks, pending)
+    tracker.commit(pending)
+    assert tracker.filter(cursor, PRODUCTS, rows, tracker.begin()) == []
+    assert tracker.filter(cursor, STOCKS, stocks, tracker.begin()) == []
+    assert cursor.execute.call_count == 2
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=True)
+def test_reset_reloads_cache(mock_exists):
+    tracker = ChangeTracker('shop')
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [[], []]
+    rows = [(1, 'Name')]
+    assert tracker.filter(cursor, PRODUCTS, rows, tracker.begin()) == rows
+    tracker.reset()
+    assert tracker.filter(cursor, PRODUCTS, rows, tracker.begin()) == rows
+    assert cursor.execute.call_count == 2
+
+
+@patch('parser.change_tracker.schema_registry.exists', return_value=True)
+def test_failed_commit_keeps_cache(mock_exists):
+    client = WbDataBaseClient('shop', rollups=False)
+    connection = MagicMock()
+    connection.commit.side_effect = [RuntimeError('commit'), None]
+    rows = [(1, 'Name')]
+    with patch(
+        'parser.decorators.mysql.connector.connect', return_value=connection
+    ):
+        with pytest.raises(RuntimeError):
+            client.save_stream_to_db('shop', [(PRODUCTS, rows)])
+        assert client.save_stream_to_db('shop', [(PRODUCTS, rows)]) == 1
+    assert client.tracker.filter(
+        MagicMock(), PRODUCTS, rows, client.tracker.begin()
+    ) == []
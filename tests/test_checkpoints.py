@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+from parser.checkpoints import PaginationCheckpoint
+from parser.exceptions import DataFetchError
+from parser.rate_limiter import RateLimiter
+from parser.wb_tools import WbAnalyticsClient
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return PaginationCheckpoint(folder=str(tmp_path))
+
+
+@pytest.fixture
+def client(checkpoints):
+    return WbAnalyticsClient(
+        'test_token',
+        limiter=RateLimiter(),
+        shop_name='shop',
+        checkpoints=checkpoints
+    )
+
+
+def page(*items):
+    return {'data': {'items': [{'nmID': item} for item in items]}}
+
+
+def test_save_and_load(checkpoints):
+    checkpoints.save_page('shop', 'stocks', 'key', {'offset': 100}, [1])
+    checkpoints.save_page('shop', 'stocks', 'key', {'offset': 200}, [2])
+    assert checkpoints.load('shop', 'stocks', 'key') == {
+        'offset': 200, 'pages': 2
+    }
+    assert list(checkpoints.pages('shop', 'stocks', 'key')) == [[1], [2]]
+    checkpoints.clear('shop', 'stocks', 'key')
+    assert checkpoints.load('shop', 'stocks', 'key') is None
+
+
+def test_remove_stale_skips_already_removed_files(tmp_path):
+    (tmp_path / 'shop_stocks_key.0.json.gz').write_text('[]')
+    with patch(
+        'parser.checkpoints.os.remove', side_effect=FileNotFoundError
+    ) as remove:
+        PaginationCheckpoint(folder=str(tmp_path), ttl=-1)
+    remove.assert_called_once()
+
+
+def test_stock_pages_resume_after_failure(client, checkpoints):
+    with patch.object(
+        client,
+        '_get_stock_report',
+        side_effect=[page(1), page(2), DataFetchError('boom')]
+    ), pytest.raises(DataFetchError):
+        list(client.iter_stock_pages('2025-07-01', '2025-07-01', limit=1))
+
+    with patch.object(
+        client, '_get_stock_report', side_effect=[page(3), page()]
+    ) as mock_report:
+        result = list(
+            client.iter_stock_pages('2025-07-01', '2025-07-01', limit=1)
+        )
+    assert result == [[{'nmID': 1}], [{'nmID': 2}], [{'nmID': 3}]]
+    assert mock_report.call_args_list[0].kwargs['offset'] == 2
+    assert checkpoints.load('shop', 'stocks', '2025-07-01_2025-07-01_1') is None
+
+
+def test_order_pages_resume_from_last_change_date(client):
+    first = [{'nmId': 1, 'lastChangeDate': '2025-07-02T10:00:00'}]
+    with patch.object(
+        client,
+        '_get_sale_report',
+        side_effect=[first, DataFetchError('boom')]
+    ), pytest.raises(DataFetchError):
+        list(client.iter_order_pages('2025-07-01'))
+
+    with patch.object(
+        client, '_get_sale_report', side_effect=[[]]
+    ) as mock_report:
+        result = list(client.iter_order_pages('2025-07-01'))
+    assert result == [first]
+    mock_report.assert_called_once_with('2025-07-02T10:00:00')
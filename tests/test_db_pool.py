@@ -0,0 +1,79 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser import db_pool
+from parser.db_pool import (ConnectionPool, close_pool, get_pool, init_pool,
+                            pool_size)
+from parser.exceptions import ConnectionPoolError
+from parser.wb_token import WBTokensClient
+
+
+@pytest.fixture
+def mock_connect():
+    with patch(
+        'parser.decorators.mysql.connector.connect',
+        side_effect=lambda **config: MagicMock()
+    ) as mock_connect:
+        yield mock_connect
+    close_pool()
+
+
+def test_connection_db_reuses_pooled_connections(mock_connect):
+    init_pool(2)
+    client = WBTokensClient()
+    client._allowed_tables()
+    client._allowed_tables()
+    assert mock_connect.call_count == 1
+    assert get_pool().stats == {'created': 1, 'reused': 1}
+
+
+def test_connection_db_without_pool_connects_each_call(mock_connect):
+    client = WBTokensClient()
+    client._allowed_tables()
+    client._allowed_tables()
+    assert mock_connect.call_count == 2
+
+
+def test_pool_replaces_broken_connections(mock_connect):
+    pool = ConnectionPool(size=1, ping_interval=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.ping.side_effect = OSError('gone')
+    assert pool.acquire() is not connection
+    assert pool.stats['discarded'] == 1
+
+
+def test_pool_waits_for_free_connection(mock_connect):
+    pool = ConnectionPool(size=1, timeout=0.05)
+    connection = pool.acquire()
+    with pytest.raises(ConnectionPoolError):
+        pool.acquire()
+    threading.Timer(0.01, pool.release, args=(connection,)).start()
+    pool.timeout = 1
+    assert pool.acquire() is connection
+
+
+def test_child_process_gets_own_pool(mock_connect):
+    pool = init_pool(3)
+    pool.pid = -1
+    child_pool = get_pool()
+    assert child_pool is not pool
+    assert child_pool.size == 3
+    assert db_pool._pool is child_pool
+
+
+def test_child_process_keeps_parent_connections_open(mock_connect):
+    pool = init_pool(2)
+    connection = pool.acquire()
+    pool.release(connection)
+    pool.pid = -1
+    get_pool()
+    connection.close.assert_not_called()
+    assert connection in db_pool._inherited
+
+
+def test_pool_size_covers_connections_of_workers():
+    assert pool_size(4, 16) == 16
+    assert pool_size(8, 16) == 24
+    assert pool_size(0, 1) == 3
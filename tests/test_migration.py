@@ -0,0 +1,72 @@
+from datetime import date
+from unittest.mock import patch
+
+from parser.migration import MIGRATED_TABLES, SchemaMigrator, main
+
+STOCKS_SPEC = MIGRATED_TABLES[2]
+
+
+def test_copy_batch_reads_after_last_key(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [
+        (date(2025, 1, 2), 5, 10), (date(2025, 1, 3), 1, 4)
+    ]
+    migrator = SchemaMigrator(batch_size=2)
+    rows, last = migrator._copy_batch(
+        'reports_stocks_shop', 'reports_stocks', STOCKS_SPEC, (7,),
+        (date(2025, 1, 1), 9)
+    )
+    assert (rows, last) == (2, (date(2025, 1, 3), 1))
+    select, params = mock_db_cursor.execute.call_args_list[0].args
+    assert 'WHERE (date, article) > (%s, %s)' in select
+    assert 'ORDER BY date, article LIMIT 2' in select
+    assert params == (date(2025, 1, 1), 9)
+    insert, values = mock_db_cursor.execute.call_args_list[1].args
+    assert 'INSERT INTO reports_stocks (shop_id, date, article, stock)' in (
+        insert
+    )
+    assert values == (7, date(2025, 1, 2), 5, 10, 7, date(2025, 1, 3), 1, 4)
+
+
+def test_migrate_table_pages_until_short_batch():
+    sleeps = []
+    migrator = SchemaMigrator(batch_size=2, pause=0.5, sleep=sleeps.append)
+    with patch(
+        'parser.migration.schema_registry.exists', return_value=True
+    ), patch.object(
+        SchemaMigrator, '_copy_batch', side_effect=[(2, (1,)), (1, (2,))]
+    ) as mock_copy:
+        assert migrator.migrate_table('shop', 7, STOCKS_SPEC) == 3
+    assert mock_copy.call_args_list[1].args[-1] == (1,)
+    assert mock_copy.call_args_list[0].args[3] == (7,)
+    assert sleeps == [0.5]
+
+
+def test_migrate_table_skips_missing_source():
+    with patch(
+        'parser.migration.schema_registry.exists', return_value=False
+    ), patch.object(SchemaMigrator, '_copy_batch') as mock_copy:
+        assert SchemaMigrator().migrate_table('shop', 7, STOCKS_SPEC) == 0
+    mock_copy.assert_not_called()
+
+
+def test_dates_are_migrated_without_shop_id():
+    with patch(
+        'parser.migration.schema_registry.exists', return_value=True
+    ), patch.object(
+        SchemaMigrator, '_copy_batch', return_value=(0, ())
+    ) as mock_copy:
+        SchemaMigrator().migrate_table('shop', 7, MIGRATED_TABLES[0])
+    assert mock_copy.call_args.args[:4] == (
+        'catalog_dates_shop', 'catalog_dates', MIGRATED_TABLES[0], ()
+    )
+
+
+@patch('parser.migration.close_pool')
+@patch('parser.migration.init_pool')
+def test_main_migrates_given_shops(mock_init, mock_close):
+    with patch.object(
+        SchemaMigrator, 'migrate_shop', return_value={}
+    ) as mock_shop:
+        assert main(['a', 'b', '--batch-size', '5']) == {'a': {}, 'b': {}}
+    assert mock_shop.call_count == 2
+    mock_close.assert_called_once()
@@ -0,0 +1,94 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from parser.partitions import PartitionManager, shift_month
+from parser.wb_db import WbDataBaseClient
+
+
+def make_manager(**kwargs):
+    return PartitionManager(today=lambda: date(2026, 10, 18), **kwargs)
+
+
+def executed(cursor):
+    return [call.args[0] for call in cursor.execute.call_args_list]
+
+
+def test_shift_month_crosses_years():
+    assert shift_month(date(2026, 10, 18), 3) == date(2027, 1, 1)
+    assert shift_month(date(2026, 1, 31), -1) == date(2025, 12, 1)
+
+
+def test_new_table_gets_retention_window_and_premade_months(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [('pmax', 'MAXVALUE', 0)]
+    result = make_manager(retention_months=2, premake_months=1).maintain(
+        'reports_stocks_shop'
+    )
+    assert result['created'] == ['p202608', 'p202609', 'p202610', 'p202611']
+    assert result['dropped'] == []
+    query = executed(mock_db_cursor)[-1]
+    assert 'REORGANIZE PARTITION pmax' in query
+    assert "PARTITION p202611 VALUES LESS THAN ('2026-12-01')" in query
+
+
+def test_expired_partitions_are_dropped(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [
+        ('p202607', "'2026-08-01'", 10),
+        ('p202608', "'2026-09-01'", 10),
+        ('p202611', "'2026-12-01'", 0),
+        ('pmax', 'MAXVALUE', 0)
+    ]
+    result = make_manager(retention_months=2, premake_months=1).maintain(
+        'reports_sales_shop'
+    )
+    assert result == {'created': [], 'dropped': ['p202607'], 'archived': []}
+    assert 'DROP PARTITION p202607' in executed(mock_db_cursor)[-1]
+
+
+@patch('parser.partitions.schema_registry.add')
+def test_expired_partitions_are_archived_before_drop(
+    mock_add, mock_db_cursor
+):
+    mock_db_cursor.fetchall.return_value = [
+        ('p202607', "'2026-08-01'", 10),
+        ('p202612', "'2027-01-01'", 0),
+        ('pmax', 'MAXVALUE', 0)
+    ]
+    result = make_manager(retention_months=2, archive=True).maintain(
+        'reports_sales_shop'
+    )
+    assert result['archived'] == ['archive_reports_sales_shop_202607']
+    queries = executed(mock_db_cursor)
+    assert 'EXCHANGE PARTITION p202607' in queries[-2]
+    assert 'DROP PARTITION p202607' in queries[-1]
+    mock_add.assert_called_once_with('archive_reports_sales_shop_202607')
+
+
+def test_unpartitioned_table_is_skipped(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = []
+    result = make_manager().maintain('reports_sales_shop')
+    assert result == {'created': [], 'dropped': [], 'archived': []}
+    assert mock_db_cursor.execute.call_count == 1
+
+
+def test_partitioned_client_creates_tables_without_foreign_keys():
+    client = WbDataBaseClient('shop', partitioned=True)
+    _, query = client._table_query(
+        'reports', 'stocks',
+        ref_dates_table='catalog_dates_shop',
+        ref_products_table='catalog_products_shop'
+    )
+    assert 'PARTITION BY RANGE COLUMNS' in query
+    assert 'FOREIGN KEY' not in query
+
+
+def test_ensure_tables_maintains_partitions():
+    client = WbDataBaseClient('shop', partitioned=True)
+    manager = MagicMock()
+    with patch.object(
+        WbDataBaseClient, '_allowed_tables', return_value=set()
+    ), patch('parser.wb_db.schema_registry.create', return_value=[]), \
+            patch('parser.wb_db.partition_manager', manager):
+        client.ensure_tables()
+    assert [call.args[0] for call in manager.maintain.call_args_list] == [
+        'reports_sales_shop', 'reports_stocks_shop'
+    ]
@@ -0,0 +1,148 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser.pipeline import Pipeline
+
+STOCK_PAGES = [
+    [{'nmID': 1, 'name': 'A', 'metrics': {'stockCount': 3}}],
+    [{'nmID': 2, 'name': 'B', 'metrics': {'stockCount': 4}}],
+    [{'nmID': 3, 'name': 'C', 'metrics': {'stockCount': 5}}],
+]
+SALES_PAGES = [
+    [{'nmId': 1, 'isRealization': True, 'isCancel': False}],
+    [{'nmId': 2, 'isRealization': True, 'isCancel': False}],
+]
+
+
+def test_pipeline_writes_all_queries(db_client, wb_client, mock_db_cursor):
+    with patch.object(
+        wb_client, 'iter_stock_pages', return_value=iter(STOCK_PAGES)
+    ), patch.object(
+        wb_client, 'iter_sales_pages', return_value=iter(SALES_PAGES)
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'ensure_tables') as mock_ensure:
+        pipeline = Pipeline(
+            wb_client, db_client, 'shop', '2025-07-01', queue_size=1
+        )
+        rows = pipeline.run()
+    mock_ensure.assert_called_once_with()
+    assert rows == 9
+    assert mock_db_cursor.execute.call_count == 8
+    assert pipeline.stats['fetch'].items == 3
+    assert pipeline.stats['sales'].items == 2
+    assert pipeline.stats['parse'].items == 3
+    assert pipeline.stats['write'].items == 5
+    assert all(
+        stage.max_depth <= 1 for stage in pipeline.stats.values()
+    )
+
+
+def test_pipeline_incremental_uses_sales_updater(db_client, wb_client):
+    calls = []
+    updater = MagicMock(
+        side_effect=lambda *args: calls.append(
+            ('sales', threading.current_thread())
+        ) or []
+    )
+
+    def stock_pages(*args):
+        calls.append(('stocks', threading.current_thread()))
+        yield from STOCK_PAGES
+
+    with patch.object(
+        wb_client, 'iter_stock_pages', side_effect=stock_pages
+    ), patch.object(
+        wb_client, 'iter_sales_pages'
+    ) as mock_sales, patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'ensure_tables'), patch.object(
+        db_client,
+        'save_batches_to_db',
+        side_effect=lambda name, batches: sum(map(len, batches))
+    ):
+        rows = Pipeline(
+            wb_client,
+            db_client,
+            'shop',
+            '2025-07-01',
+            incremental=True,
+            sales_updater=updater
+        ).run()
+    assert rows == 8
+    updater.assert_called_once_with(
+        wb_client, db_client, 'shop', '2025-07-01'
+    )
+    assert calls[0] == ('sales', threading.main_thread())
+    assert calls[1][0] == 'stocks'
+    mock_sales.assert_not_called()
+
+
+def test_pipeline_error_stops_stages(db_client, wb_client, mock_db_cursor):
+    def failing_pages(*args):
+        yield STOCK_PAGES[0]
+        raise ValueError('boom')
+
+    with patch.object(
+        wb_client, 'iter_stock_pages', side_effect=failing_pages
+    ), patch.object(
+        wb_client, 'iter_sales_pages', return_value=iter(SALES_PAGES)
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'ensure_tables'), patch.object(
+        db_client, 'validate_sales_db'
+    ) as mock_sales:
+        with pytest.raises(ValueError, match='boom'):
+            Pipeline(wb_client, db_client, 'shop', '2025-07-01').run()
+    assert all(
+        call.args[0] != [mock_sales.return_value]
+        for call in mock_db_cursor.execute.call_args_list
+    )
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_pipeline_overlaps_fetch_and_write(
+    db_client, wb_client, mock_db_cursor
+):
+    events = []
+    commits = []
+    save_stream = db_client._save_stream
+
+    def stock_pages(*args):
+        yield STOCK_PAGES[0]
+        events.append(('sales started', wait_for(lambda: 'sales' in events)))
+        yield from STOCK_PAGES[1:]
+        events.append(('pages committed', wait_for(lambda: len(commits) > 3)))
+
+    def sales_pages(*args):
+        events.append('sales')
+        yield from SALES_PAGES
+
+    def commit(*args, **kwargs):
+        commits.append(save_stream(*args, **kwargs))
+        return commits[-1]
+
+    with patch.object(
+        wb_client, 'iter_stock_pages', side_effect=stock_pages
+    ), patch.object(
+        wb_client, 'iter_sales_pages', side_effect=sales_pages
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'ensure_tables'), patch.object(
+        db_client, '_save_stream', side_effect=commit
+    ):
+        rows = Pipeline(
+            wb_client, db_client, 'shop', '2025-07-01', queue_size=1
+        ).run()
+    assert rows == 9
+    assert ('sales started', True) in events
+    assert ('pages committed', True) in events
+    assert commits == [1, 2, 2, 2, 2]
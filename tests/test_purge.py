@@ -0,0 +1,124 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser.purge import Purger
+from parser.wb_db import WbDataBaseClient
+
+
+class FakePurger(Purger):
+    """Очистка без обращения к базе данных: записывает вызовы."""
+
+    def __init__(self, referenced=None, **kwargs):
+        super().__init__(**kwargs)
+        self.referenced = referenced or {}
+        self.calls = []
+
+    def foreign_keys(self):
+        return self.referenced
+
+    def delete(self, table_name, condition='', params=()):
+        self.calls.append(('delete', table_name, condition, params))
+        return 0
+
+    def truncate(self, table_name):
+        self.calls.append(('truncate', table_name))
+
+
+def test_delete_runs_chunks_until_short_chunk():
+    sleeps = []
+    purger = Purger(chunk_size=2, pause=0.5, sleep=sleeps.append)
+    with patch.object(
+        Purger, '_delete_chunk', side_effect=[2, 2, 1]
+    ) as mock_chunk:
+        assert purger.delete('t', 'WHERE date < %s', ('2025-01-01',)) == 5
+    assert mock_chunk.call_count == 3
+    assert sleeps == [0.5, 0.5]
+    assert purger.report()['t']['rows'] == 5
+
+
+def test_delete_chunk_uses_limit(mock_db_cursor):
+    mock_db_cursor.rowcount = 3
+    assert Purger(chunk_size=100)._delete_chunk('t', 'WHERE a = %s', (1,)) == 3
+    query, params = mock_db_cursor.execute.call_args.args
+    assert 'DELETE FROM t WHERE a = %s LIMIT 100' in query
+    assert params == (1,)
+
+
+def test_order_puts_referencing_tables_first():
+    referenced = {
+        'catalog_dates': {'reports_sales', 'reports_stocks'},
+        'catalog_products': {'reports_stocks'}
+    }
+    assert Purger.order(
+        ['catalog_products', 'catalog_dates', 'reports_stocks',
+         'reports_sales'],
+        referenced
+    ) == ['reports_stocks', 'catalog_products', 'reports_sales',
+          'catalog_dates']
+
+
+def test_clean_db_cascades_and_truncates_unreferenced(db_client):
+    purger = FakePurger(referenced={
+        'catalog_dates_loweis': {'reports_sales_loweis'}
+    })
+    with patch.object(
+        db_client,
+        '_allowed_tables',
+        return_value={'catalog_dates_loweis', 'reports_sales_loweis'}
+    ):
+        db_client.clean_db(purger=purger, catalog_dates_loweis=True)
+    assert purger.calls == [
+        ('truncate', 'reports_sales_loweis'),
+        ('delete', 'catalog_dates_loweis', '', ())
+    ]
+
+
+def test_purge_older_than_days_in_fk_order(db_client):
+    purger = FakePurger()
+    tables = {
+        'catalog_dates_loweis', 'reports_stocks_loweis',
+        'reports_sales_loweis'
+    }
+    with patch.object(db_client, '_allowed_tables', return_value=tables), \
+            patch('parser.wb_db.dt') as mock_dt:
+        mock_dt.now.return_value.date.return_value = date(2025, 3, 31)
+        db_client.purge(days=30, purger=purger)
+    assert [call[1] for call in purger.calls] == [
+        'reports_stocks_loweis', 'reports_sales_loweis',
+        'catalog_dates_loweis'
+    ]
+    assert purger.calls[-1][2:] == (
+        'WHERE full_date < %s', (date(2025, 3, 1),)
+    )
+
+
+def test_purge_date_range_is_inclusive(db_client):
+    purger = FakePurger()
+    with patch.object(
+        db_client,
+        '_allowed_tables',
+        return_value={'reports_orders_loweis'}
+    ):
+        db_client.purge(
+            date_start='2025-01-01', date_end='2025-01-31', purger=purger
+        )
+    assert purger.calls == [(
+        'delete',
+        'reports_orders_loweis',
+        'WHERE date >= %s AND date < %s',
+        (date(2025, 1, 1), date(2025, 2, 1))
+    )]
+
+
+def test_purge_requires_period(db_client):
+    with pytest.raises(ValueError):
+        db_client.purge(purger=MagicMock())
+
+
+def test_purge_skips_missing_tables():
+    client = WbDataBaseClient('shop')
+    purger = FakePurger()
+    with patch.object(client, '_allowed_tables', return_value=set()):
+        assert client.purge(days=1, purger=purger) == {}
+    assert purger.calls == []
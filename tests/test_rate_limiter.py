@@ -0,0 +1,54 @@
+import pytest
+from parser.rate_limiter import RateLimiter
+
+URL = 'https://statistics-api.wildberries.ru/api/v1/supplier/orders'
+
+
+@pytest.fixture
+def limiter(fake_clock):
+    return RateLimiter(
+        quotas={'statistics-api.wildberries.ru': (2, 30)},
+        clock=fake_clock,
+        sleep=fake_clock.sleep
+    )
+
+
+def test_burst_then_interval(limiter, fake_clock):
+    assert limiter.acquire(URL, 'token') == 0
+    assert limiter.acquire(URL, 'token') == 0
+    assert limiter.acquire(URL, 'token') == 30
+    assert fake_clock.sleeps == [30]
+
+
+def test_quotas_are_per_token(limiter):
+    limiter.acquire(URL, 'token1')
+    limiter.acquire(URL, 'token1')
+    assert limiter.reserve(URL, 'token2') == 0
+
+
+def test_no_wait_after_idle_period(limiter, fake_clock):
+    limiter.acquire(URL, 'token')
+    limiter.acquire(URL, 'token')
+    fake_clock.now += 60
+    assert limiter.acquire(URL, 'token') == 0
+
+
+def test_retry_header_overrides_model(limiter):
+    limiter.acquire(URL, 'token')
+    limiter.update(URL, 'token', {'X-Ratelimit-Retry': '5'}, 429)
+    assert limiter.reserve(URL, 'token') == pytest.approx(5)
+
+
+def test_retry_after_header(limiter):
+    limiter.update(URL, 'token', {'Retry-After': '7'}, 429)
+    assert limiter.reserve(URL, 'token') == pytest.approx(7)
+
+
+def test_remaining_header_exhausts_bucket(limiter):
+    limiter.update(URL, 'token', {'X-Ratelimit-Remaining': '0'})
+    assert limiter.reserve(URL, 'token') == 30
+
+
+def test_429_without_headers_waits_interval(limiter):
+    limiter.update(URL, 'token', {}, 429)
+    assert limiter.reserve(URL, 'token') == 30
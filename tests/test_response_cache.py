@@ -0,0 +1,94 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from parser.exceptions import DataFetchError
+from parser.rate_limiter import RateLimiter
+from parser.response_cache import ResponseCache
+from parser.wb_tools import WbAnalyticsClient
+
+
+@pytest.fixture
+def cache(tmp_path, fake_clock):
+    fake_clock.now = 1_000_000.0
+    return ResponseCache(folder=str(tmp_path), ttl=100, clock=fake_clock)
+
+
+def test_set_and_get(cache):
+    cache.set('shop', 'sales', {'dateFrom': '2025-07-01'}, [{'nmId': 1}])
+    assert cache.get('shop', 'sales', {'dateFrom': '2025-07-01'}) == [
+        {'nmId': 1}
+    ]
+    assert cache.get('other', 'sales', {'dateFrom': '2025-07-01'}) is None
+
+
+def test_expired_entry_is_miss(cache, fake_clock):
+    cache.set('shop', 'sales', {}, [])
+    path = cache._path(cache._key('shop', 'sales', {}))
+    os.utime(path, (fake_clock.now - 200, fake_clock.now - 200))
+    assert cache.get('shop', 'sales', {}) is None
+
+
+def test_size_eviction_removes_oldest(tmp_path, fake_clock):
+    fake_clock.now = os.path.getmtime(tmp_path) + 10
+    cache = ResponseCache(
+        folder=str(tmp_path), ttl=1000, max_size=1, clock=fake_clock
+    )
+    cache.set('shop', 'sales', {'page': 1}, list(range(100)))
+    assert cache.get('shop', 'sales', {'page': 1}) is None
+
+
+def test_eviction_scans_folder_only_on_threshold(tmp_path, fake_clock):
+    cache = ResponseCache(
+        folder=str(tmp_path), clock=fake_clock, evict_interval=2
+    )
+    with patch.object(cache, '_evict', wraps=cache._evict) as mock_evict:
+        for page in range(3):
+            cache.set('shop', 'sales', {'page': page}, [])
+    assert mock_evict.call_count == 2
+
+
+def test_eviction_skips_files_removed_by_other_process(cache, fake_clock):
+    cache.set('shop', 'sales', {}, [])
+    path = cache._path(cache._key('shop', 'sales', {}))
+    os.utime(path, (fake_clock.now - 200, fake_clock.now - 200))
+    with patch(
+        'parser.response_cache.os.remove', side_effect=FileNotFoundError
+    ):
+        cache._evict()
+    assert cache._size == 0
+
+
+def test_replay_miss_raises(tmp_path):
+    cache = ResponseCache(folder=str(tmp_path), replay=True)
+    with pytest.raises(DataFetchError):
+        cache.get('shop', 'sales', {})
+
+
+def test_replay_miss_stops_pagination_without_retries(tmp_path):
+    client = WbAnalyticsClient(
+        'token',
+        limiter=RateLimiter(),
+        cache=ResponseCache(folder=str(tmp_path), replay=True),
+        shop_name='shop'
+    )
+    with patch('time.sleep') as mock_sleep, pytest.raises(DataFetchError):
+        list(client.iter_order_pages('2025-07-01'))
+    mock_sleep.assert_not_called()
+    assert client.retry.stats()['retries'] == {}
+
+
+def test_client_records_and_replays(tmp_path, requests_mock):
+    record = ResponseCache(folder=str(tmp_path))
+    client = WbAnalyticsClient(
+        'token', limiter=RateLimiter(), cache=record, shop_name='shop'
+    )
+    requests_mock.get(client.AVG_SALES_URL, json=[{'nmId': 1}])
+    assert client._get_sale_report('2025-07-01') == [{'nmId': 1}]
+
+    replay = ResponseCache(folder=str(tmp_path), replay=True)
+    client = WbAnalyticsClient(
+        'token', limiter=RateLimiter(), cache=replay, shop_name='shop'
+    )
+    assert client._get_sale_report('2025-07-01') == [{'nmId': 1}]
+    assert requests_mock.call_count == 1
@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+from parser.exceptions import DataFetchError
+from parser.rate_limiter import RateLimiter
+from parser.retry_policy import CircuitBreaker, RetryPolicy
+from parser.wb_tools import WbAnalyticsClient
+
+URL = 'https://seller-analytics-api.wildberries.ru/api'
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    error = DataFetchError('error')
+    error.__cause__ = requests.HTTPError(response=response)
+    return error
+
+
+def test_backoff_grows_exponentially_with_cap(fake_clock):
+    policy = RetryPolicy(
+        strategies={503: (1, 8, 10)},
+        breaker=CircuitBreaker(threshold=100, clock=fake_clock),
+        rng=lambda: 1.0
+    )
+    delays = [policy.backoff(URL, 503, attempt) for attempt in range(1, 7)]
+    assert delays == [1, 2, 4, 8, 8, 8]
+    assert policy.stats() == {
+        'retries': {503: 6},
+        'retry_wait': 31,
+        'breaker_wait': 0,
+        'gave_up': 0
+    }
+
+
+def test_backoff_jitter_within_step():
+    policy = RetryPolicy(
+        strategies={503: (2, 60, 10)},
+        breaker=CircuitBreaker(threshold=100),
+        rng=lambda: 0.25
+    )
+    assert policy.backoff(URL, 503, 3) == 2
+
+
+def test_backoff_gives_up(fake_clock):
+    policy = RetryPolicy(
+        strategies={503: (10, 10, 3)},
+        max_retry_time=25,
+        breaker=CircuitBreaker(threshold=100, clock=fake_clock),
+        rng=lambda: 1.0
+    )
+    assert policy.backoff(URL, 400, 1) is None
+    assert policy.backoff(URL, 503, 1) == 10
+    assert policy.backoff(URL, 503, 2) == 10
+    assert policy.backoff(URL, 503, 3) is None
+    assert policy.backoff(URL, 503, 4) is None
+    assert policy.stats()['gave_up'] == 2
+
+
+def test_circuit_breaker_pauses_host_for_all_clients(fake_clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30, clock=fake_clock)
+    first = RetryPolicy(breaker=breaker)
+    second = RetryPolicy(breaker=breaker)
+    first.backoff(URL, 503, 1)
+    assert second.pause(URL) == 0
+    first.backoff(URL, 502, 2)
+    assert second.pause(URL) == 30
+    assert second.pause('https://statistics-api.wildberries.ru/') == 0
+    fake_clock.now += 30
+    assert second.pause(URL) == 0
+    second.success(URL)
+    first.backoff(URL, 503, 1)
+    assert first.pause(URL) == 0
+
+
+def test_client_retries_server_errors(fake_clock, requests_mock):
+    wb_client = WbAnalyticsClient(
+        'test_token',
+        limiter=RateLimiter(clock=fake_clock, sleep=fake_clock.sleep),
+        retry=RetryPolicy(breaker=CircuitBreaker(), rng=lambda: 0.5)
+    )
+    requests_mock.post(wb_client.PRODUCT_DATA_URL, [
+        {'status_code': 503},
+        {'status_code': 502},
+        {'json': {'data': {'items': [{'nmID': 1}]}}, 'status_code': 200},
+        {'json': {'data': {'items': []}}, 'status_code': 200},
+    ])
+    with patch('time.sleep') as mock_sleep:
+        result = wb_client.get_all_stock_reports('2025-07-01', '2025-07-01')
+    assert result == [{'nmID': 1}]
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1]
+    assert wb_client.retry.stats()['retries'] == {503: 1, 502: 1}
+
+
+def test_client_retries_connection_errors(fake_clock, requests_mock):
+    wb_client = WbAnalyticsClient(
+        'test_token',
+        limiter=RateLimiter(clock=fake_clock, sleep=fake_clock.sleep),
+        retry=RetryPolicy(breaker=CircuitBreaker(), rng=lambda: 0.5)
+    )
+    requests_mock.post(wb_client.PRODUCT_DATA_URL, [
+        {'exc': requests.ConnectTimeout},
+        {'json': {'data': {'items': [{'nmID': 1}]}}, 'status_code': 200},
+        {'json': {'data': {'items': []}}, 'status_code': 200},
+    ])
+    with patch('time.sleep') as mock_sleep:
+        result = wb_client.get_all_stock_reports('2025-07-01', '2025-07-01')
+    assert result == [{'nmID': 1}]
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5]
+    assert wb_client.retry.stats()['retries'] == {None: 1}
+
+
+def test_client_does_not_retry_decode_errors(wb_client, requests_mock):
+    requests_mock.post(wb_client.PRODUCT_DATA_URL, text='not json')
+    with patch('time.sleep') as mock_sleep, pytest.raises(DataFetchError):
+        wb_client.get_all_stock_reports('2025-07-01', '2025-07-01')
+    mock_sleep.assert_not_called()
+    assert requests_mock.call_count == 1
+    assert wb_client.retry.stats()['retries'] == {}
+
+
+def test_client_raises_when_retries_exhausted(wb_client):
+    wb_client.retry = RetryPolicy(
+        strategies={503: (1, 1, 2)}, breaker=CircuitBreaker()
+    )
+    with patch.object(
+        wb_client, '_get_sale_report', side_effect=http_error(503)
+    ), patch('time.sleep'), pytest.raises(DataFetchError):
+        wb_client.get_all_sales_reports('2025-07-24')
+    assert wb_client.retry.stats()['gave_up'] == 1
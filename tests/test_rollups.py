@@ -0,0 +1,192 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser.constants import INSERT_DATES, INSERT_SALES, INSERT_STOCKS
+from parser.rebuild_rollups import main
+from parser.rollups import RollupManager, period_bounds
+from parser.utils import stream_to_database
+from parser.wb_db import WbDataBaseClient
+
+STOCKS = INSERT_STOCKS.format(table_name='reports_stocks_shop')
+SALES = INSERT_SALES.format(table_name='reports_sales_shop')
+
+
+def executed(cursor):
+    return [call.args for call in cursor.execute.call_args_list]
+
+
+def test_period_bounds():
+    assert period_bounds('weekly', '2025-01-01') == (
+        date(2024, 12, 30), date(2025, 1, 6)
+    )
+    assert period_bounds('monthly', date(2025, 12, 31)) == (
+        date(2025, 12, 1), date(2026, 1, 1)
+    )
+    with pytest.raises(ValueError):
+        period_bounds('daily', '2025-01-01')
+
+
+def test_touch_collects_only_report_periods():
+    rollups = RollupManager('shop')
+    touched = set()
+    rollups.touch(
+        STOCKS, [(date(2025, 1, 1), 1, 5), (date(2025, 1, 2), 2, 3)], touched
+    )
+    rollups.touch(SALES, [(date(2025, 1, 6), 1, 0.5)], touched)
+    rollups.touch(
+        INSERT_DATES.format(table_name='catalog_dates_shop'),
+        [(date(2025, 3, 1), 1, 3, 2025, 6)],
+        touched
+    )
+    cursor = MagicMock()
+    assert rollups.flush(cursor, touched) == 3
+    deletes = [
+        args for args in executed(cursor) if 'DELETE' in args[0]
+    ]
+    assert [args[1] for args in deletes] == [
+        (date(2025, 1, 1),), (date(2024, 12, 30),), (date(2025, 1, 6),)
+    ]
+    assert rollups.flush(cursor, set()) == 0
+
+
+def test_refresh_recomputes_period_from_daily_rows():
+    cursor = MagicMock()
+    RollupManager('shop').refresh(cursor, 'monthly', date(2025, 1, 15))
+    delete, stocks, sales = executed(cursor)
+    assert 'DELETE FROM rollup_monthly_shop' in delete[0]
+    assert 'FROM reports_stocks_shop' in stocks[0]
+    assert 'AVG(stock), MIN(stock), MAX(stock)' in stocks[0]
+    assert stocks[1] == (date(2025, 1, 1), date(2025, 1, 1), date(2025, 2, 1))
+    assert 'SUM(sale), AVG(sale)' in sales[0]
+    assert 'ON DUPLICATE KEY UPDATE' in sales[0]
+
+
+def test_shared_refresh_filters_by_shop_id():
+    rollups = RollupManager('shop', shared=True)
+    touched = set()
+    rollups.touch(
+        INSERT_STOCKS.format(table_name='reports_stocks'),
+        [(7, date(2025, 1, 1), 1, 5)],
+        touched
+    )
+    cursor = MagicMock()
+    rollups.flush(cursor, touched)
+    delete, stocks, _ = executed(cursor)[:3]
+    assert delete[1] == (7, date(2025, 1, 1))
+    assert 'WHERE shop_id = %s' in stocks[0]
+    assert stocks[1] == (
+        date(2025, 1, 1), 7, date(2025, 1, 1), date(2025, 2, 1)
+    )
+
+
+def test_period_starts_cover_interval():
+    assert RollupManager('shop').period_starts(
+        'monthly', '2025-01-20', '2025-03-02'
+    ) == [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)]
+
+
+def test_save_stream_updates_rollups_in_same_transaction(mock_db_cursor):
+    client = WbDataBaseClient('shop', change_aware=False)
+    with patch.object(
+        client, '_create_table_if_not_exist', return_value='rollup'
+    ):
+        client.save_stream_to_db(
+            'shop', [(STOCKS, [(date(2025, 1, 1), 1, 5)])]
+        )
+    queries = [args[0] for args in executed(mock_db_cursor)]
+    assert len(queries) == 7
+    assert 'DELETE FROM rollup_monthly_shop' in queries[1]
+
+
+def test_save_batches_updates_rollups_once_after_batches(mock_db_cursor):
+    client = WbDataBaseClient('shop', change_aware=False)
+    with patch.object(
+        client, '_create_table_if_not_exist', return_value='rollup'
+    ):
+        rows = client.save_batches_to_db('shop', [
+            [(STOCKS, [(date(2025, 1, 1), 1, 5)])],
+            [(STOCKS, [(date(2025, 1, 2), 2, 3)])]
+        ])
+    queries = [args[0] for args in executed(mock_db_cursor)]
+    assert rows == 2
+    assert len(queries) == 8
+    assert all(query.strip().startswith('INSERT') for query in queries[:2])
+    assert 'DELETE FROM rollup_monthly_shop' in queries[2]
+
+
+def test_incremental_stream_flushes_on_connection_of_stock_rows(wb_client):
+    client = WbDataBaseClient('shop', change_aware=False)
+    connections = []
+
+    def connect(**config):
+        connection = MagicMock()
+        connections.append(connection)
+        return connection
+
+    stock_pages = [[{'nmID': 1, 'name': 'A', 'metrics': {'stockCount': 3}}]]
+    order_pages = [[{'srid': 'a', 'date': '2025-07-20', 'nmId': 1,
+                     'lastChangeDate': '2025-07-21T10:00:00',
+                     'isRealization': True, 'isCancel': False}]]
+    with patch(
+        'parser.decorators.mysql.connector.connect', side_effect=connect
+    ), patch.object(
+        client,
+        '_create_table_if_not_exist',
+        side_effect=lambda type_table, type_data, **refs: (
+            client._table_name(type_table, type_data)
+        )
+    ), patch.object(
+        wb_client, 'iter_stock_pages', return_value=iter(stock_pages)
+    ), patch.object(
+        wb_client, 'iter_order_pages', return_value=iter(order_pages)
+    ), patch.object(client, 'get_sales_cursor', return_value=None):
+        stream_to_database(
+            wb_client, client, 'shop', '2025-07-24', incremental=True
+        )
+
+    def wrote(connection, statement):
+        cursor = connection.cursor.return_value
+        return any(
+            args[0].strip().startswith(statement) for args in executed(cursor)
+        )
+
+    writers = [
+        connection for connection in connections
+        if wrote(connection, 'INSERT INTO reports_stocks_shop')
+    ]
+    flushers = [
+        connection for connection in connections
+        if wrote(connection, 'DELETE FROM rollup_')
+    ]
+    assert len(writers) == 1
+    assert flushers == writers
+    assert all(
+        connection.commit.call_count == 1 for connection in connections
+    )
+
+
+def test_rebuild_rollups_refreshes_every_period():
+    client = WbDataBaseClient('shop')
+    with patch.object(client, '_create_table_if_not_exist'), \
+            patch.object(
+                client, '_report_range',
+                return_value=(date(2025, 1, 1), date(2025, 1, 31))
+            ), \
+            patch.object(client, '_rebuild_period') as mock_rebuild:
+        assert client.rebuild_rollups() == 6
+    assert mock_rebuild.call_args_list[-1].args[1:] == (
+        'monthly', date(2025, 1, 1)
+    )
+
+
+@patch('parser.rebuild_rollups.close_pool')
+@patch('parser.rebuild_rollups.init_pool')
+def test_rebuild_command(mock_init, mock_close):
+    with patch.object(WbDataBaseClient, 'ensure_tables'), patch.object(
+        WbDataBaseClient, 'rebuild_rollups', return_value=2
+    ) as mock_rebuild:
+        assert main(['a', '--start', '2025-01-01', '--end', '2025-01-31']) == {
+            'a': 2
+        }
+    mock_rebuild.assert_called_once_with('2025-01-01', '2025-01-31')
@@ -0,0 +1,58 @@
+import random
+from datetime import date, timedelta
+from parser.sales_engine import RollingSalesEngine
+
+
+def test_engine_matches_parse_avg_sales(db_client):
+    rng = random.Random(42)
+    start = date(2025, 1, 1)
+    orders = [
+        {
+            'nmId': rng.choice([11, 22, 33, 44]),
+            'date': str(start + timedelta(days=rng.randint(-14, 30))),
+            'isRealization': rng.random() > 0.1,
+            'isCancel': rng.random() < 0.1,
+        } for _ in range(2000)
+    ]
+    daily_sales = db_client.parse_daily_sales(
+        orders, '2024-12-18', '2025-01-31'
+    )
+    engine = RollingSalesEngine(daily_sales, '2025-01-01', '2025-01-31')
+    for offset in range(31):
+        date_str = str(start + timedelta(days=offset))
+        window_start = str(
+            date.fromisoformat(date_str) - timedelta(days=14)
+        )
+        expected = db_client.parse_avg_sales([
+            order for order in orders
+            if window_start <= order['date'] <= date_str
+        ], date_str)
+        result = engine.avg_sales(date_str)
+        assert sorted(result, key=lambda x: x['артикул']) == sorted(
+            expected, key=lambda x: x['артикул']
+        )
+
+
+def test_engine_rounding_matches_decimal(db_client):
+    for count in range(200):
+        daily_sales = {'2025-01-01': {1: count}}
+        engine = RollingSalesEngine(daily_sales, '2025-01-01', '2025-01-01')
+        expected = db_client.parse_avg_sales([
+            {'nmId': 1, 'isRealization': True, 'isCancel': False}
+        ] * count, '2025-01-01')
+        assert engine.avg_sales('2025-01-01') == expected
+
+
+def test_engine_outside_period(db_client):
+    engine = RollingSalesEngine({}, '2025-01-01', '2025-01-02')
+    assert engine.avg_sales('2025-03-01') == []
+
+
+def test_engine_compact_matches_dicts():
+    daily_sales = {'2025-01-01': {1: 3, 2: 7}, '2025-01-05': {2: 1}}
+    engine = RollingSalesEngine(daily_sales, '2025-01-01', '2025-01-10')
+    for day in range(1, 11):
+        date_str = f'2025-01-{day:02d}'
+        assert engine.avg_sales(date_str, compact=True).to_dicts() == (
+            engine.avg_sales(date_str)
+        )
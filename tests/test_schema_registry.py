@@ -0,0 +1,63 @@
+from unittest.mock import MagicMock, patch
+
+from parser.schema_registry import SchemaRegistry, schema_registry
+from parser.wb_db import WbDataBaseClient
+
+
+def test_registry_loads_tables_once(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [('a',), ('b',)]
+    registry = SchemaRegistry()
+    assert registry.exists('a')
+    assert not registry.exists('c')
+    assert mock_db_cursor.execute.call_count == 1
+    assert 'information_schema' in mock_db_cursor.execute.call_args.args[0]
+
+
+def test_registry_creates_only_missing_tables(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [('a',)]
+    registry = SchemaRegistry()
+    created = registry.create([('a', 'CREATE a'), ('b', 'CREATE b')])
+    assert created == ['b']
+    assert registry.exists('b')
+    mock_db_cursor.execute.assert_called_with('CREATE b')
+
+
+def test_registry_invalidate_reloads(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [('a',)]
+    registry = SchemaRegistry()
+    assert not registry.exists('b')
+    mock_db_cursor.fetchall.return_value = [('a',), ('b',)]
+    assert not registry.exists('b')
+    registry.invalidate()
+    assert registry.exists('b')
+
+
+def test_create_table_if_not_exist_uses_cache(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [('catalog_dates_shop',)]
+    db_client = WbDataBaseClient('shop')
+    for _ in range(3):
+        assert db_client._create_table_if_not_exist(
+            'catalog', 'dates'
+        ) == 'catalog_dates_shop'
+    assert mock_db_cursor.execute.call_count == 1
+
+
+def test_ensure_tables_creates_missing_in_order():
+    db_client = WbDataBaseClient('shop')
+    with patch.object(
+        schema_registry,
+        'tables',
+        return_value={'catalog_dates_shop', 'reports_orders_shop'}
+    ), patch.object(
+        schema_registry, 'create', MagicMock(return_value=['x'])
+    ) as mock_create:
+        assert db_client.ensure_tables() == ['x']
+    names = [name for name, _ in mock_create.call_args.args[0]]
+    assert names == [
+        'catalog_products_shop',
+        'service_cursors_shop',
+        'reports_sales_shop',
+        'reports_stocks_shop',
+        'rollup_weekly_shop',
+        'rollup_monthly_shop',
+    ]
@@ -0,0 +1,237 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from parser.utils import (all_data_for_period, load_report, main_logic,
+                          stream_to_database, update_sales_incremental)
+
+
+def test_main_logic_isolates_shop_errors():
+    token_client = MagicMock()
+    token_client.get_exists_shop.return_value = ['shop1', 'shop2', 'shop3']
+
+    def fake_process(token_client, shop_name, *args):
+        if shop_name == 'shop2':
+            raise ValueError('boom')
+
+    with patch('parser.utils.process_shop', side_effect=fake_process):
+        results = main_logic(token_client, max_workers=3)
+
+    assert [result['SHOP'] for result in results] == [
+        'shop1', 'shop2', 'shop3'
+    ]
+    assert [result['STATUS'] for result in results] == [
+        'SUCCESS', 'ERROR', 'SUCCESS'
+    ]
+    assert results[1]['ERROR_TYPE'] == 'ValueError'
+    assert results[1]['ERROR_MESSAGE'] == 'boom'
+
+
+def test_main_logic_sequential_mode():
+    token_client = MagicMock()
+    token_client.get_exists_shop.return_value = ['shop1', 'shop2']
+
+    with patch('parser.utils.process_shop') as mock_process:
+        results = main_logic(token_client, max_workers=1)
+
+    assert mock_process.call_count == 2
+    assert all(result['STATUS'] == 'SUCCESS' for result in results)
+
+
+def test_stream_to_database(db_client, wb_client, mock_db_cursor):
+    stock_pages = [
+        [{'nmID': 1, 'name': 'A', 'metrics': {'stockCount': 3}}],
+        [{'nmID': 2, 'name': 'B', 'metrics': {'stockCount': 4}}],
+    ]
+    sales_pages = [[{'nmId': 1, 'isRealization': True, 'isCancel': False}]]
+    with patch.object(
+        wb_client, 'iter_stock_pages', return_value=iter(stock_pages)
+    ), patch.object(
+        wb_client, 'iter_sales_pages', return_value=iter(sales_pages)
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ):
+        rows = stream_to_database(wb_client, db_client, 'shop', '2025-07-01')
+    assert rows == 6
+    mock_db_cursor.executemany.assert_not_called()
+    assert mock_db_cursor.execute.call_count == 6
+
+
+def test_stream_fetches_pages_before_transaction(db_client, wb_client):
+    calls = []
+
+    def pages(*args):
+        for nm_id in (1, 2):
+            calls.append('page')
+            yield [{'nmID': nm_id, 'name': 'A', 'metrics': {'stockCount': 3}}]
+
+    def save(name_of_shop, queries):
+        calls.append('save')
+        return len(list(queries))
+
+    with patch.object(
+        wb_client, 'iter_stock_pages', side_effect=pages
+    ), patch.object(
+        wb_client, 'iter_sales_pages', return_value=iter([])
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'save_stream_to_db', side_effect=save):
+        stream_to_database(wb_client, db_client, 'shop', '2025-07-01')
+        load_report(wb_client, db_client, 'shop', '2025-07-01', 'stocks')
+    assert calls == ['page', 'page', 'save'] * 2
+
+
+def test_incremental_sales_saved_before_day_transaction(db_client, wb_client):
+    calls = []
+
+    def save(name_of_shop, queries):
+        calls.append('save')
+        return len(list(queries))
+
+    with patch(
+        'parser.utils.update_sales_incremental',
+        side_effect=lambda *args: calls.append('sales') or ['avg']
+    ), patch.object(
+        wb_client, 'iter_stock_pages', return_value=iter([])
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(db_client, 'save_stream_to_db', side_effect=save):
+        stream_to_database(
+            wb_client, db_client, 'shop', '2025-07-24', incremental=True
+        )
+        load_report(
+            wb_client, db_client, 'shop', '2025-07-24', 'sales', True
+        )
+    assert calls == ['sales', 'save', 'sales', 'save']
+
+
+def test_update_sales_incremental_fetches_before_transaction(
+    db_client, wb_client
+):
+    calls = []
+
+    def pages(date_from):
+        for number in range(2):
+            calls.append('page')
+            yield [{'srid': str(number), 'date': '2025-07-20', 'nmId': 1,
+                    'lastChangeDate': f'2025-07-21T1{number}:00:00',
+                    'isRealization': True, 'isCancel': False}]
+
+    def save(name_of_shop, queries):
+        calls.append('save')
+        return len(list(queries))
+
+    with patch.object(
+        db_client, 'get_sales_cursor', return_value=None
+    ), patch.object(
+        wb_client, 'iter_order_pages', side_effect=pages
+    ), patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(
+        db_client, 'save_stream_to_db', side_effect=save
+    ), patch.object(db_client, 'get_avg_sales_from_orders'):
+        update_sales_incremental(wb_client, db_client, 'shop', '2025-07-24')
+    assert calls == ['page', 'page', 'save']
+
+
+def test_update_sales_incremental_uses_cursor(db_client, wb_client):
+    page = [{'srid': 'a', 'date': '2025-07-20', 'nmId': 1,
+             'lastChangeDate': '2025-07-21T10:00:00',
+             'isRealization': True, 'isCancel': False}]
+    saved = []
+    with patch.object(
+        db_client, 'get_sales_cursor', return_value='2025-07-20T08:00:00'
+    ), patch.object(
+        wb_client, 'iter_order_pages', return_value=iter([page])
+    ) as mock_pages, patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ), patch.object(
+        db_client,
+        'save_stream_to_db',
+        side_effect=lambda shop, queries: saved.extend(queries)
+    ), patch.object(
+        db_client, 'get_avg_sales_from_orders', return_value=['avg']
+    ):
+        result = update_sales_incremental(
+            wb_client, db_client, 'shop', '2025-07-24'
+        )
+    mock_pages.assert_called_once_with('2025-07-20T08:00:00')
+    assert result == ['avg']
+    assert saved[1][1] == ('sales', '2025-07-21T10:00:00')
+    assert saved[2][1] == ('2025-07-10',)
+
+
+@pytest.mark.parametrize('days_per_commit, commits', [(1, 3), (2, 2), (5, 1)])
+def test_all_data_for_period_fetches_orders_once(
+    db_client, wb_client, days_per_commit, commits
+):
+    orders = [{'nmId': 1, 'date': '2025-07-01T10:00:00',
+               'isRealization': True, 'isCancel': False}]
+    stocks = [{'nmID': 1, 'name': 'A', 'metrics': {'stockCount': 3}}]
+    with patch.object(
+        wb_client, 'iter_order_pages', return_value=iter([orders])
+    ) as mock_pages, patch.object(
+        wb_client, 'get_all_stock_reports', return_value=stocks
+    ) as mock_stocks, patch.object(
+        wb_client, 'get_all_sales_reports'
+    ) as mock_sales, patch.object(
+        db_client, 'save_stream_to_db', return_value=0
+    ) as mock_save, patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ):
+        all_data_for_period(
+            wb_client,
+            'shop',
+            db_client,
+            '2025-07-01',
+            '2025-07-03',
+            days_per_commit=days_per_commit
+        )
+    mock_pages.assert_called_once_with('2025-06-17')
+    mock_sales.assert_not_called()
+    assert mock_stocks.call_count == 3
+    assert mock_save.call_count == commits
+    dates = [
+        params for call in mock_save.call_args_list
+        for query, params in call.args[1][:1]
+    ]
+    assert sum(len(params) for params in dates) == 3
+
+
+class PicklableTokenClient:
+    def get_exists_shop(self):
+        return ['shop1', 'shop2', 'shop3', 'shop4', 'shop5']
+
+
+def fake_process_in_child(token_client, shop_name, *args):
+    if shop_name == 'shop4':
+        raise ValueError(f'boom in {os.getpid()}')
+
+
+def test_main_logic_process_mode_aggregates_results():
+    with patch('parser.utils.process_shop', fake_process_in_child):
+        results = main_logic(PicklableTokenClient(), processes=2)
+
+    assert [result['SHOP'] for result in results] == [
+        'shop1', 'shop2', 'shop3', 'shop4', 'shop5'
+    ]
+    assert [result['STATUS'] for result in results] == [
+        'SUCCESS', 'SUCCESS', 'SUCCESS', 'ERROR', 'SUCCESS'
+    ]
+    assert results[3]['ERROR_MESSAGE'] != f'boom in {os.getpid()}'
+
+
+def test_load_report_stocks_only(db_client, wb_client, mock_db_cursor):
+    stock_pages = [[{'nmID': 1, 'name': 'A', 'metrics': {'stockCount': 3}}]]
+    with patch.object(
+        wb_client, 'iter_stock_pages', return_value=iter(stock_pages)
+    ), patch.object(
+        wb_client, 'iter_sales_pages'
+    ) as mock_sales, patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ):
+        rows = load_report(
+            wb_client, db_client, 'shop', '2025-07-01', 'stocks'
+        )
+    assert rows == 3
+    mock_sales.assert_not_called()
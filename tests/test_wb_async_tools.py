@@ -0,0 +1,117 @@
+import asyncio
+import io
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from parser.exceptions import DataFetchError
+from parser.rate_limiter import RateLimiter
+from parser.retry_policy import CircuitBreaker, RetryPolicy
+from parser.wb_async_tools import AsyncWbAnalyticsClient
+
+
+@pytest.fixture
+def async_client():
+    return AsyncWbAnalyticsClient(
+        'test_token',
+        limiter=RateLimiter(),
+        retry=RetryPolicy(breaker=CircuitBreaker(), rng=lambda: 1.0)
+    )
+
+
+def http_error(status):
+    error = DataFetchError('error')
+    error.__cause__ = aiohttp.ClientResponseError(
+        MagicMock(), (), status=status
+    )
+    return error
+
+
+def test_init_without_token():
+    with pytest.raises(ValueError, match='API token is required'):
+        AsyncWbAnalyticsClient('')
+
+
+def test_get_all_sales_reports(async_client):
+    mock_data = [
+        {"nmId": 123, "date": "2025-07-20", "lastChangeDate": "2025-07-20"},
+        {"nmId": 456, "date": "2025-07-01", "lastChangeDate": "2025-07-21"},
+    ]
+    with patch.object(
+        async_client,
+        '_get_sale_report',
+        AsyncMock(side_effect=[mock_data, []])
+    ) as mock_report:
+        result = asyncio.run(async_client.get_all_sales_reports('2025-07-24'))
+    assert result == mock_data[:1]
+    assert mock_report.await_args_list[1].args == ('2025-07-21',)
+
+
+def test_get_all_stock_reports_retries(async_client):
+    mock_data = {'data': {'items': [{'test': 'data'}]}}
+    mock_empty = {'data': {'items': []}}
+    with patch.object(
+        async_client,
+        '_get_stock_report',
+        AsyncMock(side_effect=[http_error(503), mock_data, mock_empty])
+    ), patch('asyncio.sleep', AsyncMock()) as mock_sleep:
+        result = asyncio.run(
+            async_client.get_all_stock_reports('2025-07-01', '2025-07-10')
+        )
+    assert result == [{'test': 'data'}]
+    mock_sleep.assert_awaited_once_with(1)
+
+
+def test_get_all_sales_reports_raises_on_client_error(async_client):
+    with patch.object(
+        async_client,
+        '_get_sale_report',
+        AsyncMock(side_effect=http_error(401))
+    ), pytest.raises(DataFetchError):
+        asyncio.run(async_client.get_all_sales_reports('2025-07-24'))
+
+
+def test_deadline_stops_pagination_without_retries(async_client):
+    async_client.deadline = time.monotonic() - 1
+    with patch('asyncio.sleep', AsyncMock()) as mock_sleep, patch.object(
+        async_client.retry.breaker, 'record_failure'
+    ) as mock_failure, pytest.raises(DataFetchError):
+        asyncio.run(
+            async_client.get_all_stock_reports('2025-07-01', '2025-07-01')
+        )
+    mock_sleep.assert_not_awaited()
+    mock_failure.assert_not_called()
+    assert async_client.retry.stats()['retries'] == {}
+
+
+def test_get_all_stock_reports_retries_timeouts(async_client):
+    mock_data = {'data': {'items': [{'test': 'data'}]}}
+    timeout = DataFetchError('error')
+    timeout.__cause__ = asyncio.TimeoutError()
+    with patch.object(
+        async_client,
+        '_get_stock_report',
+        AsyncMock(side_effect=[timeout, mock_data, {'data': {'items': []}}])
+    ), patch('asyncio.sleep', AsyncMock()):
+        result = asyncio.run(
+            async_client.get_all_stock_reports('2025-07-01', '2025-07-10')
+        )
+    assert result == [{'test': 'data'}]
+    assert async_client.retry.stats()['retries'] == {None: 1}
+
+
+def test_decode_sales_streams_needed_fields():
+    class FakeContent:
+        def __init__(self, data):
+            self.buffer = io.BytesIO(data)
+
+        async def read(self, size=-1):
+            return self.buffer.read(size)
+
+    orders = [{'nmId': 1, 'date': '2025-07-10', 'totalPrice': 10.5}]
+    response = MagicMock()
+    response.content = FakeContent(json.dumps(orders).encode())
+    result = asyncio.run(AsyncWbAnalyticsClient._decode_sales(response))
+    assert result == [{'nmId': 1, 'date': '2025-07-10'}]
@@ -2,6 +2,7 @@ import pytest
 from datetime import date
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
+from parser.constants import TRUNCATE_TABLE
 from parser.exceptions import RefTableError, TableNameError, TypeDataError
 from parser.wb_db import WbDataBaseClient
 
@@ -21,6 +22,33 @@ def test_parse_product_data(db_client):
     assert result[1]['наименование'] == 'Товар 2'
 
 
+def test_parse_product_data_compact_matches_dicts(db_client):
+    test_data = [
+        {'name': 'Товар 1', 'nmID': 12345, 'metrics': {'stockCount': 10}},
+        {'name': 'Без артикула', 'metrics': {'stockCount': 1}},
+        {'name': 'Товар 2', 'nmID': 67890, 'metrics': {'stockCount': 5}},
+    ]
+    batch = db_client.parse_product_data(
+        test_data, '2023-01-01', compact=True
+    )
+    assert len(batch) == 2
+    assert batch.to_dicts() == db_client.parse_product_data(
+        [item for item in test_data if 'nmID' in item], '2023-01-01'
+    )
+
+
+def test_parse_avg_sales_compact_matches_dicts(db_client):
+    test_data = [
+        {'nmId': 12345, 'isRealization': True, 'isCancel': False},
+        {'nmId': 12345, 'isRealization': True, 'isCancel': False},
+        {'nmId': 67890, 'isRealization': True, 'isCancel': False},
+    ]
+    batch = db_client.parse_avg_sales(test_data, '2023-01-01', compact=True)
+    assert batch.to_dicts() == db_client.parse_avg_sales(
+        test_data, '2023-01-01'
+    )
+
+
 def test_parse_avg_sales(db_client):
     test_data = [
         {'nmId': 12345, 'isRealization': True, 'isCancel': False},
@@ -44,6 +72,25 @@ def test_parse_avg_sales(db_client):
             )
 
 
+def test_parse_daily_sales(db_client):
+    test_data = [
+        {'nmId': 1, 'date': '2025-01-01T10:00:00',
+         'isRealization': True, 'isCancel': False},
+        {'nmId': 1, 'date': '2025-01-01T12:00:00',
+         'isRealization': True, 'isCancel': False},
+        {'nmId': 2, 'date': '2025-01-16T10:00:00',
+         'isRealization': True, 'isCancel': False},
+        {'nmId': 2, 'date': '2025-01-10T10:00:00',
+         'isRealization': True, 'isCancel': True},
+        {'nmId': 3, 'date': '2024-11-30T10:00:00',
+         'isRealization': True, 'isCancel': False},
+    ]
+    daily_sales = db_client.parse_daily_sales(
+        test_data, '2024-12-01', '2025-01-31'
+    )
+    assert daily_sales == {'2025-01-01': {1: 2}, '2025-01-16': {2: 1}}
+
+
 def test_validate_date_db(db_client):
     date_str = '2025-01-01'
     with patch.object(
@@ -108,6 +155,46 @@ def test_validate_sales_db(db_client):
         assert params[1] == (date(2025, 1, 1), 67890, 1)
 
 
+def test_validate_orders_db(db_client):
+    test_data = [
+        {'srid': 'a', 'date': '2025-01-10T10:00:00', 'nmId': 1,
+         'isRealization': True, 'isCancel': False},
+        {'srid': 'b', 'date': '2025-01-11T10:00:00', 'nmId': 1,
+         'isRealization': True, 'isCancel': True},
+        {'srid': 'c', 'date': '2024-12-01T10:00:00', 'nmId': 2,
+         'isRealization': True, 'isCancel': False},
+    ]
+    with patch.object(
+        db_client,
+        '_create_table_if_not_exist',
+        return_value='reports_orders_test_shop'
+    ):
+        query, params = db_client.validate_orders_db(test_data, '2025-01-01')
+        assert 'INSERT INTO reports_orders_test_shop' in query
+        assert params == [
+            ('a', '2025-01-10', 1, True),
+            ('b', '2025-01-11', 1, False),
+        ]
+
+
+def test_get_avg_sales_from_orders(db_client, mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = [(12345, 2), (67890, 1)]
+    with patch.object(
+        db_client,
+        '_create_table_if_not_exist',
+        return_value='reports_orders_test_shop'
+    ):
+        result = db_client.get_avg_sales_from_orders('2025-01-15')
+    args, _ = mock_db_cursor.execute.call_args
+    assert args[1] == ('2025-01-01', '2025-01-15')
+    assert result == [
+        {'дата': '2025-01-15', 'артикул': 12345,
+         'среднее значение': round(Decimal(2) / Decimal(14), 2)},
+        {'дата': '2025-01-15', 'артикул': 67890,
+         'среднее значение': round(Decimal(1) / Decimal(14), 2)},
+    ]
+
+
 def test_create_table_if_not_exist_invalid_type(db_client):
     with patch.object(
         db_client,
@@ -129,19 +216,21 @@ def test_create_table_if_not_exist_missing_refs(db_client):
 def test_clean_db_success(db_client):
     mock_conn = MagicMock()
     mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchone.return_value = (5,)
     mock_conn.cursor.return_value = mock_cursor
-    with patch.object(
-        WbDataBaseClient,
-        '_allowed_tables',
-        return_value=['valid_table']
-    ), patch('mysql.connector.connect', return_value=mock_conn), patch.object(
-        db_client,
-        '_allowed_tables',
-        return_value=['valid_table']
-    ):
-        db_client.clean_db(valid_table=True)
-        mock_cursor.execute.assert_called_once_with('DELETE FROM valid_table')
-        mock_conn.commit.assert_called_once()
+    with patch('mysql.connector.connect', return_value=mock_conn), \
+            patch.object(
+                db_client,
+                '_allowed_tables',
+                return_value=['valid_table']
+            ):
+        report = db_client.clean_db(valid_table=True, skipped_table=False)
+        mock_cursor.execute.assert_called_with(
+            TRUNCATE_TABLE.format(table_name='valid_table')
+        )
+        assert report['valid_table']['rows'] == 5
+        assert 'skipped_table' not in report
 
 
 def test_clean_db_table_not_exists(db_client):
@@ -151,3 +240,119 @@ def test_clean_db_table_not_exists(db_client):
         return_value=[]
     ), pytest.raises(TableNameError):
         db_client.clean_db(nonexistent_table=True)
+
+
+def test_validate_db_accepts_batches(db_client):
+    products = db_client.parse_product_data([
+        {'name': 'Товар 1', 'nmID': 12345, 'metrics': {'stockCount': 10}},
+    ], '2025-01-01', compact=True)
+    sales = db_client.parse_avg_sales([
+        {'nmId': 12345, 'isRealization': True, 'isCancel': False},
+    ] * 7, '2025-01-01', compact=True)
+    with patch.object(
+        db_client,
+        '_create_table_if_not_exist',
+        return_value='test_table'
+    ):
+        assert db_client.validate_products_db(products)[1] == [
+            (12345, 'Товар 1')
+        ]
+        assert db_client.validate_stocks_db(products)[1] == [
+            (date(2025, 1, 1), 12345, 10)
+        ]
+        assert db_client.validate_sales_db(sales)[1] == [
+            (date(2025, 1, 1), 12345, Decimal('0.50'))
+        ]
+
+
+def test_unit_of_work_queries_groups_days(db_client):
+    days = [
+        (
+            f'2025-01-0{day}',
+            [{'дата': f'2025-01-0{day}', 'артикул': 1,
+              'наименование': f'Товар {day}', 'остаток': day}],
+            [{'дата': f'2025-01-0{day}', 'артикул': 1,
+              'среднее значение': Decimal('0.50')}]
+        ) for day in (1, 2)
+    ]
+    with patch.object(
+        db_client, '_create_table_if_not_exist', side_effect=lambda t, d, **k: d
+    ):
+        queries = db_client.unit_of_work_queries(days)
+    assert [len(params) for _, params in queries] == [2, 1, 2, 2]
+    assert 'INSERT INTO dates' in queries[0][0]
+    assert queries[1][1] == [(1, 'Товар 2')]
+    assert 'INSERT INTO sales' in queries[3][0]
+
+
+def test_save_days_reports_missing_data(db_client, mock_db_cursor):
+    with patch.object(
+        db_client, '_create_table_if_not_exist', return_value='table'
+    ):
+        rows = db_client.save_days('shop', [('2025-01-01', [], [])])
+    assert rows == 1
+    assert mock_db_cursor.execute.call_count == 1
+
+
+@pytest.fixture
+def shared_client():
+    client = WbDataBaseClient('shop', shared=True)
+    client.shop_id = 7
+    with patch.object(
+        client, '_create_table_if_not_exist',
+        side_effect=lambda type_table, type_data, **refs:
+            f'{type_table}_{type_data}'
+    ):
+        yield client
+
+
+def test_shared_tables_are_keyed_by_shop_id(shared_client):
+    name, query = shared_client._table_query('reports', 'stocks')
+    assert name == 'reports_stocks'
+    assert 'PRIMARY KEY (`shop_id`,`date`,`article`)' in query
+    assert 'FOREIGN KEY' not in query
+    assert shared_client._table_query('catalog', 'dates')[0] == (
+        'catalog_dates'
+    )
+
+
+def test_shared_validate_prefixes_rows_with_shop_id(shared_client):
+    products = shared_client.parse_product_data([
+        {'name': 'Товар', 'nmID': 1, 'metrics': {'stockCount': 3}},
+    ], '2025-01-01', compact=True)
+    query, params = shared_client.validate_stocks_db(products)
+    assert 'shop_id, date, article, stock' in query
+    assert params == [(7, date(2025, 1, 1), 1, 3)]
+    assert shared_client.validate_products_db(products)[1] == [
+        (7, 1, 'Товар')
+    ]
+    assert shared_client.validate_cursor_db('2025-01-01T00:00:00')[1] == (
+        7, 'sales', '2025-01-01T00:00:00'
+    )
+    assert shared_client.validate_date_db('2025-01-01')[1][0] == date(
+        2025, 1, 1
+    )
+
+
+def test_shared_unit_of_work_dedupes_products_per_shop(shared_client):
+    days = [
+        (
+            f'2025-01-0{day}',
+            [{'дата': f'2025-01-0{day}', 'артикул': 1,
+              'наименование': f'Товар {day}', 'остаток': day}],
+            [{'дата': f'2025-01-0{day}', 'артикул': 1,
+              'среднее значение': Decimal('1.00')}]
+        ) for day in (1, 2)
+    ]
+    _, products, stocks, _ = shared_client.unit_of_work_queries(days)
+    assert products[1] == [(7, 1, 'Товар 2')]
+    assert [row[0] for row in stocks[1]] == [7, 7]
+
+
+def test_register_shop_returns_id(mock_db_cursor):
+    mock_db_cursor.fetchone.return_value = (42,)
+    client = WbDataBaseClient('shop', shared=True)
+    with patch('parser.wb_db.schema_registry.create'):
+        assert client._key() == (42,)
+        assert client._key() == (42,)
+    assert mock_db_cursor.fetchone.call_count == 1
@@ -1,7 +1,11 @@
 # import json
+import time
+
 import pytest
 import requests
 from unittest.mock import patch
+from parser.exceptions import DataFetchError
+from parser.rate_limiter import RateLimiter
 from parser.wb_tools import WbAnalyticsClient
 
 
@@ -25,6 +29,22 @@ def test_get_sale_report_success(wb_client, requests_mock):
     assert result == mock_response
 
 
+def test_get_sale_report_keeps_only_needed_fields(wb_client, requests_mock):
+    order = {
+        "srid": "abc", "nmId": 123, "date": "2025-07-10T10:00:00",
+        "lastChangeDate": "2025-07-10T11:00:00", "isRealization": True,
+        "isCancel": False, "totalPrice": 1500.5, "regionName": "Москва",
+        "warehouseName": "Коледино", "barcode": "2000000000000"
+    }
+    requests_mock.get(wb_client.AVG_SALES_URL, json=[order, order])
+    result = wb_client._get_sale_report('2025-07-10')
+    assert result == [{
+        "srid": "abc", "nmId": 123, "date": "2025-07-10T10:00:00",
+        "lastChangeDate": "2025-07-10T11:00:00", "isRealization": True,
+        "isCancel": False
+    }] * 2
+
+
 def test_get_stock_report_success(wb_client, requests_mock):
     mock_response = {'data': {'items': [{'test': 'data'}]}}
 
@@ -51,7 +71,7 @@ def test_get_all_sales_reports(wb_client):
 
         result = wb_client.get_all_sales_reports('2025-07-24')
         assert len(result) == len(mock_data)
-        mock_sleep.assert_called_once_with(60)
+        mock_sleep.assert_not_called()
 
 
 def test_get_all_stock_reports(wb_client):
@@ -67,7 +87,7 @@ def test_get_all_stock_reports(wb_client):
         result = wb_client.get_all_stock_reports(
             '2025-07-01', '2025-07-10')
         assert len(result) == 1
-        mock_sleep.assert_called_once_with(20)
+        mock_sleep.assert_not_called()
 
 # def test_save_to_json(wb_client, tmp_path):
 #     test_data = [{"test": "data"}]
@@ -84,6 +104,90 @@ def test_get_all_stock_reports(wb_client):
 #     assert loaded_data == test_data
 
 
+def test_get_all_sales_reports_retries_on_429(fake_clock, requests_mock):
+    wb_client = WbAnalyticsClient(
+        'test_token',
+        limiter=RateLimiter(clock=fake_clock, sleep=fake_clock.sleep)
+    )
+    mock_data = [
+        {"nmId": 123, "date": "2025-07-20", "lastChangeDate": "2025-07-20"}
+    ]
+    requests_mock.get(wb_client.AVG_SALES_URL, [
+        {'status_code': 429, 'headers': {'X-Ratelimit-Retry': '3'}},
+        {'json': mock_data, 'status_code': 200},
+        {'json': [], 'status_code': 200},
+    ])
+    result = wb_client.get_all_sales_reports('2025-07-24')
+    assert result == mock_data
+    assert fake_clock.sleeps == pytest.approx([3, 60])
+
+
+def test_iter_stock_pages_yields_each_page(wb_client):
+    pages = [
+        {'data': {'items': [{'nmID': 1}]}},
+        {'data': {'items': [{'nmID': 2}]}},
+        {'data': {'items': []}},
+    ]
+    with patch.object(
+        wb_client, '_get_stock_report', side_effect=pages
+    ) as mock_report:
+        iterator = wb_client.iter_stock_pages('2025-07-01', '2025-07-01')
+        assert next(iterator) == [{'nmID': 1}]
+        assert mock_report.call_count == 1
+        assert list(iterator) == [[{'nmID': 2}]]
+
+
+def test_iter_sales_pages_filters_period(wb_client):
+    page = [
+        {"nmId": 1, "date": "2025-07-20", "lastChangeDate": "2025-07-20"},
+        {"nmId": 2, "date": "2025-07-25", "lastChangeDate": "2025-07-25"},
+    ]
+    with patch.object(
+        wb_client, '_get_sale_report', side_effect=[page, []]
+    ):
+        result = list(wb_client.iter_sales_pages('2025-07-24'))
+    assert result == [page[:1]]
+
+
+def test_requests_use_session_timeout(wb_client, requests_mock):
+    requests_mock.get(wb_client.AVG_SALES_URL, json=[])
+    wb_client._get_sale_report('2025-07-10')
+    assert requests_mock.last_request.timeout == wb_client.timeout
+
+
+def test_deadline_exceeded(wb_client):
+    wb_client.deadline = time.monotonic() - 1
+    with pytest.raises(DataFetchError):
+        wb_client._get_sale_report('2025-07-10')
+
+
+@pytest.mark.parametrize('pages', [
+    lambda client: client.iter_stock_pages('2025-07-01', '2025-07-01'),
+    lambda client: client.iter_order_pages('2025-07-01'),
+])
+def test_deadline_stops_pagination_without_retries(
+    wb_client, requests_mock, pages
+):
+    wb_client.deadline = time.monotonic() - 1
+    with patch('time.sleep') as mock_sleep, patch.object(
+        wb_client.retry.breaker, 'record_failure'
+    ) as mock_failure, pytest.raises(DataFetchError):
+        list(pages(wb_client))
+    mock_sleep.assert_not_called()
+    mock_failure.assert_not_called()
+    assert not requests_mock.called
+    assert wb_client.retry.stats()['retries'] == {}
+    assert wb_client.retry.stats()['gave_up'] == 0
+
+
+def test_pool_stats(wb_client):
+    adapter = wb_client.session.get_adapter(wb_client.AVG_SALES_URL)
+    pool = adapter.poolmanager.connection_from_url(wb_client.AVG_SALES_URL)
+    pool.num_connections, pool.num_requests = 1, 3
+    stats = wb_client.pool_stats()
+    assert stats['statistics-api.wildberries.ru']['reused'] == 2
+
+
 def test_get_filename(wb_client, tmp_path):
     result = wb_client._get_filename(
         'json', '2025-07-10', folder=str(tmp_path))
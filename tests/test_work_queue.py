@@ -0,0 +1,109 @@
+import threading
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from parser.utils import run_queue_worker
+from parser.work_queue import WorkQueue
+
+ITEM = {'id': 7, 'shop_name': 'shop', 'date': '2025-07-01', 'report': 'sales'}
+
+
+def test_enqueue_creates_items_for_each_report(mock_db_cursor):
+    mock_db_cursor.rowcount = 4
+    work_queue = WorkQueue('worker')
+    assert work_queue.enqueue(['a', 'b'], '2025-07-01') == 4
+    query, params = mock_db_cursor.executemany.call_args.args
+    assert 'INSERT IGNORE INTO work_queue' in query
+    assert params == [
+        ('a', date(2025, 7, 1), 'stocks'),
+        ('a', date(2025, 7, 1), 'sales'),
+        ('b', date(2025, 7, 1), 'stocks'),
+        ('b', date(2025, 7, 1), 'sales'),
+    ]
+
+
+def test_claim_leases_item(mock_db_cursor):
+    mock_db_cursor.fetchone.return_value = (7, 'shop', date(2025, 7, 1), 'sales')
+    work_queue = WorkQueue('worker', lease_time=30)
+    assert work_queue.claim() == ITEM
+    queries = [call.args[0] for call in mock_db_cursor.execute.call_args_list]
+    assert 'SKIP LOCKED' in queries[1]
+    owner = f'worker-{threading.get_ident()}'
+    assert mock_db_cursor.execute.call_args.args[1] == (owner, 30, 7)
+
+
+def test_claim_returns_none_when_queue_empty(mock_db_cursor):
+    mock_db_cursor.fetchone.return_value = None
+    assert WorkQueue('worker').claim() is None
+    assert mock_db_cursor.execute.call_count == 2
+
+
+def test_heartbeat_detects_lost_lease(mock_db_cursor):
+    mock_db_cursor.rowcount = 0
+    assert WorkQueue('worker').heartbeat(7) is False
+
+
+def test_leased_extends_lease_while_running():
+    work_queue = WorkQueue('worker', heartbeat_interval=0.01)
+    beats = threading.Event()
+    with patch.object(
+        work_queue, 'heartbeat', side_effect=lambda item_id: beats.set()
+    ):
+        with work_queue.leased(7):
+            assert beats.wait(1)
+
+
+def test_run_queue_worker_completes_and_fails_items():
+    work_queue = MagicMock()
+    work_queue.claim.side_effect = [ITEM, {**ITEM, 'id': 8}, None]
+
+    def fake_process(token_client, item, *args):
+        if item['id'] == 8:
+            raise ValueError('boom')
+
+    with patch('parser.utils.process_item', side_effect=fake_process):
+        results = run_queue_worker(MagicMock(), work_queue)
+    assert [result['STATUS'] for result in results] == ['SUCCESS', 'ERROR']
+    assert results[0]['SHOP'] == 'shop:sales:2025-07-01'
+    work_queue.complete.assert_called_once_with(7)
+    assert work_queue.fail.call_args.args[0] == 8
+
+
+def test_threads_of_one_process_lease_as_different_owners(mock_db_cursor):
+    work_queue = WorkQueue('worker')
+    mock_db_cursor.fetchone.return_value = (7, 'shop', date(2025, 7, 1), 'sales')
+    mock_db_cursor.rowcount = 1
+    work_queue.claim()
+    owners = []
+    thread = threading.Thread(target=lambda: owners.append(
+        work_queue._owner()
+    ))
+    thread.start()
+    thread.join()
+    owner = f'worker-{threading.get_ident()}'
+    assert owners[0] != owner
+    beat = threading.Thread(target=work_queue.heartbeat, args=(7,))
+    beat.start()
+    beat.join()
+    assert mock_db_cursor.execute.call_args.args[1] == (600, 7, owner)
+    work_queue.complete(7)
+    assert mock_db_cursor.execute.call_args.args[1] == (7, owner)
+
+
+def test_run_queue_worker_retries_claim_errors():
+    work_queue = MagicMock()
+    work_queue.claim.side_effect = [RuntimeError('deadlock'), ITEM, None]
+    sleep = MagicMock()
+    with patch('parser.utils.process_item'):
+        results = run_queue_worker(MagicMock(), work_queue, sleep=sleep)
+    assert [result['STATUS'] for result in results] == ['SUCCESS']
+    sleep.assert_called_once_with(5)
+
+
+def test_run_queue_worker_stops_after_repeated_claim_errors():
+    work_queue = MagicMock()
+    work_queue.claim.side_effect = RuntimeError('lost connection')
+    sleep = MagicMock()
+    assert run_queue_worker(MagicMock(), work_queue, sleep=sleep) == []
+    assert work_queue.claim.call_count == 5
+    assert sleep.call_count == 4